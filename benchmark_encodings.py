@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Victron Response Encoding Benchmark
+Compares encode/decode time and size of JSON, MessagePack and CBOR for a recorded response
+
+Usage:
+    curl http://192.168.88.77:8088/settings > settings.json
+    python3 benchmark_encodings.py settings.json
+    python3 benchmark_encodings.py --url http://192.168.88.77:8088 --save settings.json
+
+Run it on the GX itself to see the encode cost the server pays per response.
+MessagePack and CBOR rows need the optional msgpack / cbor2 packages.
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+API_BASE_URL = "http://192.168.88.77:8088"
+DEFAULT_RUNS = 50
+
+
+def load_encodings():
+    """Encodings to compare: name -> (encode, decode), skipping missing packages"""
+    encodings = {
+        'json (server default, indent=2)': (lambda d: json.dumps(d, indent=2).encode(), json.loads),
+        'json (compact)': (lambda d: json.dumps(d, separators=(',', ':')).encode(), json.loads),
+    }
+    try:
+        import msgpack
+        encodings['msgpack'] = (lambda d: msgpack.packb(d, use_bin_type=True),
+                                lambda b: msgpack.unpackb(b, raw=False, strict_map_key=False))
+    except ImportError:
+        print("msgpack not installed - skipped (pip install msgpack)")
+    try:
+        import cbor2
+        encodings['cbor'] = (cbor2.dumps, cbor2.loads)
+    except ImportError:
+        print("cbor2 not installed - skipped (pip install cbor2)")
+    return encodings
+
+
+def identical(a, b):
+    """Equal including types, so an int that came back as a float counts as a difference"""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(identical(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(identical(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def median_ms(fn, arg, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark response encodings on a recorded API response')
+    parser.add_argument('file', nargs='?', help='Recorded response, e.g. GET /settings saved as JSON')
+    parser.add_argument('--url', help=f'Record GET /settings from this server instead (e.g. {API_BASE_URL})')
+    parser.add_argument('--save', help='Write the recorded response to this file')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Timed runs per encoding (median reported)')
+    args = parser.parse_args()
+
+    if args.url:
+        from victron_api_client import VictronClient
+        with VictronClient(args.url) as client:
+            data = client._request('GET', '/settings')
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(data, f)
+    elif args.file:
+        with open(args.file, 'r') as f:
+            data = json.load(f)
+    else:
+        parser.error('Give a recorded response file or --url')
+
+    settings = data.get('settings', data) if isinstance(data, dict) else data
+    print("=" * 80)
+    print("Response Encoding Benchmark")
+    print(f"{len(settings)} values, median of {args.runs} runs")
+    print("=" * 80)
+    print(f"{'Encoding':<32} {'Bytes':>9} {'Size':>6} {'Encode ms':>10} {'Time':>6} {'Decode ms':>10}  Exact")
+    print("-" * 80)
+
+    baseline = None
+    for name, (encode, decode) in load_encodings().items():
+        body = encode(data)
+        encode_ms = median_ms(encode, data, args.runs)
+        decode_ms = median_ms(decode, body, args.runs)
+        baseline = baseline or (len(body), encode_ms)
+        print(f"{name:<32} {len(body):>9,} {len(body) / baseline[0]:>6.0%} {encode_ms:>10.2f} "
+              f"{encode_ms / baseline[1]:>6.0%} {decode_ms:>10.2f}  {'yes' if identical(decode(body), data) else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
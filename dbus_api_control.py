@@ -6,18 +6,29 @@ Runs as a daemontools service on port 8089
 
 Provides:
 - Server status monitoring
-- Start/stop/restart operations via daemontools svc command
+- Start/stop/restart operations via the daemontools supervise control fifo
 - Log access
-- Upgrade functionality (git pull + restart)
+- Runtime profiling of the main API server (cProfile, stack sampling, tracemalloc)
+- Upgrade functionality (git pull + zero-downtime reload)
 """
 
+import bisect
+import collections
+import glob
+import http.client
 import json
 import logging
 import os
+import queue
+import re
+import socket
+import struct
 import subprocess
+import threading
 import time
+import uuid
 from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse, parse_qs
 import sys
 import signal
@@ -29,8 +40,44 @@ DEFAULT_PORT = 8089
 DEFAULT_HOST = '0.0.0.0'
 SERVICE_NAME = 'dbus-api-server'
 SERVICE_PATH = f'/service/{SERVICE_NAME}'
-LOG_PATH = f'/var/log/{SERVICE_NAME}/current'
+LOG_DIR = f'/var/log/{SERVICE_NAME}'
+LOG_PATH = os.path.join(LOG_DIR, 'current')
 INSTALL_DIR = '/data/dbus-api'
+MAIN_API_HOST = '127.0.0.1'
+MAIN_API_PORT = 8088
+# Used instead of TCP while the main API listens on it (--unix-socket), so
+# health checks and profiling keep working when its TCP listener is disabled
+MAIN_API_SOCKET = '/var/run/dbus-api/api.sock'
+
+# Profiling: /profile routes are forwarded to the main API's loopback-only
+# /debug/profile routes, so profilers are switched without a restart
+PROFILE_ROUTES = ('/profile', '/profile/sample', '/profile/tracemalloc')
+PROFILE_FORWARD_TIMEOUT = 30  # tracemalloc reports on a large heap take a while
+
+# Background control jobs
+JOB_HISTORY = 50  # Finished jobs kept for GET /jobs
+JOB_POLL_INTERVAL = 0.2  # Seconds between svstat / health polls
+JOB_READY_TIMEOUT = 60  # Seconds to wait for the main API to serve again
+JOB_WAIT_TIMEOUT = 180  # Max seconds a {"wait": true} request blocks
+RESTART_TERM_TIMEOUT = 20  # Seconds for a SIGTERM shutdown (10 s drain, saving state) before SIGKILL
+
+# Resource usage sampling of the API processes from /proc
+METRICS_SAMPLE_INTERVAL = 2  # Seconds between samples
+METRICS_HISTORY = 300  # Samples kept per process (10 minutes)
+
+# Log reader
+LOG_BLOCK_SIZE = 8192  # Bytes read per backward seek
+LOG_INDEX_STRIDE = 16384  # Bytes between (offset, timestamp) index checkpoints
+LOG_MAX_LINES = 10000  # Upper bound for tail queries
+LOG_LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+LOG_LEVEL_RE = re.compile(r' - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - ')
+TAI64_UNIX_OFFSET = 4611686018427387914  # 2^62 + 10 (TAI-UTC at the TAI64 epoch)
+NDJSON_BATCH_LINES = 100  # Log lines per HTTP chunk
+
+# Live log follow
+LOG_FOLLOW_INTERVAL = 0.25  # Seconds between checks of current for new data
+LOG_FOLLOW_HEARTBEAT = 15  # Seconds of silence before a heartbeat line is sent
+LOG_FOLLOW_QUEUE_SIZE = 1000  # Pending batches per client before it is dropped
 
 # Setup logging
 logging.basicConfig(
@@ -72,73 +119,884 @@ def run_command(cmd, timeout=10):
         }
 
 
-def get_service_status():
-    """Get status of main API server via svstat"""
-    result = run_command(f'svstat {SERVICE_PATH}')
-    if result['success']:
-        # Parse svstat output: "/service/dbus-api-server: up (pid 1234) 567 seconds"
-        output = result['stdout']
-        status = {
-            'raw': output,
-            'running': 'up' in output,
-            'pid': None,
-            'uptime_seconds': None
-        }
+def read_supervise_status(service_path=SERVICE_PATH):
+    """Read daemontools' supervise/status record directly
 
-        # Extract PID
-        if '(pid ' in output:
-            try:
-                pid_str = output.split('(pid ')[1].split(')')[0]
-                status['pid'] = int(pid_str)
-            except (IndexError, ValueError):
-                pass
+    Layout (18 bytes, longer records are tolerated): TAI64N timestamp of
+    the last state change (8 + 4 bytes, big-endian), pid (4 bytes,
+    little-endian, 0 when down), paused flag, want flag ('u'/'d').
 
-        # Extract uptime
-        if ' seconds' in output:
-            try:
-                seconds_str = output.split(') ')[1].split(' seconds')[0]
-                status['uptime_seconds'] = int(seconds_str)
-            except (IndexError, ValueError):
-                pass
+    Returns: dict with running, pid, uptime_seconds, want, paused, normally_up
+    Raises: OSError if supervise is not running or the status is unreadable
+    """
+    supervise_dir = os.path.join(service_path, 'supervise')
+    # supervise holds the read end of the ok fifo open while it runs
+    ok_fd = os.open(os.path.join(supervise_dir, 'ok'), os.O_WRONLY | os.O_NONBLOCK)
+    os.close(ok_fd)
+
+    with open(os.path.join(supervise_dir, 'status'), 'rb') as f:
+        record = f.read()
+    if len(record) < 18:
+        raise OSError(f'Short supervise status record ({len(record)} bytes)')
 
-        return status
+    seconds, nanoseconds = struct.unpack('>QL', record[0:12])
+    pid = struct.unpack('<L', record[12:16])[0]
+    changed_at = seconds - TAI64_UNIX_OFFSET + nanoseconds / 1e9
+    want = {ord('u'): 'up', ord('d'): 'down'}.get(record[17])
+    return {
+        'running': pid != 0,
+        'pid': pid or None,
+        'uptime_seconds': round(max(time.time() - changed_at, 0), 3),
+        'changed_at': datetime.fromtimestamp(changed_at).isoformat(),
+        'want': want,
+        'paused': bool(record[16]),
+        'normally_up': not os.path.exists(os.path.join(service_path, 'down'))
+    }
+
+
+def format_svstat(service_path, status):
+    """Render a status dict the way svstat prints it"""
+    seconds = int(status['uptime_seconds'])
+    if status['running']:
+        text = f"{service_path}: up (pid {status['pid']}) {seconds} seconds"
+        if not status['normally_up']:
+            text += ', normally down'
+        if status['want'] == 'down':
+            text += ', want down'
     else:
+        text = f"{service_path}: down {seconds} seconds"
+        if status['normally_up']:
+            text += ', normally up'
+        if status['want'] == 'up':
+            text += ', want up'
+    if status['paused']:
+        text += ', paused'
+    return text
+
+
+def get_service_status(service_path=SERVICE_PATH):
+    """Get status of main API server from its supervise directory"""
+    try:
+        status = read_supervise_status(service_path)
+    except OSError as e:
+        error = f'supervise not running or unreadable: {e}'
         return {
-            'raw': result['stderr'],
+            'raw': error,
             'running': False,
             'pid': None,
             'uptime_seconds': None,
-            'error': result['stderr']
+            'error': error
+        }
+    status['raw'] = format_svstat(service_path, status)
+    return status
+
+
+def send_supervise_command(commands, service_path=SERVICE_PATH):
+    """Write svc command characters (e.g. 'u', 'd', 'k') to supervise/control
+
+    Raises: OSError if supervise is not running (no reader on the fifo)
+    """
+    fd = os.open(os.path.join(service_path, 'supervise', 'control'), os.O_WRONLY | os.O_NONBLOCK)
+    try:
+        os.write(fd, commands.encode('ascii'))
+    finally:
+        os.close(fd)
+
+
+def tai64n_to_unix(label):
+    """Convert a multilog TAI64N label ('@' + 24 hex digits) to Unix time
+
+    Returns: float seconds, or None if the label is malformed
+    """
+    try:
+        return int(label[1:17], 16) - TAI64_UNIX_OFFSET + int(label[17:25], 16) / 1e9
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_log_line(line, segment=None):
+    """Split a multilog line into timestamp, level and message"""
+    ts = None
+    message = line
+    if line.startswith('@') and len(line) >= 25:
+        ts = tai64n_to_unix(line[:25])
+        if ts is not None:
+            message = line[26:]
+    match = LOG_LEVEL_RE.search(message)
+    return {
+        'ts': ts,
+        'time': datetime.fromtimestamp(ts).isoformat() if ts is not None else None,
+        'level': match.group(1) if match else None,
+        'message': message,
+        'segment': segment,
+        'raw': line
+    }
+
+
+class LogReader:
+    """Native reader for a multilog directory (rotated @*.s/@*.u files + current)
+
+    Tail queries seek backward from the end of the newest segment, so cost
+    grows with the lines returned rather than the log size. Time-range
+    queries skip rotated segments by their TAI64N file name (the time the
+    segment was closed) and seek into the remaining ones through an
+    in-memory (offset, timestamp) index that is built once per segment
+    and only extended as current grows.
+    """
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self._index = {}  # path -> {'key', 'offsets', 'times', 'indexed_to'}
+
+    def segments(self):
+        """Return segment paths, oldest first"""
+        rotated = sorted(glob.glob(os.path.join(self.log_dir, '@*.s')) +
+                         glob.glob(os.path.join(self.log_dir, '@*.u')))
+        current = os.path.join(self.log_dir, 'current')
+        return rotated + ([current] if os.path.exists(current) else [])
+
+    def tail(self, lines=50, level=None, contains=None):
+        """Return the last N matching lines, oldest first"""
+        matched = []
+        for path in reversed(self.segments()):
+            segment = os.path.basename(path)
+            for raw in self._read_backward(path):
+                record = self._match(raw, segment, level, contains, None, None)
+                if record:
+                    matched.append(record)
+                    if len(matched) >= lines:
+                        return list(reversed(matched))
+        return list(reversed(matched))
+
+    def query(self, since=None, until=None, level=None, contains=None, limit=None):
+        """Yield matching lines from since to until, oldest first"""
+        count = 0
+        for path in self.segments():
+            segment = os.path.basename(path)
+            if since is not None and segment.startswith('@'):
+                closed_at = tai64n_to_unix(segment[:25])
+                if closed_at is not None and closed_at < since:
+                    continue
+            offset = self._seek_offset(path, since) if since is not None else 0
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                for raw in f:
+                    record = self._match(raw, segment, level, contains, since, until)
+                    if record is False:
+                        return
+                    if record:
+                        yield record
+                        count += 1
+                        if limit and count >= limit:
+                            return
+
+    def index_stats(self):
+        """Return per-segment index sizes"""
+        with self._lock:
+            return {os.path.basename(p): len(i['offsets']) for p, i in self._index.items()}
+
+    def _match(self, raw, segment, level, contains, since, until):
+        """Parse and filter one line
+
+        Returns: record dict, None if filtered out, False once past until
+        """
+        line = raw.decode('utf-8', errors='replace').rstrip('\n')
+        if not line:
+            return None
+        if contains and contains not in line:
+            return None
+        record = parse_log_line(line, segment)
+        if record['ts'] is not None:
+            if since is not None and record['ts'] < since:
+                return None
+            if until is not None and record['ts'] > until:
+                return False
+        if level and LOG_LEVELS.get(record['level'], 0) < LOG_LEVELS[level]:
+            return None
+        return record
+
+    def _read_backward(self, path):
+        """Yield raw lines of a file from last to first"""
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            remainder = b''
+            while pos > 0:
+                step = min(LOG_BLOCK_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + remainder).split(b'\n')
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line:
+                        yield line
+            if remainder:
+                yield remainder
+
+    def _seek_offset(self, path, since):
+        """Byte offset of the last indexed line at or before since"""
+        index = self._update_index(path)
+        pos = bisect.bisect_right(index['times'], since) - 1
+        return index['offsets'][pos] if pos >= 0 else 0
+
+    def _update_index(self, path):
+        """Build or extend the checkpoint index for a segment"""
+        stat = os.stat(path)
+        with self._lock:
+            index = self._index.get(path)
+            if index is None or index['key'] != stat.st_ino or index['indexed_to'] > stat.st_size:
+                # New segment, or current was rotated / truncated
+                index = self._index[path] = {'key': stat.st_ino, 'offsets': [], 'times': [], 'indexed_to': 0}
+                for stale in [p for p in self._index if not os.path.exists(p)]:
+                    del self._index[stale]
+            if index['indexed_to'] >= stat.st_size:
+                return index
+            with open(path, 'rb') as f:
+                f.seek(index['indexed_to'])
+                offset = index['indexed_to']
+                last_checkpoint = index['offsets'][-1] if index['offsets'] else -LOG_INDEX_STRIDE
+                for raw in f:
+                    if not raw.endswith(b'\n'):
+                        break  # Partial line still being written
+                    if offset - last_checkpoint >= LOG_INDEX_STRIDE and raw.startswith(b'@'):
+                        ts = tai64n_to_unix(raw[:25].decode('ascii', errors='replace'))
+                        if ts is not None:
+                            index['offsets'].append(offset)
+                            index['times'].append(ts)
+                            last_checkpoint = offset
+                    offset += len(raw)
+                index['indexed_to'] = offset
+            return index
+
+
+class LogFollower:
+    """Broadcast lines appended to multilog's current file to all followers
+
+    A single thread polls current (stat + read of new bytes only) while at
+    least one client is subscribed, parses each complete line once and
+    hands the batch to every subscriber queue. When multilog rotates
+    current, the rest of the old file is drained through the still-open
+    handle before switching, so every line is delivered exactly once.
+    Clients that fall LOG_FOLLOW_QUEUE_SIZE batches behind are dropped
+    instead of slowing down the others.
+    """
+
+    class Subscription:
+        def __init__(self):
+            self.queue = queue.Queue(maxsize=LOG_FOLLOW_QUEUE_SIZE)
+            self.dropped = False
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+
+    def subscribe(self):
+        """Register a client and start the follow thread if needed"""
+        subscription = self.Subscription()
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-follow', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a client; the thread exits once nobody is left"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _publish(self, records):
+        with self._lock:
+            for subscription in list(self._subscribers):
+                try:
+                    subscription.queue.put_nowait(records)
+                except queue.Full:
+                    subscription.dropped = True
+                    self._subscribers.discard(subscription)
+                    logger.warning("Dropped slow log follower")
+
+    def _run(self):
+        f = None
+        partial = b''
+        try:
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._thread = None
+                        return
+
+                if f is None:
+                    try:
+                        f = open(self.path, 'rb')
+                        f.seek(0, os.SEEK_END)
+                    except OSError:
+                        f = None
+                        time.sleep(LOG_FOLLOW_INTERVAL)
+                        continue
+
+                data = f.read()
+                try:
+                    stat = os.stat(self.path)
+                    rotated = stat.st_ino != os.fstat(f.fileno()).st_ino
+                    truncated = not rotated and stat.st_size < f.tell()
+                except OSError:
+                    rotated, truncated = False, False
+                if rotated:
+                    # Lines written to the old file between the read and the rename
+                    data += f.read()
+
+                if data:
+                    lines = (partial + data).split(b'\n')
+                    partial = lines.pop()
+                    records = [parse_log_line(line.decode('utf-8', errors='replace'), 'current')
+                               for line in lines if line]
+                    if records:
+                        self._publish(records)
+
+                if rotated:
+                    # Old file fully drained - continue with the new current from the start
+                    f.close()
+                    f = open(self.path, 'rb')
+                    partial = b''
+                    continue
+                if truncated:
+                    f.seek(0)
+                    partial = b''
+                if not data:
+                    time.sleep(LOG_FOLLOW_INTERVAL)
+        except Exception as e:
+            logger.error(f"Log follower stopped: {e}")
+            with self._lock:
+                for subscription in self._subscribers:
+                    subscription.dropped = True
+                self._subscribers.clear()
+                self._thread = None
+        finally:
+            if f is not None:
+                f.close()
+
+
+log_reader = LogReader(LOG_DIR)
+log_follower = LogFollower(LOG_PATH)
+
+
+class InvalidParameterError(ValueError):
+    """A query parameter could not be parsed (answered with 400)"""
+
+
+def int_param(params, name, default, minimum=1, maximum=None):
+    """Return query parameter name (from parse_qs) as int clamped to [minimum, maximum]
+
+    Missing or empty parameters give default (not clamped).
+
+    Raises: InvalidParameterError
+    """
+    value = params.get(name, [''])[0]
+    if value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise InvalidParameterError(f'{name} must be an integer, got {value!r}')
+    number = max(number, minimum)
+    return number if maximum is None else min(number, maximum)
+
+
+def parse_time_param(value):
+    """Parse a time query parameter (Unix seconds or ISO 8601 local time)"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class Job:
+    """A control operation running in the background"""
+
+    def __init__(self, operation):
+        self.id = uuid.uuid4().hex[:12]
+        self.operation = operation
+        self.state = 'pending'
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.output = []
+        self.result = {}
+        self.error = None
+        self.done = threading.Event()
+
+    def log(self, message):
+        """Append a progress line to the job output (and the control log)"""
+        self.output.append(f"{datetime.now().strftime('%H:%M:%S.%f')[:-3]} {message}")
+        logger.info(f"[job {self.id} {self.operation}] {message}")
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'operation': self.operation,
+            'state': self.state,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'duration_seconds': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            'output': list(self.output),
+            'result': self.result,
+            'error': self.error
         }
 
 
+class JobManager:
+    """Run control operations one at a time in background threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}  # id -> Job, oldest first
+        self._active = None
+
+    def submit(self, operation, fn):
+        """Start fn(job) in the background
+
+        Returns: (job, None), or (None, active_job) if another operation is running
+        """
+        with self._lock:
+            if self._active is not None:
+                return None, self._active
+            job = self._active = Job(operation)
+            self._jobs[job.id] = job
+            while len(self._jobs) > JOB_HISTORY:
+                del self._jobs[next(iter(self._jobs))]
+        threading.Thread(target=self._run, args=(job, fn), name=f'job-{job.id}', daemon=True).start()
+        return job, None
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [job.to_dict() for job in reversed(list(self._jobs.values()))]
+
+    def _run(self, job, fn):
+        job.state = 'running'
+        job.started_at = time.time()
+        try:
+            fn(job)
+            job.state = 'succeeded'
+        except Exception as e:
+            job.state = 'failed'
+            job.error = str(e)
+            job.log(f"Failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active = None
+            job.done.set()
+
+
+jobs = JobManager()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def main_api_request(method, path, body=None, headers=None, timeout=1):
+    """Send one request to the main API, over its Unix socket if it has one
+
+    A socket file left behind by a server that was started without
+    --unix-socket (or is gone) is skipped in favour of TCP.
+
+    Returns: (status, headers, body bytes)
+    Raises: OSError / http.client.HTTPException if the main API is not reachable
+    """
+    connection = UnixHTTPConnection(MAIN_API_SOCKET, timeout)
+    try:
+        # Only a failed connect falls back, so a request is never sent twice
+        connection.connect()
+    except (ConnectionRefusedError, FileNotFoundError):
+        connection.close()
+        connection = http.client.HTTPConnection(MAIN_API_HOST, MAIN_API_PORT, timeout=timeout)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.headers, response.read()
+    finally:
+        connection.close()
+
+
+def get_main_api_health():
+    """Query the main API /health endpoint
+
+    Returns: Parsed health dict, or None if the API is not serving yet
+    """
+    try:
+        status, _, body = main_api_request('GET', '/health')
+        return json.loads(body.decode('utf-8')) if status == 200 else None
+    except Exception:
+        return None
+
+
+def wait_for(description, predicate, timeout):
+    """Poll predicate() until it returns a truthy value or timeout expires"""
+    deadline = time.monotonic() + timeout
+    while True:
+        value = predicate()
+        if value:
+            return value
+        if time.monotonic() >= deadline:
+            raise RuntimeError(f"Timed out after {timeout}s waiting for {description}")
+        time.sleep(JOB_POLL_INTERVAL)
+
+
+def wait_until_serving(job, old_pid=None):
+    """Wait for a new supervised process and then for the main API to report healthy"""
+    def new_process():
+        status = get_service_status()
+        if status['running'] and status['pid'] and status['pid'] != old_pid:
+            return status
+        return None
+
+    def serving():
+        health = get_main_api_health()
+        return health if health and health.get('success') else None
+
+    status = wait_for('service to come up', new_process, JOB_READY_TIMEOUT)
+    job.log(f"Service up (pid {status['pid']})")
+    health = wait_for('main API health check', serving, JOB_READY_TIMEOUT)
+    job.log(f"Main API serving ({health.get('status')})")
+    job.result.update({'running': True, 'pid': status['pid'], 'api_status': health.get('status')})
+
+
+def svc(job, commands):
+    """Send daemontools control commands to the main API service"""
+    try:
+        send_supervise_command(commands)
+    except OSError as e:
+        raise RuntimeError(f"svc -{commands} failed: {e}")
+    job.log(f"svc -{commands} sent")
+
+
+def start_operation(job):
+    svc(job, 'u')
+    wait_until_serving(job)
+
+
+def stop_operation(job):
+    svc(job, 'd')
+    wait_for('service to stop', lambda: not get_service_status()['running'], JOB_READY_TIMEOUT)
+    job.log("Service down")
+    job.result.update({'running': False, 'pid': None})
+
+
+def restart_operation(job):
+    """Restart via SIGTERM, so the server drains and saves its state; SIGKILL only if it does not exit"""
+    old_pid = get_service_status()['pid']
+    svc(job, 'tu')
+    if old_pid:
+        try:
+            wait_for('service to exit after SIGTERM', lambda: get_service_status()['pid'] != old_pid,
+                     RESTART_TERM_TIMEOUT)
+        except RuntimeError:
+            job.log(f"Still running {RESTART_TERM_TIMEOUT}s after SIGTERM - killing it")
+            svc(job, 'k')
+    wait_until_serving(job, old_pid)
+
+
+def reload_operation(job):
+    """Graceful reload: the server drains and re-execs on the same socket (no downtime)"""
+    status = get_service_status()
+    if not status['running']:
+        job.log("Service not running - starting instead")
+        start_operation(job)
+        return
+
+    # The pid stays the same across the re-exec, so a changed started_at is
+    # the only sign that the new process took over
+    before = get_main_api_health()
+    old_started_at = before.get('started_at') if before else None
+    if old_started_at is None:
+        raise RuntimeError("Main API is not answering /health, so a reload cannot be confirmed - use /restart")
+
+    def reloaded():
+        health = get_main_api_health()
+        if health and health.get('success') and health.get('started_at') != old_started_at:
+            return health
+        return None
+
+    svc(job, 'h')
+    health = wait_for('main API to reload', reloaded, JOB_READY_TIMEOUT)
+    job.log(f"Main API serving again ({health.get('status')}, started {health.get('started_at')})")
+    job.result.update({'running': True, 'pid': status['pid'], 'api_status': health.get('status')})
+
+
+def upgrade_operation(job):
+    job.log("git pull")
+    pull_result = run_command(f'cd {INSTALL_DIR} && git pull', timeout=60)
+    for line in (pull_result['stdout'] + '\n' + pull_result['stderr']).strip().splitlines():
+        job.log(f"  {line}")
+    if not pull_result['success']:
+        raise RuntimeError(f"Git pull failed: {pull_result['stderr']}")
+    job.result['git_output'] = pull_result['stdout']
+    reload_operation(job)
+
+
+CONTROL_OPERATIONS = {
+    '/start': ('start', 'Start', start_operation),
+    '/stop': ('stop', 'Stop', stop_operation),
+    '/restart': ('restart', 'Restart', restart_operation),
+    '/reload': ('reload', 'Reload', reload_operation),
+    '/upgrade': ('upgrade', 'Upgrade', upgrade_operation),
+}
+
+
+def read_proc_sample(pid):
+    """Read one resource usage sample for pid from /proc
+
+    Returns: dict, or None if the process does not exist
+    """
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # comm (field 2) may contain spaces - split after its closing paren
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open(f'/proc/{pid}/status', 'r') as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+        open_fds = len(os.listdir(f'/proc/{pid}/fd'))
+    except (OSError, IndexError):
+        return None
+
+    def kb(key):
+        value = status.get(key, '').split()
+        return int(value[0]) if value else None
+
+    sample = {
+        'ts': time.time(),
+        'pid': pid,
+        'cpu_ticks': int(fields[11]) + int(fields[12]),  # utime + stime
+        'rss_kb': kb('VmRSS'),
+        'rss_peak_kb': kb('VmHWM'),
+        'threads': int(status.get('Threads', '0').strip()),
+        'open_fds': open_fds,
+        'voluntary_ctxt_switches': int(status.get('voluntary_ctxt_switches', '0').strip()),
+        'nonvoluntary_ctxt_switches': int(status.get('nonvoluntary_ctxt_switches', '0').strip()),
+        'read_bytes': None,
+        'write_bytes': None
+    }
+    try:
+        with open(f'/proc/{pid}/io', 'r') as f:
+            io = dict(line.split(':', 1) for line in f if ':' in line)
+        sample['read_bytes'] = int(io['read_bytes'])
+        sample['write_bytes'] = int(io['write_bytes'])
+    except (OSError, KeyError, ValueError):
+        pass
+    return sample
+
+
+class ResourceSampler:
+    """Sample /proc usage of the API processes into per-process ring buffers
+
+    Sampling runs continuously in a background thread, so CPU or memory
+    spikes between two client polls are still visible in the history.
+    CPU% and context switch rates are deltas against the previous sample
+    of the same pid (reset when the supervised process restarts).
+    """
+
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+    def __init__(self, processes):
+        self.processes = processes  # name -> callable returning pid or None
+        self._lock = threading.Lock()
+        self._history = {name: collections.deque(maxlen=METRICS_HISTORY) for name in processes}
+        self._previous = {}
+
+    def start(self):
+        threading.Thread(target=self._run, name='resource-sampler', daemon=True).start()
+
+    def sample_once(self):
+        for name, get_pid in self.processes.items():
+            pid = get_pid()
+            sample = read_proc_sample(pid) if pid else None
+            if sample is None:
+                continue
+            previous = self._previous.get(name)
+            if previous and previous['pid'] == pid:
+                elapsed = sample['ts'] - previous['ts']
+                sample['cpu_percent'] = round((sample['cpu_ticks'] - previous['cpu_ticks']) / self.CLOCK_TICKS / elapsed * 100, 1)
+                switches = (sample['voluntary_ctxt_switches'] + sample['nonvoluntary_ctxt_switches'] -
+                            previous['voluntary_ctxt_switches'] - previous['nonvoluntary_ctxt_switches'])
+                sample['ctxt_switches_per_s'] = round(switches / elapsed, 1)
+            else:
+                sample['cpu_percent'] = None
+                sample['ctxt_switches_per_s'] = None
+            self._previous[name] = sample
+            with self._lock:
+                self._history[name].append(sample)
+
+    def report(self, samples=60):
+        """Return latest sample, window peaks and recent history per process"""
+        report = {}
+        with self._lock:
+            history = {name: list(buf) for name, buf in self._history.items()}
+        for name, buf in history.items():
+            cpu = [s['cpu_percent'] for s in buf if s['cpu_percent'] is not None]
+            report[name] = {
+                'current': buf[-1] if buf else None,
+                'window_seconds': round(buf[-1]['ts'] - buf[0]['ts'], 1) if buf else 0,
+                'peak': {
+                    'rss_kb': max((s['rss_kb'] or 0 for s in buf), default=None),
+                    'cpu_percent': max(cpu, default=None),
+                    'threads': max((s['threads'] for s in buf), default=None),
+                    'open_fds': max((s['open_fds'] for s in buf), default=None)
+                },
+                'samples': buf[-samples:] if samples else []
+            }
+        return report
+
+    def _run(self):
+        while True:
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.error(f"Resource sampling failed: {e}")
+            time.sleep(METRICS_SAMPLE_INTERVAL)
+
+
+resource_sampler = ResourceSampler({
+    SERVICE_NAME: lambda: get_service_status()['pid'],
+    'dbus-api-control': os.getpid
+})
+
+
+def forward_to_main_api(method, path, query='', data=None):
+    """Forward a profiling request to the main API's /debug routes
+
+    Returns: (status, content_type, body bytes, extra headers)
+    Raises: OSError / http.client.HTTPException if the main API is not reachable
+    """
+    body = json.dumps(data).encode() if data is not None else None
+    status, response_headers, response_body = main_api_request(
+        method, f"/debug{path}" + (f"?{query}" if query else ''), body,
+        {'Content-Type': 'application/json'} if body else {}, PROFILE_FORWARD_TIMEOUT)
+    headers = {'Content-Disposition': response_headers['Content-Disposition']} \
+        if response_headers.get('Content-Disposition') else {}
+    return status, response_headers.get('Content-Type', 'application/json'), response_body, headers
+
+
 def get_recent_logs(lines=50):
     """Get recent log entries"""
-    if os.path.exists(LOG_PATH):
-        result = run_command(f'tail -n {lines} {LOG_PATH}')
-        if result['success']:
-            return result['stdout'].split('\n')
-    return []
+    return [record['raw'] for record in log_reader.tail(lines)]
 
 
 class ControlAPIHandler(BaseHTTPRequestHandler):
     """HTTP request handler for Control API"""
 
     start_time = None  # Server start timestamp
+    protocol_version = 'HTTP/1.1'  # Needed for chunked log streaming
 
-    def _set_headers(self, status=200, content_type='application/json'):
+    def _set_headers(self, status=200, content_type='application/json', headers=None):
         """Set response headers"""
         self.send_response(status)
         self.send_header('Content-type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
 
     def _send_json(self, data, status=200):
         """Send JSON response"""
-        self._set_headers(status)
-        self.wfile.write(json.dumps(data, indent=2).encode())
+        body = json.dumps(data, indent=2).encode()
+        self._set_headers(status, headers={'Content-Length': str(len(body))})
+        self.wfile.write(body)
+
+    def _forward_profile(self, method, query='', data=None):
+        """Answer a /profile request with the main API's response"""
+        try:
+            status, content_type, body, headers = forward_to_main_api(method, self.path.split('?')[0], query, data)
+        except (http.client.HTTPException, OSError) as e:
+            self._send_error_json(f'Main API not reachable: {e}', 502)
+            return
+        headers['Content-Length'] = str(len(body))
+        self._set_headers(status, content_type, headers=headers)
+        self.wfile.write(body)
+
+    def _send_ndjson_stream(self, records):
+        """Stream records as chunked NDJSON, one JSON object per line"""
+        self._set_headers(200, 'application/x-ndjson', headers={'Transfer-Encoding': 'chunked'})
+        try:
+            batch = []
+            for record in records:
+                batch.append(json.dumps(record))
+                if len(batch) >= NDJSON_BATCH_LINES:
+                    self._write_chunk(batch)
+                    batch = []
+            if batch:
+                self._write_chunk(batch)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        except Exception as e:
+            # Headers are already sent - terminate the stream without the final chunk
+            logger.error(f"Error while streaming logs: {e}")
+            self.close_connection = True
+
+    def _stream_follow(self, level=None, contains=None):
+        """Stream newly written log lines until the client disconnects"""
+        subscription = log_follower.subscribe()
+        self._set_headers(200, 'application/x-ndjson', headers={'Transfer-Encoding': 'chunked'})
+        try:
+            while True:
+                try:
+                    records = subscription.queue.get(timeout=LOG_FOLLOW_HEARTBEAT)
+                except queue.Empty:
+                    if subscription.dropped:
+                        self._write_chunk([json.dumps({'error': 'Log follower stopped or client too slow'})])
+                        break
+                    # Also detects disconnected clients
+                    self._write_chunk([json.dumps({'heartbeat': time.time()})])
+                    continue
+                batch = []
+                for record in records:
+                    if contains and contains not in record['raw']:
+                        continue
+                    if level and LOG_LEVELS.get(record['level'], 0) < LOG_LEVELS[level]:
+                        continue
+                    batch.append(json.dumps({k: v for k, v in record.items() if k != 'raw'}))
+                if batch:
+                    self._write_chunk(batch)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            # Headers are already sent - terminate the stream without the final chunk
+            logger.error(f"Error while following logs: {e}\n{traceback.format_exc()}")
+        finally:
+            log_follower.unsubscribe(subscription)
+            self.close_connection = True
+
+    def _write_chunk(self, lines):
+        """Write one HTTP chunk of NDJSON lines"""
+        data = ('\n'.join(lines) + '\n').encode()
+        self.wfile.write(f'{len(data):X}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
 
     def _send_error_json(self, message, status=500):
         """Send error response"""
@@ -146,7 +1004,7 @@ class ControlAPIHandler(BaseHTTPRequestHandler):
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self._set_headers(204)
+        self._set_headers(204, headers={'Content-Length': '0'})
 
     def do_GET(self):
         """Handle GET requests"""
@@ -165,11 +1023,23 @@ class ControlAPIHandler(BaseHTTPRequestHandler):
                         'GET /': 'Control server information',
                         'GET /health': 'Control server health check',
                         'GET /status': 'Main API server status',
+                        'GET /metrics': 'RSS, CPU%, threads, fds and context switches of the API processes (optional: ?samples=N)',
                         'GET /logs': 'Recent log entries (optional: ?lines=N)',
-                        'POST /start': 'Start main API server',
-                        'POST /stop': 'Stop main API server',
-                        'POST /restart': 'Restart main API server',
-                        'POST /upgrade': 'Git pull and restart'
+                        'GET /logs/query': 'Stream log lines as NDJSON (optional: ?lines=N&level=L&q=text&since=T&until=T&limit=N)',
+                        'GET /logs/follow': 'Stream new log lines as NDJSON as they are written (optional: ?level=L&q=text)',
+                        'GET /jobs': 'Recent control jobs',
+                        'GET /jobs/<id>': 'Control job state and output',
+                        'GET /profile': 'cProfile stats of the main API requests captured so far (optional: ?sort=cumulative|tottime|calls&limit=N&format=pstats)',
+                        'GET /profile/sample': 'Stack sampler status, or collapsed stacks for flamegraphs with ?format=collapsed',
+                        'GET /profile/tracemalloc': 'Allocation growth since the tracemalloc baseline (optional: ?limit=N&group=traceback)',
+                        'POST /profile': 'Profile the next N main API requests: {"requests": N}',
+                        'POST /profile/sample': 'Sample all main API threads: {"seconds": S, "interval_ms": I} or {"stop": true}',
+                        'POST /profile/tracemalloc': 'Allocation tracing: {"action": "start"|"reset"|"stop", "frames": N}',
+                        'POST /start': 'Start main API server (background job)',
+                        'POST /stop': 'Stop main API server (background job)',
+                        'POST /restart': 'Restart main API server (background job)',
+                        'POST /reload': 'Zero-downtime reload of main API server (background job)',
+                        'POST /upgrade': 'Git pull and zero-downtime reload (background job)'
                     }
                 })
 
@@ -195,14 +1065,27 @@ class ControlAPIHandler(BaseHTTPRequestHandler):
                     'running': status['running'],
                     'pid': status['pid'],
                     'uptime_seconds': status['uptime_seconds'],
+                    'started_at': status.get('changed_at') if status['running'] else None,
+                    'want': status.get('want'),
+                    'paused': status.get('paused'),
+                    'normally_up': status.get('normally_up'),
                     'raw_status': status['raw'],
+                    'error': status.get('error'),
+                    'success': True
+                })
+
+            # Route: GET /metrics
+            elif path == '/metrics':
+                samples = int_param(params, 'samples', 60, maximum=METRICS_HISTORY)
+                self._send_json({
+                    'sample_interval_seconds': METRICS_SAMPLE_INTERVAL,
+                    'processes': resource_sampler.report(samples),
                     'success': True
                 })
 
             # Route: GET /logs
             elif path == '/logs':
-                lines = int(params.get('lines', ['50'])[0])
-                lines = min(lines, 500)  # Limit to 500 lines
+                lines = int_param(params, 'lines', 50, maximum=LOG_MAX_LINES)
                 logs = get_recent_logs(lines)
                 self._send_json({
                     'log_path': LOG_PATH,
@@ -212,9 +1095,57 @@ class ControlAPIHandler(BaseHTTPRequestHandler):
                     'success': True
                 })
 
+            # Route: GET /logs/query
+            elif path == '/logs/query':
+                level = params.get('level', [''])[0].upper() or None
+                if level and level not in LOG_LEVELS:
+                    self._send_error_json(f"Invalid level - use one of {', '.join(LOG_LEVELS)}", 400)
+                    return
+                contains = params.get('q', [''])[0] or None
+                try:
+                    since = parse_time_param(params.get('since', [''])[0])
+                    until = parse_time_param(params.get('until', [''])[0])
+                except ValueError as e:
+                    self._send_error_json(f'Invalid time: {e}', 400)
+                    return
+
+                if since is None and until is None:
+                    lines = int_param(params, 'lines', 50, maximum=LOG_MAX_LINES)
+                    records = log_reader.tail(lines, level, contains)
+                else:
+                    limit = int_param(params, 'limit', 0, minimum=0) or None
+                    records = log_reader.query(since, until, level, contains, limit)
+                self._send_ndjson_stream({k: v for k, v in r.items() if k != 'raw'} for r in records)
+
+            # Route: GET /jobs
+            elif path == '/jobs':
+                self._send_json({'jobs': jobs.list(), 'success': True})
+
+            # Route: GET /jobs/<id>
+            elif path.startswith('/jobs/'):
+                job = jobs.get(path[len('/jobs/'):])
+                if job is None:
+                    self._send_error_json('Job not found', 404)
+                else:
+                    self._send_json(dict(job.to_dict(), success=True))
+
+            # Route: GET /profile, /profile/sample, /profile/tracemalloc
+            elif path in PROFILE_ROUTES:
+                self._forward_profile('GET', parsed.query)
+
+            # Route: GET /logs/follow
+            elif path == '/logs/follow':
+                level = params.get('level', [''])[0].upper() or None
+                if level and level not in LOG_LEVELS:
+                    self._send_error_json(f"Invalid level - use one of {', '.join(LOG_LEVELS)}", 400)
+                    return
+                self._stream_follow(level, params.get('q', [''])[0] or None)
+
             else:
                 self._send_error_json('Not found', 404)
 
+        except InvalidParameterError as e:
+            self._send_error_json(str(e), 400)
         except Exception as e:
             logger.error(f"Error handling GET request: {e}\n{traceback.format_exc()}")
             self._send_error_json(str(e))
@@ -238,106 +1169,42 @@ class ControlAPIHandler(BaseHTTPRequestHandler):
             # Require confirmation for control operations
             confirm = data.get('confirm', False)
 
-            # Route: POST /start
-            if path == '/start':
+            # Route: POST /start, /stop, /restart, /upgrade
+            if path in CONTROL_OPERATIONS:
+                operation, label, fn = CONTROL_OPERATIONS[path]
                 if not confirm:
-                    self._send_error_json('Start requires {"confirm": true}', 400)
+                    self._send_error_json(f'{label} requires {{"confirm": true}}', 400)
                     return
 
-                logger.info("Starting main API server")
-                result = run_command(f'svc -u {SERVICE_PATH}')
-
-                if result['success']:
-                    time.sleep(1)  # Wait for service to start
-                    status = get_service_status()
-                    self._send_json({
-                        'message': 'Start command sent',
-                        'running': status['running'],
-                        'pid': status['pid'],
-                        'success': True
-                    })
-                else:
-                    self._send_error_json(f"Failed to start: {result['stderr']}", 500)
-
-            # Route: POST /stop
-            elif path == '/stop':
-                if not confirm:
-                    self._send_error_json('Stop requires {"confirm": true}', 400)
+                if operation == 'upgrade' and not os.path.exists(os.path.join(INSTALL_DIR, '.git')):
+                    self._send_error_json('Not a git repository - manual upgrade required', 400)
                     return
 
-                logger.info("Stopping main API server")
-                result = run_command(f'svc -d {SERVICE_PATH}')
-
-                if result['success']:
-                    time.sleep(1)  # Wait for service to stop
-                    status = get_service_status()
+                job, active = jobs.submit(operation, fn)
+                if job is None:
                     self._send_json({
-                        'message': 'Stop command sent',
-                        'running': status['running'],
-                        'success': True
-                    })
-                else:
-                    self._send_error_json(f"Failed to stop: {result['stderr']}", 500)
-
-            # Route: POST /restart
-            elif path == '/restart':
-                if not confirm:
-                    self._send_error_json('Restart requires {"confirm": true}', 400)
+                        'error': f'Another operation is in progress: {active.operation}',
+                        'job': active.to_dict(),
+                        'success': False
+                    }, 409)
                     return
 
-                logger.info("Restarting main API server")
-                # Use svc -k (SIGKILL) + svc -u to force restart (SIGTERM may not work reliably)
-                run_command(f'svc -k {SERVICE_PATH}')
-                time.sleep(1)
-                result = run_command(f'svc -u {SERVICE_PATH}')
-
-                if result['success']:
-                    time.sleep(2)  # Wait for service to restart
-                    status = get_service_status()
+                if data.get('wait'):
+                    job.done.wait(JOB_WAIT_TIMEOUT)
+                    self._send_json(dict(job.to_dict(), success=job.state == 'succeeded'),
+                                    200 if job.state != 'failed' else 500)
+                else:
                     self._send_json({
-                        'message': 'Restart completed',
-                        'running': status['running'],
-                        'pid': status['pid'],
-                        'uptime_seconds': status['uptime_seconds'],
+                        'message': f'{label} started',
+                        'job_id': job.id,
+                        'state': job.state,
+                        'status_url': f'/jobs/{job.id}',
                         'success': True
-                    })
-                else:
-                    self._send_error_json(f"Failed to restart: {result['stderr']}", 500)
-
-            # Route: POST /upgrade
-            elif path == '/upgrade':
-                if not confirm:
-                    self._send_error_json('Upgrade requires {"confirm": true}', 400)
-                    return
-
-                logger.info("Upgrading main API server")
-
-                # Check if git repo exists
-                if not os.path.exists(os.path.join(INSTALL_DIR, '.git')):
-                    self._send_error_json('Not a git repository - manual upgrade required', 400)
-                    return
+                    }, 202)
 
-                # Git pull
-                pull_result = run_command(f'cd {INSTALL_DIR} && git pull', timeout=60)
-
-                if not pull_result['success']:
-                    self._send_error_json(f"Git pull failed: {pull_result['stderr']}", 500)
-                    return
-
-                # Restart service (use SIGKILL + svc -u for reliability)
-                run_command(f'svc -k {SERVICE_PATH}')
-                time.sleep(1)
-                run_command(f'svc -u {SERVICE_PATH}')
-                time.sleep(2)
-
-                status = get_service_status()
-                self._send_json({
-                    'message': 'Upgrade completed',
-                    'git_output': pull_result['stdout'],
-                    'running': status['running'],
-                    'pid': status['pid'],
-                    'success': True
-                })
+            # Route: POST /profile, /profile/sample, /profile/tracemalloc
+            elif path in PROFILE_ROUTES:
+                self._forward_profile('POST', data=data)
 
             else:
                 self._send_error_json('Not found', 404)
@@ -357,22 +1224,28 @@ def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
         # Set start time
         ControlAPIHandler.start_time = time.time()
 
-        # Create server
-        server = HTTPServer((host, port), ControlAPIHandler)
+        # Create server (threaded so log streams don't block status requests)
+        server = ThreadingHTTPServer((host, port), ControlAPIHandler)
+        server.daemon_threads = True
         logger.info(f"Starting Victron DBus API Control Server v{VERSION} on {host}:{port}")
         logger.info(f"Managing service: {SERVICE_PATH}")
 
+        # Sample resource usage continuously, not only when /metrics is polled
+        resource_sampler.start()
+
         # Handle shutdown gracefully
         def signal_handler(sig, frame):
             logger.info("Shutting down control server (signal)...")
-            server.shutdown()
-            sys.exit(0)
+            # shutdown() waits for serve_forever() to return, which runs on this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
 
         # Start server
         server.serve_forever()
+        server.server_close()
+        sys.exit(0)
 
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
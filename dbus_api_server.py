@@ -11,18 +11,31 @@ Safety Features:
 Server management (start/stop/restart) is handled by dbus_api_control.py on port 8089
 """
 
-import dbus
+import grp
+import heapq
 import json
 import logging
+import operator
 import os
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import queue
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse, parse_qs
+from collections import OrderedDict, deque
+from fnmatch import fnmatchcase
 import sys
 import signal
+import socket
+import stat
+import tempfile
+import threading
 import traceback
 import time
 from datetime import datetime
 
+# Imported in DBusInterface.connect() - loading dbus-python is the slowest
+# part of startup and must not delay binding the HTTP socket
+dbus = None
+
 # Configuration
 VERSION = '3.2.0'
 DEFAULT_PORT = 8088
@@ -30,6 +43,196 @@ DEFAULT_HOST = '0.0.0.0'
 CONFIG_DIR = '/data/dbus-api'
 CONFIG_FILE = os.path.join(CONFIG_DIR, 'config.json')
 
+# DBus connection retry backoff (seconds) while the system bus is not ready
+DBUS_CONNECT_BACKOFF_INITIAL = 0.5
+DBUS_CONNECT_BACKOFF_MAX = 30
+# Device inventory: identity paths probed once per service, and the minimum
+# interval between checks for services that appeared or disappeared
+INVENTORY_PATHS = [
+    ('/DeviceInstance', 'device_instance'),
+    ('/ProductId', 'product_id'),
+    ('/ProductName', 'product_name'),
+    ('/Serial', 'serial'),
+    ('/FirmwareVersion', 'firmware_version'),
+    ('/CustomName', 'custom_name'),
+    ('/Mgmt/Connection', 'connection'),
+    ('/DeviceType', 'device_type'),
+]
+# Re-read on every inventory check for devices that have them
+INVENTORY_LIVE_PATHS = [
+    ('/Ac/ActiveIn/Source', 'active_input'),
+]
+INVENTORY_REFRESH_SECONDS = 5
+# Graceful reload (SIGHUP / svc -h): in-flight requests get DRAIN_TIMEOUT to
+# finish, then the process re-execs itself on the same listening socket and
+# re-reads up to CACHE_WARM_MAX_KEYS hot cache keys before accepting traffic
+DRAIN_TIMEOUT = 10
+CACHE_WARM_MAX_KEYS = 200
+CACHE_WARM_TIMEOUT = 3
+LISTEN_BACKLOG = 128  # Connections queued while draining / reloading
+# Optional Unix domain socket listener (--unix-socket) for on-device clients:
+# no TCP/IP stack per request, and who may connect is decided by the socket
+# file's owner, group and mode instead of the network
+UNIX_SOCKET_PATH = '/var/run/dbus-api/api.sock'  # Also where dbus_api_control.py looks for it
+UNIX_SOCKET_MODE = 0o660  # Owner and group may connect
+UNIX_CLIENT = 'unix'  # client address of Unix socket connections (rate limits, /debug, logs)
+KEEPALIVE_TIMEOUT = 5  # Idle seconds before a keep-alive connection is closed
+BATCH_MAX_ITEMS = 500  # Paths per POST /values request
+# Routes served before the DBus connection is ready
+DBUS_FREE_ROUTES = ('/health', '/config', '/debug/profile', '/debug/profile/sample', '/debug/profile/tracemalloc')
+
+# Read cache: TTL in seconds per path pattern (fnmatch, first match wins).
+# None = never expires, 0 = never cached. Override via config key "cache".
+CACHE_TTL_RULES = [
+    ('/SwitchableOutput/*', 0),  # AI_write switch state must always be read live
+    ('/Serial', None),
+    ('/ProductId', None),
+    ('/DeviceInstance', None),
+    ('/FirmwareVersion', 60),
+    ('/ProductName', 60),
+    ('*/Power', 1),
+    ('*', 1),
+]
+CACHE_MAX_BYTES = 1024 * 1024
+CACHE_ENTRY_OVERHEAD = 200  # Approximate bytes per entry (key tuple, bookkeeping)
+FLIGHT_METRICS_MAX_KEYS = 500  # Per-key DBus call metrics kept (least recent dropped)
+
+# DBus call timeouts adapt to observed latency per service and method
+# (smoothed RTT + 4 * deviation, as for TCP retransmits) within these bounds.
+DBUS_TIMEOUT_INITIAL = 5.0
+DBUS_TIMEOUT_MIN = 1.0
+DBUS_TIMEOUT_MAX = 10.0
+# Circuit breaker: open after N consecutive failures, probe again after reset time
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 30
+BREAKER_ERRORS = (
+    'org.freedesktop.DBus.Error.NoReply',
+    'org.freedesktop.DBus.Error.Timeout',
+    'org.freedesktop.DBus.Error.TimedOut',
+    'org.freedesktop.DBus.Error.Disconnected',
+)
+
+# Delta sync: observed value changes kept for clients resuming from a sequence
+CHANGE_LOG_SIZE = 10000
+NDJSON_BATCH_LINES = 200  # Lines per write when streaming deltas
+
+# Energy: power paths integrated into Wh counters and per-interval aggregates.
+# Override the paths via config key "energy": {"paths": {name: {"service", "path"}}}.
+ENERGY_DEFAULT_PATHS = {
+    'ac_consumption_l1': {'service': 'com.victronenergy.system', 'path': '/Ac/Consumption/L1/Power'},
+    'battery': {'service': 'com.victronenergy.system', 'path': '/Dc/Battery/Power'},
+}
+ENERGY_SAMPLE_SECONDS = 1  # Matches the ~1 s update rate of Victron power paths
+ENERGY_MAX_GAP_SECONDS = 30  # Longer gaps between samples are not integrated
+ENERGY_RESOLUTIONS = {'1m': (60, 180), '15m': (900, 96), '1h': (3600, 168)}  # bucket seconds, buckets kept
+ENERGY_STATE_FILE = os.path.join(CONFIG_DIR, 'energy.json')
+ENERGY_SAVE_SECONDS = 300  # Persist interval (flash wear), plus on shutdown/reload
+
+# Rate limiting: token bucket per (client IP, route) with the budget of the
+# route's class (exempt clients skip it), plus fair (round-robin) scheduling
+# of all requests onto a limited number of concurrent slots. Override via
+# config key "rate_limit".
+RATE_LIMIT_DEFAULTS = {
+    'enabled': True,
+    'exempt': ['127.0.0.1', '::1', UNIX_CLIENT],  # No token buckets: Node-RED, control server, local tools
+    'classes': {
+        'cheap': {'rate': 20, 'burst': 40},  # Requests per second, bucket size
+        'expensive': {'rate': 0.5, 'burst': 5},
+    },
+    'routes': {  # Everything else is "cheap"
+        'GET /settings': 'expensive',
+        'GET /devices': 'expensive',
+        'GET /changes': 'expensive',
+        'GET /journal': 'expensive',
+        'POST /value': 'expensive',
+        'POST /values': 'expensive',
+        'POST /config': 'expensive',
+        'PATCH /config': 'expensive',
+        'POST /webhooks': 'expensive',
+    },
+    'max_concurrent': 8,  # Requests served at once, others wait in turn
+    'reserved': {'critical': 2, 'high': 2},  # Slots lower lanes may not take
+    'queue_timeout': 10,  # Seconds a queued request waits before 503
+    'priority_paths': [],  # Extra {"service", "path", "priority"} entries
+}
+RATE_LIMIT_MAX_BUCKETS = 10000  # Full (idle) buckets are pruned beyond this
+
+# Priority lanes: a request's lane comes from the priority of the DBus path it
+# targets (QUICK_REFERENCE_DIAGNOSTIC_PATHS.json plus config) or an
+# X-Priority header. Waiting requests are served lane by lane, and slots
+# reserved for higher lanes keep alarm reads fast during bulk exports.
+PRIORITY_LANES = ('critical', 'high', 'medium')  # Highest first
+PRIORITY_DEFAULT = 'medium'
+PRIORITY_HEADER = 'X-Priority'
+PRIORITY_PATHS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'QUICK_REFERENCE_DIAGNOSTIC_PATHS.json')
+PRIORITY_ROUTES = {'GET /health': 'critical'}  # Liveness checks during reloads
+
+# Profiling (off until switched on via the control server, which forwards
+# to the loopback-only /debug/profile routes)
+DEBUG_CLIENTS = ('127.0.0.1', '::1', UNIX_CLIENT)
+PROFILE_MAX_REQUESTS = 1000  # Upper bound for "profile the next N requests"
+PROFILE_RECENT_REQUESTS = 50  # Profiled request lines kept with their duration
+PROFILE_STATS_LIMIT = 30  # Functions listed per report
+SAMPLER_INTERVAL = 0.01  # Seconds between stack samples
+SAMPLER_MAX_SECONDS = 600
+TRACEMALLOC_FRAMES = 1  # Frames stored per allocation (more = slower, more memory)
+TRACEMALLOC_MAX_FRAMES = 25
+
+# Response encodings negotiated via Accept. JSON is the default; MessagePack
+# and CBOR are offered when the optional msgpack / cbor2 packages are
+# installed (imported on first use, like dbus)
+JSON_MEDIA_TYPE = 'application/json'
+BINARY_MEDIA_TYPES = {
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack',
+    'application/vnd.msgpack': 'msgpack',
+    'application/cbor': 'cbor2',
+}
+
+# Webhooks: POST a JSON event to a callback URL when a watched path changes
+# or a condition on it starts/stops holding. Registered via /webhooks and
+# stored under config key "webhooks".
+WEBHOOK_POLL_SECONDS = 2  # Default read interval of watched paths
+WEBHOOK_QUEUE_SIZE = 500  # Undelivered events kept in memory (new ones dropped beyond)
+WEBHOOK_WORKERS = 2  # Concurrent deliveries
+WEBHOOK_TIMEOUT = 5  # Seconds per delivery attempt
+WEBHOOK_RETRIES = 5  # Attempts after the first (network errors, 5xx, 408, 429)
+WEBHOOK_BACKOFF = 2  # Seconds before the first retry, doubled per attempt
+WEBHOOK_BACKOFF_MAX = 300
+WEBHOOK_SECRET_MASK = '********'  # Shown instead of secrets in config responses
+WEBHOOK_CONDITIONS = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt,
+    '>=': operator.ge, '==': operator.eq, '!=': operator.ne,
+}
+
+# Write journal: append-only NDJSON of every write attempt, group committed
+JOURNAL_FILE = os.path.join(CONFIG_DIR, 'writes.jsonl')
+JOURNAL_MAX_BYTES = 512 * 1024  # Rotated to writes.jsonl.1 beyond this size
+JOURNAL_QUEUE_SIZE = 1000  # Entries waiting for commit (dropped, not blocking, beyond)
+JOURNAL_COMMIT_DELAY = 0.2  # Seconds to gather entries into one fsync
+JOURNAL_PAGE_SIZE = 50
+
+# Views: named groups of paths kept materialized in the background.
+# Fields are refreshed every poll_interval_seconds (default below).
+VIEW_REFRESH_SECONDS = 2
+VIEW_TICK_SECONDS = 0.5
+
+# Write validation: per-path DBus type and min/max, cached for this long
+PATH_METADATA_TTL = 300
+PATH_METADATA_MAX_ENTRIES = 1000  # Non-settings paths; the whole settings tree is kept on top
+SETTINGS_SERVICE = 'com.victronenergy.settings'
+# Value range of each DBus integer type
+DBUS_INTEGER_RANGES = {
+    'Byte': (0, 2 ** 8 - 1),
+    'Int16': (-2 ** 15, 2 ** 15 - 1),
+    'UInt16': (0, 2 ** 16 - 1),
+    'Int32': (-2 ** 31, 2 ** 31 - 1),
+    'UInt32': (0, 2 ** 32 - 1),
+    'Int64': (-2 ** 63, 2 ** 63 - 1),
+    'UInt64': (0, 2 ** 64 - 1),
+}
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,18 +241,846 @@ logging.basicConfig(
 logger = logging.getLogger('DBusAPIServer')
 
 
+def merge_patch(target, patch):
+    """Apply a JSON merge patch (RFC 7386) to target
+
+    Returns: New document; target is not modified
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def redact_config(config):
+    """Copy of config for responses, with webhook secrets masked"""
+    webhooks = config.get('webhooks')
+    if not isinstance(webhooks, dict):
+        return config
+    return dict(config, webhooks={
+        name: dict(spec, secret=WEBHOOK_SECRET_MASK) if isinstance(spec, dict) and spec.get('secret') else spec
+        for name, spec in webhooks.items()})
+
+
+def restore_masked_secrets(config, stored):
+    """Put stored webhook secrets back where a client sent the mask
+
+    Lets clients write back what GET /config returned (config may also be
+    a merge patch) without replacing secrets by the mask. config is
+    modified in place.
+    """
+    webhooks = config.get('webhooks')
+    stored_webhooks = stored.get('webhooks') if isinstance(stored.get('webhooks'), dict) else {}
+    if not isinstance(webhooks, dict):
+        return config
+    for name, spec in webhooks.items():
+        if isinstance(spec, dict) and spec.get('secret') == WEBHOOK_SECRET_MASK:
+            stored_spec = stored_webhooks.get(name)
+            if isinstance(stored_spec, dict) and stored_spec.get('secret'):
+                spec['secret'] = stored_spec['secret']
+            else:
+                del spec['secret']
+    return config
+
+
+_binary_encoders = {}  # module name -> encode function, None if not installed
+
+
+def binary_encoder(media_type):
+    """Encoder for a binary media type
+
+    Both keep ints and floats (as 64-bit doubles) exactly as
+    _convert_dbus_value produced them.
+
+    Returns: Function data -> bytes, or None if the library is not installed
+    """
+    module = BINARY_MEDIA_TYPES[media_type]
+    if module not in _binary_encoders:
+        try:
+            if module == 'msgpack':
+                import msgpack
+                _binary_encoders[module] = lambda data: msgpack.packb(data, use_bin_type=True)
+            else:
+                import cbor2
+                _binary_encoders[module] = cbor2.dumps
+        except ImportError:
+            logger.info(f"{module} not installed - {media_type} responses unavailable")
+            _binary_encoders[module] = None
+    return _binary_encoders[module]
+
+
+def negotiate_encoding(accept):
+    """Pick the response encoding from an Accept header
+
+    Media types are tried by descending q value; wildcards, unknown types
+    and binary types whose library is missing fall back to JSON.
+
+    Returns: (media_type, encode function or None for JSON)
+    """
+    accept = (accept or '').lower()
+    if 'msgpack' not in accept and 'cbor' not in accept:
+        return JSON_MEDIA_TYPE, None
+    ranges = []
+    for position, part in enumerate(accept.split(',')):
+        media_type, *options = [token.strip() for token in part.split(';')]
+        q = 1.0
+        for option in options:
+            if option.startswith('q='):
+                try:
+                    q = float(option[2:])
+                except ValueError:
+                    q = 0
+        ranges.append((-q, position, media_type))
+    for negative_q, _, media_type in sorted(ranges):
+        if negative_q >= 0:
+            break
+        if media_type in BINARY_MEDIA_TYPES:
+            encode = binary_encoder(media_type)
+            if encode is not None:
+                return media_type, encode
+        elif media_type in (JSON_MEDIA_TYPE, 'application/*', '*/*'):
+            break
+    return JSON_MEDIA_TYPE, None
+
+
+class InvalidParameterError(ValueError):
+    """A query parameter could not be parsed (answered with 400)"""
+
+
+def int_param(params, name, default=None):
+    """Return query parameter name (from parse_qs) as int, default if missing or empty
+
+    Raises: InvalidParameterError
+    """
+    value = params.get(name, [''])[0]
+    if value == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidParameterError(f'{name} must be an integer, got {value!r}')
+
+
+def parse_time_param(value):
+    """Parse a time query parameter (Unix seconds or ISO 8601 local time)"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON so a power cut leaves either the old or the new file
+
+    Temp file in the same directory, fsync, rename, fsync of the directory.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-', suffix='.tmp', dir=directory)
+    try:
+        # mkstemp creates 0600; keep the file readable like before
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    # Persist the rename itself
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+class ConfigStore:
+    """Stored agent configuration, served from memory
+
+    The file is parsed once and re-read only when its mtime or size
+    changes (e.g. edited by hand). Writes are serialized and atomic
+    (write_json_atomic). Subscribers are called with the new
+    configuration after every change, one change at a time and in write
+    order: each change gets a generation number, and a notification
+    overtaken by a newer one is dropped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._config = {}
+        self._signature = None
+        self._listeners = []
+        self._generation = 0  # Bumped on every change of _config
+        self._notify_lock = threading.RLock()  # Reentrant: listeners may read the config
+        self._notified = 0  # Generation subscribers last saw
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def get(self):
+        """Return the current configuration
+
+        Returns: Tuple (config dict, exists)
+        """
+        with self._lock:
+            changed = self._reload_if_changed()
+            config, exists, generation = self._config, self._signature is not None, self._generation
+        if changed:
+            self._notify(config, generation)
+        return json.loads(json.dumps(config)), exists
+
+    def replace(self, config):
+        """Atomically replace the whole configuration"""
+        with self._lock:
+            generation = self._write(config)
+        self._notify(config, generation)
+        return config
+
+    def patch(self, patch):
+        """Atomically apply a JSON merge patch
+
+        Returns: The merged configuration
+        """
+        with self._lock:
+            self._reload_if_changed()
+            config = merge_patch(self._config, patch)
+            generation = self._write(config)
+        self._notify(config, generation)
+        return config
+
+    def update(self, fn):
+        """Atomically replace the configuration with fn(copy of config)
+
+        Returns: The new configuration
+        """
+        with self._lock:
+            self._reload_if_changed()
+            config = fn(json.loads(json.dumps(self._config)))
+            generation = self._write(config)
+        self._notify(config, generation)
+        return config
+
+    def _reload_if_changed(self):
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self._signature:
+            return False
+        config = {}
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    config = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to load config {self.path}: {e}")
+        self._config = config
+        self._signature = signature
+        self._generation += 1
+        return True
+
+    def _write(self, config):
+        """Write config to the file (lock held)
+
+        Returns: Generation of the new configuration
+        """
+        write_json_atomic(self.path, config)
+        st = os.stat(self.path)
+        self._config = config
+        self._signature = (st.st_mtime_ns, st.st_size)
+        self._generation += 1
+        return self._generation
+
+    def _notify(self, config, generation):
+        """Call subscribers unless a newer configuration was already announced"""
+        with self._notify_lock:
+            if generation <= self._notified:
+                return
+            self._notified = generation
+            for callback in self._listeners:
+                try:
+                    callback(config if isinstance(config, dict) else {})
+                except Exception as e:
+                    logger.error(f"Config listener failed: {e}")
+
+
+config_store = ConfigStore(CONFIG_FILE)
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when calls to a service are short-circuited by its breaker"""
+
+    def __init__(self, service, retry_after):
+        super().__init__(f"Service {service} is not responding (circuit open, retry in {retry_after}s)")
+        self.service = service
+        self.retry_after = retry_after
+
+
+class WriteValidationError(ValueError):
+    """Raised when a write does not match the path's type or limits"""
+
+    def __init__(self, message, metadata):
+        super().__init__(message)
+        self.metadata = metadata
+
+
+def coerce_write_value(value, metadata, strict_type=True):
+    """Validate a JSON value against path metadata and convert it to the DBus type
+
+    Paths with an unknown type (e.g. currently invalid/empty) are passed
+    through unchanged and left to SetValue. With strict_type=False the
+    type only tells numbers from other values: velib services type a
+    value by its current content (0 -> Int32, 12.5 -> Double), so any
+    number is accepted, checked against min/max and sent as is.
+
+    Returns: Value wrapped in the path's dbus type (plain number if not strict)
+    Raises: WriteValidationError
+    """
+    type_name = metadata.get('type')
+    numeric = type_name in DBUS_INTEGER_RANGES or type_name == 'Double'
+    if numeric and not strict_type:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise WriteValidationError(f"Expected a number, got {type(value).__name__}", metadata)
+    elif type_name in DBUS_INTEGER_RANGES:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise WriteValidationError(f"Expected an integer ({type_name}), got {type(value).__name__}", metadata)
+        value = int(value)
+        low, high = DBUS_INTEGER_RANGES[type_name]
+        if not low <= value <= high:
+            raise WriteValidationError(f"Value {value} does not fit {type_name}", metadata)
+    elif type_name == 'Double':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise WriteValidationError(f"Expected a number, got {type(value).__name__}", metadata)
+        value = float(value)
+    elif type_name == 'Boolean':
+        if value not in (0, 1):
+            raise WriteValidationError("Expected a boolean (true/false or 0/1)", metadata)
+        value = bool(value)
+    elif type_name == 'String':
+        if not isinstance(value, str):
+            raise WriteValidationError(f"Expected a string, got {type(value).__name__}", metadata)
+    else:
+        return value
+
+    minimum, maximum = metadata.get('min'), metadata.get('max')
+    if numeric:
+        if minimum is not None and value < minimum:
+            raise WriteValidationError(f"Value {value} is below minimum {minimum}", metadata)
+        if maximum is not None and value > maximum:
+            raise WriteValidationError(f"Value {value} is above maximum {maximum}", metadata)
+        if not strict_type:
+            return value
+    return getattr(dbus, type_name)(value)
+
+
+class CircuitBreaker:
+    """Circuit breaker and adaptive call timeouts for one DBus service
+
+    closed -> open after BREAKER_FAILURE_THRESHOLD consecutive timeouts;
+    open -> half_open after BREAKER_RESET_SECONDS, letting a single probe
+    call through; the probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, service):
+        self.service = service
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probing = False
+        self._rtt = {}  # method -> {'srtt', 'rttvar', 'timeout'}
+
+    def before_call(self):
+        """Raise ServiceUnavailableError unless a call may proceed"""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + BREAKER_RESET_SECONDS - time.monotonic()
+                if remaining > 0:
+                    raise ServiceUnavailableError(self.service, int(remaining) + 1)
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise ServiceUnavailableError(self.service, 1)
+                self._probing = True
+
+    def timeout_for(self, method):
+        """Current reply timeout in seconds for method"""
+        with self._lock:
+            rtt = self._rtt.get(method)
+            return rtt['timeout'] if rtt else DBUS_TIMEOUT_INITIAL
+
+    def record_success(self, method, elapsed):
+        """Service replied (even with an error reply) after elapsed seconds"""
+        with self._lock:
+            rtt = self._rtt.get(method)
+            if rtt is None or rtt['srtt'] is None:
+                rtt = self._rtt[method] = {'srtt': elapsed, 'rttvar': elapsed / 2}
+            else:
+                rtt['rttvar'] = 0.75 * rtt['rttvar'] + 0.25 * abs(rtt['srtt'] - elapsed)
+                rtt['srtt'] = 0.875 * rtt['srtt'] + 0.125 * elapsed
+            rtt['timeout'] = min(max(rtt['srtt'] + 4 * rtt['rttvar'], DBUS_TIMEOUT_MIN), DBUS_TIMEOUT_MAX)
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit closed for {self.service}")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self, method, error):
+        """Service did not reply (timeout, disconnect)"""
+        with self._lock:
+            rtt = self._rtt.setdefault(method, {'srtt': None, 'rttvar': None, 'timeout': DBUS_TIMEOUT_INITIAL})
+            rtt['timeout'] = min(rtt['timeout'] * 2, DBUS_TIMEOUT_MAX)
+            self.failures += 1
+            self.last_error = str(error)
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= BREAKER_FAILURE_THRESHOLD:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened for {self.service} after {self.failures} failures: {error}")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def abort_call(self):
+        """Call failed locally (not a service failure) - release the probe slot"""
+        with self._lock:
+            self._probing = False
+
+    def status(self):
+        """Return breaker state for /health"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'last_error': self.last_error,
+                'timeouts': {m: round(r['timeout'], 3) for m, r in self._rtt.items()}
+            }
+
+
+class SingleFlight:
+    """Deduplicate identical concurrent calls
+
+    While a call for a key is in flight, further callers with the same key
+    wait for it and share its result (or exception) instead of issuing their
+    own. Per-key call counts and latencies are kept for the metrics endpoint.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self, max_keys=FLIGHT_METRICS_MAX_KEYS):
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Call
+        self._metrics = OrderedDict()  # key -> dict
+        self.max_keys = max_keys
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key"""
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = self._Call()
+            else:
+                self._metric(key)['shared'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        started = time.monotonic()
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            elapsed_ms = (time.monotonic() - started) * 1000
+            with self._lock:
+                self._inflight.pop(key, None)
+                metric = self._metric(key)
+                metric['calls'] += 1
+                metric['errors'] += call.error is not None
+                metric['total_ms'] += elapsed_ms
+                metric['max_ms'] = max(metric['max_ms'], elapsed_ms)
+                metric['last_ms'] = elapsed_ms
+            call.event.set()
+
+    def stats(self, top=None):
+        """Return per-key metrics, slowest total time first"""
+        with self._lock:
+            rows = []
+            for (method, service, path), m in self._metrics.items():
+                rows.append({
+                    'method': method,
+                    'service': service,
+                    'path': path,
+                    'calls': m['calls'],
+                    'shared': m['shared'],
+                    'errors': m['errors'],
+                    'avg_ms': round(m['total_ms'] / m['calls'], 2) if m['calls'] else None,
+                    'max_ms': round(m['max_ms'], 2),
+                    'last_ms': round(m['last_ms'], 2),
+                    'total_ms': round(m['total_ms'], 2)
+                })
+            in_flight = len(self._inflight)
+        rows.sort(key=lambda r: r['total_ms'], reverse=True)
+        return {
+            'in_flight': in_flight,
+            'calls': sum(r['calls'] for r in rows),
+            'shared': sum(r['shared'] for r in rows),
+            'keys': rows[:top] if top else rows
+        }
+
+    def _metric(self, key):
+        """Get or create metrics for key (lock held)"""
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics[key] = {
+                'calls': 0, 'shared': 0, 'errors': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0
+            }
+            while len(self._metrics) > self.max_keys:
+                self._metrics.popitem(last=False)
+        else:
+            self._metrics.move_to_end(key)
+        return metric
+
+
+class ReadCache:
+    """Shared LRU cache for DBus reads with per-path TTLs
+
+    Entries are evicted least-recently-used first once the approximate
+    memory use exceeds max_bytes. Concurrent misses are not stored twice:
+    loaders go through the DBusInterface single-flight, so identical
+    misses share one DBus call.
+    """
+
+    def __init__(self, ttl_rules=None, max_bytes=CACHE_MAX_BYTES):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ttl_rules = list(ttl_rules if ttl_rules is not None else CACHE_TTL_RULES)
+        self.max_bytes = max_bytes
+
+    def configure(self, cache_config):
+        """Apply the "cache" section of the stored configuration
+
+        Format: {"ttls": {"<path pattern>": seconds or null}, "max_bytes": N}
+        Configured patterns take precedence over the built-in rules.
+        A missing section restores the built-in rules. Rules with a TTL
+        that is not null or a number >= 0 are skipped with a warning.
+        """
+        if cache_config is None:
+            cache_config = {}
+        if not isinstance(cache_config, dict):
+            return
+        ttls = cache_config.get('ttls') or {}
+        if not isinstance(ttls, dict):
+            logger.warning(f"Cache TTLs ignored: expected an object, got {type(ttls).__name__}")
+            ttls = {}
+        rules = []
+        for pattern, ttl in ttls.items():
+            if ttl is not None and (isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0):
+                logger.warning(f"Cache TTL rule {pattern!r} ignored: ttl must be null or a number >= 0, got {ttl!r}")
+                continue
+            rules.append((pattern, ttl))
+        max_bytes = cache_config.get('max_bytes')
+        if max_bytes is not None and (isinstance(max_bytes, bool) or not isinstance(max_bytes, int) or max_bytes <= 0):
+            logger.warning(f"Cache max_bytes ignored: must be a positive integer, got {max_bytes!r}")
+            max_bytes = None
+        with self._lock:
+            self.ttl_rules = rules + list(CACHE_TTL_RULES)
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            # Existing entries were stored with the old TTLs
+            self._entries.clear()
+            self._bytes = 0
+        logger.info(f"Read cache configured: {len(rules)} custom TTL rules, max {self.max_bytes} bytes")
+
+    def ttl_for(self, path):
+        """Return TTL for path (None = never expires, 0 = not cached)"""
+        for pattern, ttl in self.ttl_rules:
+            if fnmatchcase(path, pattern):
+                return ttl
+        return 0
+
+    def get_or_load(self, key, path, loader):
+        """Return cached value for key, calling loader() on a miss
+
+        Exceptions raised by loader() are propagated and never cached.
+        """
+        ttl = self.ttl_for(path)
+        if ttl == 0:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self._remove(key)
+            self.misses += 1
+
+        value = loader()
+        if value is not None:
+            expires_at = None if ttl is None else time.monotonic() + ttl
+            with self._lock:
+                self._store(key, value, expires_at)
+        return value
+
+    def invalidate(self, service, path):
+        """Drop cached entries for a path and its ancestors on a service"""
+        with self._lock:
+            for key in list(self._entries):
+                _, key_service, key_path = key
+                if key_service != service:
+                    continue
+                if key_path == path or key_path == '/' or path.startswith(key_path.rstrip('/') + '/'):
+                    self._remove(key)
+
+    def purge_service(self, service):
+        """Drop every cached entry of a service (it vanished or was replaced)
+
+        Returns: Number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[1] == service]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def stats(self):
+        """Return hit/miss statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'ttl_rules': [{'pattern': p, 'ttl': t} for p, t in self.ttl_rules]
+            }
+
+    def hot_keys(self, limit):
+        """Return up to limit keys, most recently used first"""
+        with self._lock:
+            keys = list(reversed(self._entries))
+        return keys[:limit]
+
+    def _store(self, key, value, expires_at):
+        """Insert entry and evict LRU entries over the memory cap (lock held)"""
+        size = len(repr(value)) + CACHE_ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Evict least-recently-used entries until under the cap (lock held)"""
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def _remove(self, key):
+        """Remove single entry (lock held)"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class ChangeLog:
+    """Observed value changes stamped with a global monotonic sequence
+
+    Every value read from DBus is recorded; only values that differ from
+    the last observation get a new sequence number. The last
+    CHANGE_LOG_SIZE changes are kept so clients can resume from their last
+    sequence. A client outside that window (or from a previous server
+    process, detected by epoch) gets a full resync of every known value.
+    """
+
+    def __init__(self, size=CHANGE_LOG_SIZE):
+        self._lock = threading.Lock()
+        self.epoch = int(time.time() * 1000)  # Changes on restart/reload
+        self.seq = 0
+        self.latest = {}  # (service, path) -> (seq, value)
+        self.log = deque(maxlen=size)  # (seq, service, path)
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """Call callback(service, path, value, timestamp) for every change"""
+        self._listeners.append(callback)
+
+    def record(self, service, path, value):
+        """Record an observed value
+
+        Returns: The value's current sequence number
+        """
+        key = (service, path)
+        with self._lock:
+            previous = self.latest.get(key)
+            if previous is not None and previous[1] == value:
+                return previous[0]
+            self.seq += 1
+            seq = self.seq
+            self.latest[key] = (seq, value)
+            self.log.append((seq, service, path))
+        now = time.time()
+        for callback in self._listeners:
+            try:
+                callback(service, path, value, now)
+            except Exception as e:
+                logger.error(f"Change listener failed: {e}")
+        return seq
+
+    def seq_for(self, service, path):
+        with self._lock:
+            entry = self.latest.get((service, path))
+            return entry[0] if entry else 0
+
+    def since(self, seq, epoch=None):
+        """Return changes after seq, latest value per path in sequence order
+
+        Returns: Dict with epoch, seq, resync flag and a list of
+                 (seq, service, path, value) tuples
+        """
+        with self._lock:
+            oldest = self.log[0][0] if self.log else self.seq + 1
+            resync = (seq is None or epoch != self.epoch or seq > self.seq or seq < oldest - 1)
+            if resync:
+                changes = sorted((entry_seq, service, path, value)
+                                 for (service, path), (entry_seq, value) in self.latest.items())
+            else:
+                changes = []
+                for entry_seq, service, path in reversed(self.log):
+                    if entry_seq <= seq:
+                        break
+                    latest_seq, value = self.latest[(service, path)]
+                    if latest_seq == entry_seq:  # Superseded entries are skipped
+                        changes.append((entry_seq, service, path, value))
+                changes.reverse()
+            return {'epoch': self.epoch, 'seq': self.seq, 'resync': resync, 'changes': changes}
+
+    def stats(self):
+        with self._lock:
+            return {'epoch': self.epoch, 'seq': self.seq, 'paths': len(self.latest),
+                    'window': len(self.log), 'oldest_seq': self.log[0][0] if self.log else None}
+
+
 class DBusInterface:
     """Handle DBus system bus interactions"""
 
     def __init__(self):
+        # Connected lazily by connect()/connect_in_background()
+        self.bus = None
+        self.ready = False
+        self.connect_attempts = 0
+        self.last_connect_error = None
+        # AI_write switch discovered on demand (not at startup)
+        self.ai_write_service = None
+        # Shared read cache in front of get_value/get_text
+        self.cache = ReadCache()
+        self.cache.configure(config_store.get()[0].get('cache'))
+        config_store.subscribe(lambda config: self.cache.configure(config.get('cache')))
+        # Identical concurrent DBus reads share one call
+        self.flight = SingleFlight()
+        # Every value read from DBus feeds the delta-sync change log
+        self.changes = ChangeLog()
+        # Per-service circuit breakers and adaptive timeouts
+        self.breakers = {}
+        self._breakers_lock = threading.Lock()
+        # (service, path) -> type/min/max/default used to validate writes
+        self.metadata = OrderedDict()
+        self._settings_metadata_count = 0  # Entries of the last settings GetItems fill
+        self._metadata_lock = threading.Lock()
+
+    def connect(self):
+        """Connect to the DBus system bus
+
+        Returns: True if connected, False on error
+        """
+        global dbus
+        self.connect_attempts += 1
         try:
+            if dbus is None:
+                import dbus as dbus_module
+                dbus = dbus_module
             self.bus = dbus.SystemBus()
+            self.ready = True
             logger.info("Connected to DBus system bus")
-            # AI_write switch discovered on demand (not at startup)
-            self.ai_write_service = None
+            return True
         except Exception as e:
-            logger.error(f"Failed to connect to system bus: {e}")
-            raise
+            self.last_connect_error = str(e)
+            logger.error(f"Failed to connect to system bus (attempt {self.connect_attempts}): {e}")
+            return False
+
+    def connect_in_background(self):
+        """Connect in a background thread, retrying with exponential backoff"""
+        def worker():
+            delay = DBUS_CONNECT_BACKOFF_INITIAL
+            while not self.connect():
+                time.sleep(delay)
+                delay = min(delay * 2, DBUS_CONNECT_BACKOFF_MAX)
+
+        threading.Thread(target=worker, name='dbus-connect', daemon=True).start()
+
+    def warm_cache(self, keys, timeout=CACHE_WARM_TIMEOUT):
+        """Re-read cache keys handed over by the previous process
+
+        Returns: Number of keys loaded before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        loaded = 0
+        for method, service, path in keys:
+            if time.monotonic() >= deadline:
+                break
+            try:
+                if method == 'GetValue':
+                    self.get_value(service, path)
+                elif method == 'GetText':
+                    self.get_text(service, path)
+                loaded += 1
+            except ServiceUnavailableError:
+                continue
+        logger.info(f"Cache warmed with {loaded}/{len(keys)} keys")
+        return loaded
 
     def _find_ai_write_switch(self):
         """Find the AI_write virtual switch service by searching for CustomName='AI_write'"""
@@ -68,6 +1099,59 @@ class DBusInterface:
             logger.error(f"Error finding AI_write switch: {e}")
             return None
 
+    def breaker(self, service):
+        """Get (or create) the circuit breaker for a service"""
+        with self._breakers_lock:
+            breaker = self.breakers.get(service)
+            if breaker is None:
+                breaker = self.breakers[service] = CircuitBreaker(service)
+            return breaker
+
+    def breaker_status(self):
+        """Return state of every service circuit breaker"""
+        with self._breakers_lock:
+            breakers = list(self.breakers.values())
+        return {b.service: b.status() for b in breakers}
+
+    def _invoke(self, service, path, method, *args, interface_name='com.victronenergy.BusItem'):
+        """Invoke a DBus method guarded by the service's circuit breaker
+
+        Raises ServiceUnavailableError without touching DBus while the
+        circuit is open. The reply timeout adapts to observed latency.
+        """
+        breaker = self.breaker(service)
+        breaker.before_call()
+        started = time.monotonic()
+        try:
+            obj = self.bus.get_object(service, path)
+            interface = dbus.Interface(obj, interface_name)
+            result = getattr(interface, method)(*args, timeout=breaker.timeout_for(method))
+        except dbus.exceptions.DBusException as e:
+            if e.get_dbus_name() in BREAKER_ERRORS:
+                breaker.record_failure(method, e)
+            else:
+                # Error reply (unknown path etc.) - the service itself is responsive
+                breaker.record_success(method, time.monotonic() - started)
+            raise
+        except Exception:
+            breaker.abort_call()
+            raise
+        breaker.record_success(method, time.monotonic() - started)
+        return result
+
+    def _call(self, service, path, method, convert, interface_name='com.victronenergy.BusItem', shared=True):
+        """Invoke a read-only DBus method and convert its result
+
+        With shared=True, concurrent callers for the same (service, path,
+        method) wait on one in-flight call and share the converted result.
+        """
+        def invoke():
+            return convert(self._invoke(service, path, method, interface_name=interface_name))
+
+        if not shared:
+            return invoke()
+        return self.flight.do((method, service, path), invoke)
+
     def get_venus_image_type(self):
         """Get Venus OS image type (0=Normal, 1=Large)
 
@@ -147,7 +1231,7 @@ class DBusInterface:
         try:
             # The actual switch state is at /SwitchableOutput/output_1/State (0=OFF, 1=ON)
             # NOT at /State which is just metadata (always 256)
-            state = self.get_value(self.ai_write_service, '/SwitchableOutput/output_1/State')
+            state = self.get_value(self.ai_write_service, '/SwitchableOutput/output_1/State', use_cache=False)
             details['switch_state'] = state
             if state is not None and int(state) == 1:
                 return True, "AI_write is enabled", details
@@ -163,12 +1247,10 @@ class DBusInterface:
         Returns: Dict of settings, or empty dict on error
         """
         try:
-            obj = self.bus.get_object('com.victronenergy.settings', '/')
-            interface = dbus.Interface(obj, 'com.victronenergy.BusItem')
-            items = interface.GetItems()
-
-            # Convert dbus types to Python native types
-            return self._convert_dbus_dict(items)
+            # Converted to Python native types once and shared by concurrent callers
+            return self._call('com.victronenergy.settings', '/', 'GetItems', self._convert_dbus_dict)
+        except ServiceUnavailableError:
+            raise
         except dbus.exceptions.DBusException as e:
             logger.error(f"DBus error getting all settings: {e}")
             return {}
@@ -176,22 +1258,34 @@ class DBusInterface:
             logger.error(f"Unexpected error getting all settings: {e}")
             return {}
 
-    def get_value(self, service, path, raise_on_error=False):
+    def get_value(self, service, path, raise_on_error=False, use_cache=True):
         """Get value from specific dbus path
 
         Args:
             service: DBus service name
             path: DBus object path
             raise_on_error: If True, raises exception on error. If False (default), returns None.
+            use_cache: If False, bypass the read cache and always query DBus.
 
         Returns:
             The value, or None if path doesn't exist or error occurred
         """
+        def load():
+            value = self._call(service, path, 'GetValue', self._convert_dbus_value, shared=use_cache)
+            if path == '/' and isinstance(value, dict):
+                # Root reads return every value of the service at once
+                for sub_path, sub_value in value.items():
+                    self.changes.record(service, '/' + sub_path.lstrip('/'), sub_value)
+            else:
+                self.changes.record(service, path, value)
+            return value
+
         try:
-            obj = self.bus.get_object(service, path)
-            interface = dbus.Interface(obj, 'com.victronenergy.BusItem')
-            value = interface.GetValue()
-            return self._convert_dbus_value(value)
+            if not use_cache:
+                return load()
+            return self.cache.get_or_load(('GetValue', service, path), path, load)
+        except ServiceUnavailableError:
+            raise
         except dbus.exceptions.DBusException as e:
             # Common DBus errors - log at debug level, don't crash
             error_name = getattr(e, '_dbus_error_name', str(e))
@@ -209,22 +1303,27 @@ class DBusInterface:
             return None
 
 
-    def get_text(self, service, path, raise_on_error=False):
+    def get_text(self, service, path, raise_on_error=False, use_cache=True):
         """Get text representation of value
 
         Args:
             service: DBus service name
             path: DBus object path
             raise_on_error: If True, raises exception on error. If False (default), returns None.
+            use_cache: If False, bypass the read cache and always query DBus.
 
         Returns:
             The text value, or None if path doesn't exist or error occurred
         """
+        def load():
+            return self._call(service, path, 'GetText', str, shared=use_cache)
+
         try:
-            obj = self.bus.get_object(service, path)
-            interface = dbus.Interface(obj, 'com.victronenergy.BusItem')
-            text = interface.GetText()
-            return str(text)
+            if not use_cache:
+                return load()
+            return self.cache.get_or_load(('GetText', service, path), path, load)
+        except ServiceUnavailableError:
+            raise
         except dbus.exceptions.DBusException as e:
             error_name = getattr(e, '_dbus_error_name', str(e))
             if 'UnknownObject' in str(e) or 'UnknownMethod' in str(e) or "doesn't exist" in str(e):
@@ -240,20 +1339,116 @@ class DBusInterface:
                 raise
             return None
 
-    def set_value(self, service, path, value):
+    def get_metadata(self, service, path):
+        """Get DBus type, min, max and default of a path (cached)
+
+        Settings come from one GetItems call on the settings tree, shared by
+        concurrent misses; other services are probed with GetValue plus
+        GetMin/GetMax where supported.
+
+        Returns: Dict with type/min/max/default (None where unknown)
+        Raises: DBusException if the path does not exist
+        """
+        key = (service, path)
+        with self._metadata_lock:
+            metadata = self.metadata.get(key)
+            if metadata and time.monotonic() - metadata['fetched_at'] < PATH_METADATA_TTL:
+                return self._public_metadata(metadata)
+
+        if service == SETTINGS_SERVICE:
+            # Own single-flight key: get_all_settings() shares a converted
+            # reply, which has lost the dbus types
+            fetched = self.flight.do(('GetItems (metadata)', service, '/'), lambda: {
+                (service, str(item_path)): self._settings_metadata(item)
+                for item_path, item in self._invoke(service, '/', 'GetItems').items()})
+            if key not in fetched:
+                raise dbus.exceptions.DBusException(f"Path {path} doesn't exist on {service}",
+                                                    name='org.freedesktop.DBus.Error.UnknownObject')
+        else:
+            raw = self._call(service, path, 'GetValue', lambda value: value, shared=False)
+            metadata = {'type': self._dbus_type_name(raw), 'min': None, 'max': None, 'default': None}
+            for method, field in (('GetMin', 'min'), ('GetMax', 'max')):
+                try:
+                    metadata[field] = self._convert_dbus_value(self._invoke(service, path, method))
+                except dbus.exceptions.DBusException:
+                    pass  # Not every BusItem implements limits
+            fetched = {key: metadata}
+
+        now = time.monotonic()
+        with self._metadata_lock:
+            if service == SETTINGS_SERVICE:
+                # Size the cap from the tree, so one fill never evicts itself or all other paths
+                self._settings_metadata_count = len(fetched)
+            for fetched_key, metadata in fetched.items():
+                metadata['fetched_at'] = now
+                self.metadata[fetched_key] = metadata
+                self.metadata.move_to_end(fetched_key)
+            while len(self.metadata) > PATH_METADATA_MAX_ENTRIES + self._settings_metadata_count:
+                self.metadata.popitem(last=False)
+            return self._public_metadata(fetched[key])
+
+    def _settings_metadata(self, item):
+        """Build metadata from one GetItems entry of the settings tree"""
+        minimum = self._convert_dbus_value(item.get('Min'))
+        maximum = self._convert_dbus_value(item.get('Max'))
+        if minimum == 0 and maximum == 0:
+            # localsettings uses min = max = 0 for "no limits"
+            minimum = maximum = None
+        return {
+            'type': self._dbus_type_name(item.get('Value')),
+            'min': minimum,
+            'max': maximum,
+            'default': self._convert_dbus_value(item.get('Default'))
+        }
+
+    def _dbus_type_name(self, value):
+        """Return the dbus type name of a raw value, None for invalid/empty"""
+        for type_name in list(DBUS_INTEGER_RANGES) + ['Double', 'Boolean', 'String']:
+            if isinstance(value, getattr(dbus, type_name)):
+                return type_name
+        return None
+
+    def _public_metadata(self, metadata):
+        return {k: v for k, v in metadata.items() if k != 'fetched_at'}
+
+    def validate_write(self, service, path, value):
+        """Validate and coerce a value before SetValue
+
+        Returns: Value in the path's dbus type (unchanged if metadata is unavailable)
+        Raises: WriteValidationError, ServiceUnavailableError
+        """
+        try:
+            metadata = self.get_metadata(service, path)
+        except ServiceUnavailableError:
+            raise
+        except dbus.exceptions.DBusException as e:
+            logger.debug(f"No metadata for {service}{path}, writing unvalidated: {e}")
+            return value
+        # Only localsettings declares a fixed type per setting
+        return coerce_write_value(value, metadata, strict_type=service == SETTINGS_SERVICE)
+
+    def set_value(self, service, path, value, validate=True):
         """Set value at specific dbus path
 
-        Uses the Victron BusItem SetValue method which validates
-        the value against min/max constraints before writing.
+        The value is first validated against the path's cached type and
+        min/max and sent with the matching dbus type; SetValue still has
+        the final say.
 
         Returns: 0 on success, -1 on error (value out of range, invalid type, etc.)
-        Raises: Exception only for unexpected errors
+        Raises: WriteValidationError if the value is rejected locally,
+                ServiceUnavailableError if the service's circuit is open
         """
+        if validate:
+            value = self.validate_write(service, path, value)
         try:
-            obj = self.bus.get_object(service, path)
-            interface = dbus.Interface(obj, 'com.victronenergy.BusItem')
-            result = interface.SetValue(value)
-            return int(result)
+            result = int(self._invoke(service, path, 'SetValue', value))
+            if result != 0:
+                # Limits may have changed since they were cached
+                with self._metadata_lock:
+                    self.metadata.pop((service, path), None)
+            return result
+        except ServiceUnavailableError:
+            raise
         except dbus.exceptions.DBusException as e:
             logger.warning(f"DBus error setting value at {service}{path}: {e}")
             # Return -1 instead of crashing - let handler decide response
@@ -261,19 +1456,25 @@ class DBusInterface:
         except Exception as e:
             logger.error(f"Unexpected error setting value at {service}{path}: {e}")
             return -1
+        finally:
+            # Drop cached reads regardless of outcome - the value may have changed
+            self.cache.invalidate(service, path)
 
     def list_services(self):
         """List all available dbus services
 
         Returns: List of victron services, or empty list on error
         """
-        try:
-            obj = self.bus.get_object('org.freedesktop.DBus', '/org/freedesktop/DBus')
-            interface = dbus.Interface(obj, 'org.freedesktop.DBus')
-            services = interface.ListNames()
+        def victron_only(services):
             # Filter for victron services
-            victron_services = [s for s in services if 'victron' in s.lower()]
-            return sorted(victron_services)
+            return sorted(str(s) for s in services if 'victron' in s.lower())
+
+        try:
+            services = self._call('org.freedesktop.DBus', '/org/freedesktop/DBus', 'ListNames',
+                                  victron_only, interface_name='org.freedesktop.DBus')
+            return list(services)
+        except ServiceUnavailableError:
+            raise
         except dbus.exceptions.DBusException as e:
             logger.error(f"DBus error listing services: {e}")
             return []
@@ -310,33 +1511,1471 @@ class DBusInterface:
         return result
 
 
+class DeviceInventory:
+    """Device identity joined with settings-derived VRM instances
+
+    Each service is probed for its identity paths only when it first
+    appears; services that disappear are dropped. The ClassAndVrmInstance
+    map from com.victronenergy.settings is re-read only when the set of
+    services changes, so steady-state requests cost a single ListNames.
+    """
+
+    def __init__(self, dbus_interface):
+        self.dbus_interface = dbus_interface
+        self._lock = threading.Lock()
+        self.devices = {}  # service -> device info dict
+        self.vrm_instances = {}  # (class, device_instance) -> {'settings_id', 'vrm_instance'}
+        self.settings_devices = {}  # settings id -> {'class_vrm_instance', 'settings_paths'}
+        self.system = {}
+        self.generation = 0
+        self.updated_at = None
+        self._checked_at = 0
+
+    def refresh(self, force=False):
+        """Probe new services and drop removed ones (rate limited unless force)"""
+        with self._lock:
+            if not force and time.monotonic() - self._checked_at < INVENTORY_REFRESH_SECONDS:
+                return
+            self._checked_at = time.monotonic()
+
+            services = set(self.dbus_interface.list_services())
+            services.discard('com.victronenergy.settings')
+            added = services - set(self.devices)
+            removed = set(self.devices) - services
+            self._refresh_live(services)
+            if not added and not removed and not force:
+                return
+
+            if added or force:
+                self._load_vrm_instances()
+                self.system = {
+                    'serial': self.dbus_interface.get_value('com.victronenergy.system', '/Serial'),
+                    'vrm_portal_id': self.dbus_interface.get_value('com.victronenergy.settings', '/Settings/System/VrmPortalId')
+                }
+            # Identity paths never expire from the read cache, so a device
+            # swapped in under the same service name must not see the old ones
+            for service in removed:
+                del self.devices[service]
+                self.dbus_interface.cache.purge_service(service)
+            for service in added:
+                self.dbus_interface.cache.purge_service(service)
+                try:
+                    self.devices[service] = self._probe(service)
+                except ServiceUnavailableError as e:
+                    # Not recorded, so it is probed again on the next refresh
+                    logger.warning(f"Device inventory skipped {service}: {e}")
+            self._join()
+            self.generation += 1
+            self.updated_at = datetime.now().isoformat()
+            logger.info(f"Device inventory updated: +{len(added)} -{len(removed)} ({len(self.devices)} devices)")
+
+    def snapshot(self):
+        """Return the inventory as a small JSON-ready dict"""
+        with self._lock:
+            return {
+                'system': dict(self.system),
+                'devices': [dict(d) for _, d in sorted(self.devices.items())],
+                'settings_devices': {k: dict(v) for k, v in sorted(self.settings_devices.items())},
+                'count': len(self.devices),
+                'generation': self.generation,
+                'updated_at': self.updated_at
+            }
+
+    def _probe(self, service):
+        """Read identity paths for a newly seen service"""
+        info = {'service': service, 'device_class': service.split('.')[2] if service.count('.') >= 2 else None}
+        for path, key in INVENTORY_PATHS + INVENTORY_LIVE_PATHS:
+            info[key] = self.dbus_interface.get_value(service, path)
+        return info
+
+    def _refresh_live(self, services):
+        """Re-read live paths of known devices that reported them when probed"""
+        for service, info in self.devices.items():
+            if service not in services:
+                continue
+            for path, key in INVENTORY_LIVE_PATHS:
+                if info.get(key) is not None:
+                    try:
+                        info[key] = self.dbus_interface.get_value(service, path)
+                    except ServiceUnavailableError:
+                        pass
+
+    def _load_vrm_instances(self):
+        """Parse /Settings/Devices/* (ClassAndVrmInstance and paths per device id) from the settings tree
+
+        Devices that only exist in settings (not currently connected) are kept in settings_devices.
+        """
+        vrm_instances = {}
+        settings_devices = {}
+        for path, item in self.dbus_interface.get_all_settings().items():
+            parts = path.split('/')
+            if len(parts) < 4 or parts[1:3] != ['Settings', 'Devices']:
+                continue
+            device = settings_devices.setdefault(parts[3], {'class_vrm_instance': None, 'settings_paths': []})
+            device['settings_paths'].append(path)
+            if len(parts) != 5 or parts[4] != 'ClassAndVrmInstance':
+                continue
+            value = item.get('Value') if isinstance(item, dict) else item
+            if value:
+                device['class_vrm_instance'] = value
+            if not isinstance(value, str) or ':' not in value:
+                continue
+            device_class, _, instance = value.partition(':')
+            try:
+                instance = int(instance)
+            except ValueError:
+                continue
+            vrm_instances[(device_class, instance)] = {'settings_id': parts[3], 'vrm_instance': instance}
+        self.vrm_instances = vrm_instances
+        self.settings_devices = settings_devices
+
+    def _join(self):
+        """Attach settings id and VRM instance to each device by (class, DeviceInstance)"""
+        for info in self.devices.values():
+            match = self.vrm_instances.get((info['device_class'], info['device_instance'])) or {}
+            info['settings_id'] = match.get('settings_id')
+            info['vrm_instance'] = match.get('vrm_instance', info['device_instance'])
+
+
+class ViewStore:
+    """Named views of (service, path) groups, kept materialized
+
+    Views are registered under the config key "views" in the same shape
+    as QUICK_REFERENCE_DIAGNOSTIC_PATHS.json categories:
+
+        {"views": {"dashboard": {"battery_soc": {"service": "...", "path": "/Dc/Battery/Soc",
+                                                 "poll_interval_seconds": 10}, ...}}}
+
+    A background thread re-reads each field when its poll interval is due
+    (through the shared read cache). Fields carry the change log sequence
+    of their value, so clients can ask for fields changed since the last
+    sequence they saw.
+    """
+
+    def __init__(self, dbus_interface):
+        self.dbus_interface = dbus_interface
+        self._lock = threading.Lock()
+        self.views = {}  # name -> {field -> state dict}
+
+    def configure(self, views_config):
+        """Apply the "views" section of the stored configuration
+
+        Fields whose (service, path) is unchanged keep their current value.
+        """
+        if not isinstance(views_config, dict):
+            views_config = {}
+        with self._lock:
+            previous = self.views
+            views = {}
+            for name, fields in views_config.items():
+                if not isinstance(fields, dict):
+                    logger.warning(f"View {name} ignored: expected an object of fields")
+                    continue
+                views[name] = {}
+                for field, spec in fields.items():
+                    if not isinstance(spec, dict) or not spec.get('service') or not spec.get('path'):
+                        logger.warning(f"View field {name}.{field} ignored: needs service and path")
+                        continue
+                    state = previous.get(name, {}).get(field)
+                    if not state or (state['service'], state['path']) != (spec['service'], spec['path']):
+                        state = {'service': spec['service'], 'path': spec['path'], 'value': None,
+                                 'seq': 0, 'loaded': False, 'available': False, 'due': 0}
+                    state['interval'] = float(spec.get('poll_interval_seconds') or VIEW_REFRESH_SECONDS)
+                    views[name][field] = state
+            self.views = views
+
+    def start(self):
+        threading.Thread(target=self._run, name='view-refresh', daemon=True).start()
+
+    def names(self):
+        """Return registered views with field counts"""
+        with self._lock:
+            return {name: {'fields': len(fields), 'seq': max((f['seq'] for f in fields.values()), default=0)}
+                    for name, fields in self.views.items()}
+
+    def snapshot(self, name, since=None):
+        """Return a view as a flat {field: value} object
+
+        With since, only fields changed after that sequence are included.
+
+        Returns: Dict, or None if the view does not exist
+        """
+        with self._lock:
+            fields = self.views.get(name)
+            if fields is None:
+                return None
+            pending = [f for f in fields.values() if not f['loaded']]
+        if pending:
+            # First request after registration - don't hand out empty fields
+            self._refresh(pending)
+
+        seq = self.dbus_interface.changes.seq
+        with self._lock:
+            fields = self.views.get(name, {})
+            return {
+                'view': name,
+                'seq': seq,
+                'epoch': self.dbus_interface.changes.epoch,
+                'since': since,
+                'values': {field: f['value'] for field, f in fields.items() if since is None or f['seq'] > since},
+                'unavailable': sorted(field for field, f in fields.items() if not f['available'])
+            }
+
+    def _run(self):
+        while True:
+            try:
+                if self.dbus_interface.ready:
+                    now = time.monotonic()
+                    with self._lock:
+                        due = [f for fields in self.views.values() for f in fields.values() if f['due'] <= now]
+                    self._refresh(due)
+            except Exception as e:
+                logger.error(f"View refresh failed: {e}")
+            time.sleep(VIEW_TICK_SECONDS)
+
+    def _refresh(self, states):
+        """Re-read fields (recorded in the change log by get_value)"""
+        changes = self.dbus_interface.changes
+        for state in states:
+            try:
+                value = self.dbus_interface.get_value(state['service'], state['path'])
+                available = value is not None
+            except ServiceUnavailableError:
+                # Keep the last value while the service's circuit is open
+                value, available = state['value'], False
+            with self._lock:
+                state['due'] = time.monotonic() + state['interval']
+                state['value'] = value
+                state['available'] = available
+                state['seq'] = changes.seq_for(state['service'], state['path'])
+                state['loaded'] = True
+
+
+class EnergyIntegrator:
+    """Integrate power paths (W) into energy counters (Wh)
+
+    Points come from a 1 s sampler and from the change log (any client
+    read), and consecutive points are integrated with the trapezoidal
+    rule. Positive and negative energy are kept apart (e.g. battery
+    charge vs. discharge), splitting segments at the zero crossing.
+    Segments are also split at minute boundaries so every piece falls into
+    exactly one 1 min / 15 min / 1 h bucket. Totals and buckets are saved
+    to ENERGY_STATE_FILE and restored on start.
+    """
+
+    def __init__(self, dbus_interface, state_file=ENERGY_STATE_FILE):
+        self.dbus_interface = dbus_interface
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self.paths = {}  # name -> (service, path)
+        self.meters = {}  # name -> meter state dict
+        self._by_key = {}  # (service, path) -> name
+        self.load()
+
+    def configure(self, energy_config):
+        """Apply the "energy" section of the stored configuration"""
+        paths = ENERGY_DEFAULT_PATHS
+        if isinstance(energy_config, dict) and isinstance(energy_config.get('paths'), dict):
+            paths = energy_config['paths']
+        with self._lock:
+            self.paths = {name: (spec['service'], spec['path']) for name, spec in paths.items()
+                          if isinstance(spec, dict) and spec.get('service') and spec.get('path')}
+            self._by_key = {key: name for name, key in self.paths.items()}
+            for name, (service, path) in self.paths.items():
+                meter = self.meters.get(name)
+                if meter is None or (meter['service'], meter['path']) != (service, path):
+                    self.meters[name] = self._new_meter(service, path)
+
+    def start(self):
+        self.dbus_interface.changes.subscribe(self.on_change)
+        threading.Thread(target=self._run, name='energy', daemon=True).start()
+
+    def on_change(self, service, path, value, timestamp):
+        name = self._by_key.get((service, path))
+        if name is not None:
+            self.observe(name, value, timestamp)
+
+    def observe(self, name, value, timestamp):
+        """Add a power point and integrate the segment since the previous one"""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            value = None  # Invalid / disconnected: stop integrating until valid again
+        with self._lock:
+            meter = self.meters.get(name)
+            if meter is None:
+                return
+            last = meter['last']
+            if last is not None and value is not None and timestamp > last[0]:
+                if timestamp - last[0] <= ENERGY_MAX_GAP_SECONDS:
+                    self._integrate(meter, last[0], last[1], timestamp, value)
+                else:
+                    meter['gap_seconds'] += timestamp - last[0]
+            if last is None or timestamp >= last[0]:
+                meter['last'] = (timestamp, value) if value is not None else None
+                meter['power'] = value
+
+    def report(self, resolution='15m', limit=24):
+        """Return totals and the latest buckets of one resolution per meter"""
+        with self._lock:
+            return {name: {
+                'service': meter['service'],
+                'path': meter['path'],
+                'power_w': meter['power'],
+                'since': datetime.fromtimestamp(meter['since']).isoformat(),
+                'positive_kwh': round(meter['positive_wh'] / 1000, 4),
+                'negative_kwh': round(meter['negative_wh'] / 1000, 4),
+                'net_kwh': round((meter['positive_wh'] - meter['negative_wh']) / 1000, 4),
+                'integrated_seconds': round(meter['covered_seconds'], 1),
+                'gap_seconds': round(meter['gap_seconds'], 1),
+                'buckets': [self._bucket_json(b) for b in list(meter['buckets'][resolution])[-limit:]]
+            } for name, meter in self.meters.items() if name in self.paths}
+
+    def load(self):
+        """Restore counters and buckets saved by a previous process"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read energy state {self.state_file}: {e}")
+            return
+        meters = state.get('meters') if isinstance(state, dict) else None
+        if not isinstance(meters, dict):
+            logger.warning(f"Could not read energy state {self.state_file}: no meters")
+            return
+        for name, saved in meters.items():
+            # A truncated or hand-edited meter is skipped, not fatal at startup
+            try:
+                meter = self._new_meter(saved['service'], saved['path'])
+                for field in ('since', 'positive_wh', 'negative_wh', 'covered_seconds', 'gap_seconds'):
+                    meter[field] = float(saved.get(field, meter[field]))
+                for resolution, buckets in saved.get('buckets', {}).items():
+                    if resolution in meter['buckets']:
+                        meter['buckets'][resolution].extend(tuple(b) for b in buckets)
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                logger.warning(f"Skipped energy meter {name!r} from {self.state_file}: {e!r}")
+                continue
+            self.meters[name] = meter
+        logger.info(f"Energy counters restored for {len(self.meters)} meters")
+
+    def save(self):
+        with self._lock:
+            state = {'saved_at': time.time(), 'meters': {name: {
+                'service': m['service'], 'path': m['path'], 'since': m['since'],
+                'positive_wh': m['positive_wh'], 'negative_wh': m['negative_wh'],
+                'covered_seconds': m['covered_seconds'], 'gap_seconds': m['gap_seconds'],
+                'buckets': {r: list(b) for r, b in m['buckets'].items()}
+            } for name, m in self.meters.items()}}
+        try:
+            write_json_atomic(self.state_file, state, indent=None)
+        except OSError as e:
+            logger.warning(f"Could not save energy state {self.state_file}: {e}")
+
+    def _new_meter(self, service, path):
+        return {
+            'service': service, 'path': path, 'since': time.time(), 'last': None, 'power': None,
+            'positive_wh': 0.0, 'negative_wh': 0.0, 'covered_seconds': 0.0, 'gap_seconds': 0.0,
+            # Bucket tuples: [start, positive_wh, negative_wh, covered_seconds]
+            'buckets': {r: deque(maxlen=kept) for r, (_, kept) in ENERGY_RESOLUTIONS.items()}
+        }
+
+    def _integrate(self, meter, t0, p0, t1, p1):
+        """Trapezoidal integration of one segment (lock held)"""
+        while t0 < t1:
+            # Split at the next minute boundary, interpolating the power there
+            boundary = min(t1, (int(t0 // 60) + 1) * 60)
+            p_boundary = p0 + (p1 - p0) * (boundary - t0) / (t1 - t0)
+            positive, negative = self._trapezoid(t0, p0, boundary, p_boundary)
+            meter['positive_wh'] += positive
+            meter['negative_wh'] += negative
+            meter['covered_seconds'] += boundary - t0
+            for resolution, (size, _) in ENERGY_RESOLUTIONS.items():
+                self._add_to_bucket(meter['buckets'][resolution], int(t0 // size) * size,
+                                    positive, negative, boundary - t0)
+            t0, p0 = boundary, p_boundary
+
+    def _trapezoid(self, t0, p0, t1, p1):
+        """Returns: (positive Wh, negative Wh as a positive number)"""
+        if (p0 >= 0) == (p1 >= 0):
+            wh = (p0 + p1) / 2 * (t1 - t0) / 3600
+            return (wh, 0.0) if wh >= 0 else (0.0, -wh)
+        # Sign change: split at the linear zero crossing
+        t_zero = t0 + (t1 - t0) * p0 / (p0 - p1)
+        first = p0 / 2 * (t_zero - t0) / 3600
+        second = p1 / 2 * (t1 - t_zero) / 3600
+        return max(first, 0) + max(second, 0), -min(first, 0) - min(second, 0)
+
+    def _add_to_bucket(self, buckets, start, positive, negative, seconds):
+        if not buckets or buckets[-1][0] < start:
+            buckets.append((start, 0.0, 0.0, 0.0))
+        elif buckets[-1][0] > start:
+            return  # Late point for an already rotated bucket
+        b = buckets[-1]
+        buckets[-1] = (start, b[1] + positive, b[2] + negative, b[3] + seconds)
+
+    def _bucket_json(self, bucket):
+        start, positive, negative, seconds = bucket
+        return {
+            'start': datetime.fromtimestamp(start).isoformat(),
+            'positive_wh': round(positive, 3),
+            'negative_wh': round(negative, 3),
+            'net_wh': round(positive - negative, 3),
+            'covered_seconds': round(seconds, 1)
+        }
+
+    def _run(self):
+        last_save = time.monotonic()
+        while True:
+            try:
+                if self.dbus_interface.ready:
+                    for name, (service, path) in list(self.paths.items()):
+                        try:
+                            value = self.dbus_interface.get_value(service, path)
+                        except ServiceUnavailableError:
+                            value = None
+                        self.observe(name, value, time.time())
+                if time.monotonic() - last_save >= ENERGY_SAVE_SECONDS:
+                    self.save()
+                    last_save = time.monotonic()
+            except Exception as e:
+                logger.error(f"Energy integration failed: {e}")
+            time.sleep(ENERGY_SAMPLE_SECONDS)
+
+
+class WriteJournal:
+    """Append-only journal of write attempts
+
+    record() only enqueues, so POST /value never waits for flash I/O. A
+    background thread commits whatever has accumulated as one append and
+    one fsync (group commit). Entry ids continue across restarts; the file
+    is rotated to a single .1 segment when it grows beyond JOURNAL_MAX_BYTES.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self._queue = queue.Queue(maxsize=JOURNAL_QUEUE_SIZE)
+        self._id_lock = threading.Lock()
+        self._committed = threading.Condition()
+        self.last_id = self._read_last_id()
+        self.committed_id = self.last_id
+        self.dropped = 0
+
+    def start(self):
+        threading.Thread(target=self._run, name='write-journal', daemon=True).start()
+
+    def record(self, **entry):
+        """Enqueue an entry (timestamp and id are added)
+
+        Returns: The entry id, or None if the queue was full
+        """
+        with self._id_lock:
+            now = time.time()
+            entry = dict(id=self.last_id + 1, time=round(now, 3),
+                         timestamp=datetime.fromtimestamp(now).isoformat(timespec='milliseconds'), **entry)
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                # No id taken, so flush() never waits for an entry that won't be committed
+                self.dropped += 1
+                logger.warning(f"Write journal queue full - write to {entry.get('path')} dropped")
+                return None
+            self.last_id = entry['id']
+        return entry['id']
+
+    def flush(self, timeout=2):
+        """Wait until everything recorded so far is on disk"""
+        target = self.last_id
+        with self._committed:
+            return self._committed.wait_for(lambda: self.committed_id >= target, timeout)
+
+    def query(self, since=None, until=None, service=None, path=None, before=None, limit=JOURNAL_PAGE_SIZE):
+        """Return entries newest first, filtered, one page at a time
+
+        Returns: (entries, next_before) - next_before is the cursor for the
+                 following page, None on the last page
+        """
+        self.flush()
+        entries = []
+        for segment in (self.path, self.path + '.1'):
+            try:
+                with open(segment, 'r') as f:
+                    lines = f.readlines()
+            except FileNotFoundError:
+                continue
+            for line in reversed(lines):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a power cut
+                if before is not None and entry['id'] >= before:
+                    continue
+                if since is not None and entry['time'] < since:
+                    # Older segments only get older
+                    return entries, None
+                if until is not None and entry['time'] > until:
+                    continue
+                if service and not fnmatchcase(entry.get('service', ''), service):
+                    continue
+                if path and not fnmatchcase(entry.get('path', ''), path):
+                    continue
+                if len(entries) >= limit:
+                    return entries, entries[-1]['id'] if entries else None
+                entries.append(entry)
+        return entries, None
+
+    def _read_last_id(self):
+        for segment in (self.path, self.path + '.1'):
+            try:
+                with open(segment, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    f.seek(max(0, f.tell() - 4096))
+                    for line in reversed(f.read().splitlines()):
+                        try:
+                            return json.loads(line)['id']
+                        except (ValueError, KeyError):
+                            continue
+            except FileNotFoundError:
+                continue
+        return 0
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Let concurrent writes pile up, then commit them together
+            time.sleep(JOURNAL_COMMIT_DELAY)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(batch)
+            except OSError as e:
+                logger.error(f"Write journal commit of {len(batch)} entries failed: {e}")
+            with self._committed:
+                self.committed_id = max(self.committed_id, batch[-1]['id'])
+                self._committed.notify_all()
+
+    def _commit(self, batch):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            if os.path.getsize(self.path) > JOURNAL_MAX_BYTES:
+                os.replace(self.path, self.path + '.1')
+        except FileNotFoundError:
+            pass
+        data = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in batch)
+        with open(self.path, 'a') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class WebhookManager:
+    """Deliver change and threshold events to registered callback URLs
+
+    Webhooks are registered under the config key "webhooks":
+
+        {"webhooks": {"low_soc": {"service": "com.victronenergy.system", "path": "/Dc/Battery/Soc",
+                                  "condition": {"op": "<", "value": 20},
+                                  "url": "http://192.168.88.10:1880/victron/low-soc"}}}
+
+    Watched paths are read every poll_interval_seconds, and any other read
+    of them counts too (via the change log). Without a condition every
+    change is sent as a "changed" event. With one, "triggered" is sent when
+    the condition starts to hold and "cleared" when it stops.
+
+    Events wait in a bounded in-memory outbox per webhook and are delivered
+    in order by a small worker pool. Failed deliveries are retried with
+    exponential backoff. Dedup works in two ways. A "changed" event still
+    waiting is replaced by the newer value rather than queued behind it.
+    Every event carries a stable id (also sent as X-Webhook-Event) that
+    receivers can use to drop repeated deliveries after a retry. Pending
+    events do not survive a restart, and a condition that holds when the
+    server starts is reported (again) as "triggered".
+    """
+
+    def __init__(self, dbus_interface):
+        self.dbus_interface = dbus_interface
+        self._lock = threading.Condition()
+        self.hooks = {}  # name -> spec plus runtime state
+        self._by_key = {}  # (service, path) -> [names]
+        self.outbox = {}  # name -> deque of events, oldest first
+        self._ready = []  # heap of (due, name) of outboxes to deliver from
+        self._scheduled = set()  # names with an entry in _ready
+        self._in_flight = set()
+        self.pending = 0
+        self.event_seq = 0
+        self.counters = {'delivered': 0, 'failed': 0, 'dropped': 0, 'coalesced': 0}
+
+    @staticmethod
+    def validate(name, spec):
+        """Check and normalize one webhook registration
+
+        Returns: Normalized spec dict
+        Raises: ValueError with a message for the client
+        """
+        if not isinstance(name, str) or not name or '/' in name:
+            raise ValueError('name must be a non-empty string without "/"')
+        if not isinstance(spec, dict):
+            raise ValueError('webhook must be a JSON object')
+        for key in ('service', 'path', 'url'):
+            if not isinstance(spec.get(key), str) or not spec[key]:
+                raise ValueError(f'{key} is required')
+        if urlparse(spec['url']).scheme not in ('http', 'https'):
+            raise ValueError('url must be http:// or https://')
+        condition = spec.get('condition')
+        if condition is not None:
+            if not isinstance(condition, dict) or condition.get('op') not in WEBHOOK_CONDITIONS \
+                    or 'value' not in condition:
+                raise ValueError(f"condition must be {{\"op\": {'|'.join(WEBHOOK_CONDITIONS)}, \"value\": ...}}")
+            condition = {'op': condition['op'], 'value': condition['value']}
+        headers = spec.get('headers') or {}
+        if not isinstance(headers, dict) or not all(isinstance(v, str) for v in headers.values()):
+            raise ValueError('headers must be an object of strings')
+        interval = spec.get('poll_interval_seconds', WEBHOOK_POLL_SECONDS)
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError('poll_interval_seconds must be a positive number')
+        normalized = {
+            'service': spec['service'], 'path': spec['path'], 'url': spec['url'],
+            'condition': condition, 'notify_clear': bool(spec.get('notify_clear', True)),
+            'poll_interval_seconds': interval, 'headers': headers
+        }
+        if spec.get('secret'):
+            normalized['secret'] = str(spec['secret'])
+        return normalized
+
+    def configure(self, webhooks_config):
+        """Apply the "webhooks" section of the stored configuration
+
+        Webhooks whose path and condition are unchanged keep their state and
+        pending events; removed webhooks drop theirs.
+        """
+        hooks = {}
+        for name, spec in (webhooks_config if isinstance(webhooks_config, dict) else {}).items():
+            try:
+                hooks[name] = self.validate(name, spec)
+            except ValueError as e:
+                logger.warning(f"Webhook {name} ignored: {e}")
+        changes = self.dbus_interface.changes
+        with self._lock:
+            previous = self.hooks
+            added = []
+            for name, hook in hooks.items():
+                old = previous.get(name)
+                if old and all(old[k] == hook[k] for k in ('service', 'path', 'condition')):
+                    hook['state'] = old['state']
+                else:
+                    hook['state'] = {'value': None, 'active': False, 'due': 0, 'delivered': 0, 'failed': 0,
+                                     'last_status': None, 'last_error': None, 'last_delivery_at': None}
+                    added.append(name)
+            for name in set(previous) - set(hooks):
+                self.pending -= len(self.outbox.pop(name, ()))
+            self.hooks = hooks
+            by_key = {}
+            for name, hook in hooks.items():
+                by_key.setdefault((hook['service'], hook['path']), []).append(name)
+            self._by_key = by_key
+            # Evaluate new webhooks against the last observed value right away,
+            # so a condition that already holds is reported without a change
+            for name in added:
+                latest = changes.latest.get((hooks[name]['service'], hooks[name]['path']))
+                if latest is not None:
+                    self._observe(name, latest[1], time.time())
+
+    def start(self):
+        self.dbus_interface.changes.subscribe(self.on_change)
+        threading.Thread(target=self._poll, name='webhook-poll', daemon=True).start()
+        for _ in range(WEBHOOK_WORKERS):
+            threading.Thread(target=self._deliver, name='webhook-delivery', daemon=True).start()
+
+    def on_change(self, service, path, value, timestamp):
+        """Change log listener: runs on the reading thread, so it only queues"""
+        names = self._by_key.get((service, path))
+        if not names:
+            return
+        with self._lock:
+            for name in names:
+                if name in self.hooks:
+                    self._observe(name, value, timestamp)
+
+    def test(self, name):
+        """Queue a "test" event with the last observed value
+
+        Returns: False if the webhook does not exist
+        """
+        with self._lock:
+            hook = self.hooks.get(name)
+            if hook is None:
+                return False
+            self._enqueue(name, 'test', hook['state']['value'], None, time.time())
+            return True
+
+    def list(self):
+        """Registered webhooks with their delivery state (secrets omitted)"""
+        with self._lock:
+            return {name: dict({k: v for k, v in hook.items() if k not in ('state', 'secret')},
+                               state={k: v for k, v in hook['state'].items() if k != 'due'},
+                               pending=len(self.outbox.get(name, ())))
+                    for name, hook in self.hooks.items()}
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, webhooks=len(self.hooks), pending=self.pending)
+
+    def _observe(self, name, value, timestamp):
+        """Queue the events a new value of a webhook's path causes (lock held)"""
+        hook = self.hooks[name]
+        state = hook['state']
+        condition = hook['condition']
+        if condition is None:
+            previous, state['value'] = state['value'], value
+            self._enqueue(name, 'changed', value, previous, timestamp)
+            return
+        if value is None:
+            return  # Value unavailable: no observation, the condition keeps its state
+        try:
+            holds = bool(WEBHOOK_CONDITIONS[condition['op']](value, condition['value']))
+        except TypeError:
+            return  # Not comparable (another type): no observation either
+        previous, state['value'] = state['value'], value
+        if holds != state['active']:
+            state['active'] = holds
+            if holds or hook['notify_clear']:
+                self._enqueue(name, 'triggered' if holds else 'cleared', value, previous, timestamp)
+
+    def _enqueue(self, name, event_type, value, previous, timestamp):
+        """Queue an event for delivery (lock held)"""
+        hook = self.hooks[name]
+        outbox = self.outbox.setdefault(name, deque())
+        tail_in_flight = len(outbox) == 1 and name in self._in_flight
+        if event_type == 'changed' and outbox and outbox[-1]['event'] == 'changed' and not tail_in_flight:
+            # Not sent yet - the receiver only needs the latest value
+            outbox[-1]['payload'].update(value=value, timestamp=datetime.fromtimestamp(timestamp).isoformat())
+            self.counters['coalesced'] += 1
+            return
+        if self.pending >= WEBHOOK_QUEUE_SIZE:
+            self.counters['dropped'] += 1
+            logger.warning(f"Webhook outbox full - {event_type} event for {name} dropped")
+            return
+        self.event_seq += 1
+        outbox.append({'event': event_type, 'attempts': 0, 'payload': {
+            'id': f'{self.dbus_interface.changes.epoch}-{self.event_seq}',
+            'webhook': name,
+            'event': event_type,
+            'service': hook['service'],
+            'path': hook['path'],
+            'value': value,
+            'previous': previous,
+            'condition': hook['condition'],
+            'timestamp': datetime.fromtimestamp(timestamp).isoformat()
+        }})
+        self.pending += 1
+        self._schedule(name, 0)
+
+    def _schedule(self, name, delay):
+        """Make an outbox deliverable after delay seconds (lock held)"""
+        if name not in self._scheduled and name not in self._in_flight:
+            self._scheduled.add(name)
+            heapq.heappush(self._ready, (time.monotonic() + delay, name))
+            self._lock.notify()
+
+    def _poll(self):
+        """Read watched paths when due; changes reach on_change via the change log"""
+        while True:
+            try:
+                if self.dbus_interface.ready:
+                    now = time.monotonic()
+                    with self._lock:
+                        due = set()
+                        for hook in self.hooks.values():
+                            if hook['state']['due'] <= now:
+                                hook['state']['due'] = now + hook['poll_interval_seconds']
+                                due.add((hook['service'], hook['path']))
+                    for service, path in due:
+                        try:
+                            self.dbus_interface.get_value(service, path)
+                        except ServiceUnavailableError:
+                            pass
+            except Exception as e:
+                logger.error(f"Webhook poll failed: {e}")
+            time.sleep(VIEW_TICK_SECONDS)
+
+    def _deliver(self):
+        while True:
+            with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if self._ready and self._ready[0][0] <= now:
+                        _, name = heapq.heappop(self._ready)
+                        self._scheduled.discard(name)
+                        outbox = self.outbox.get(name)
+                        if outbox and name in self.hooks:
+                            break
+                        continue
+                    self._lock.wait(self._ready[0][0] - now if self._ready else None)
+                self._in_flight.add(name)
+                event = outbox[0]
+                hook = self.hooks[name]
+
+            status, error = self._post(hook, event['payload'])
+
+            with self._lock:
+                self._in_flight.discard(name)
+                event['attempts'] += 1
+                state = hook['state']
+                state['last_status'], state['last_error'] = status, error
+                retry = error is not None and (status is None or status >= 500 or status in (408, 429))
+                delay = 0
+                if error is None or not retry or event['attempts'] > WEBHOOK_RETRIES:
+                    if error is None:
+                        state['delivered'] += 1
+                        state['last_delivery_at'] = datetime.now().isoformat()
+                        self.counters['delivered'] += 1
+                    else:
+                        state['failed'] += 1
+                        self.counters['failed'] += 1
+                        logger.warning(f"Webhook {name} gave up on event {event['payload']['id']}: {error}")
+                    if self.outbox.get(name) is outbox:
+                        outbox.popleft()
+                        self.pending -= 1
+                else:
+                    delay = min(WEBHOOK_BACKOFF * 2 ** (event['attempts'] - 1), WEBHOOK_BACKOFF_MAX)
+                if self.outbox.get(name):
+                    self._schedule(name, delay)
+
+    def _post(self, hook, payload):
+        """Send one event
+
+        Returns: (HTTP status or None, error message or None on success)
+        """
+        # Not imported at startup: urllib.request loads ssl, and most
+        # installations have no webhooks
+        import urllib.error
+        import urllib.request
+        body = json.dumps(payload).encode()
+        headers = dict(hook['headers'], **{
+            'Content-Type': 'application/json',
+            'User-Agent': f'victron-dbus-api/{VERSION}',
+            'X-Webhook-Event': payload['id'],
+        })
+        if hook.get('secret'):
+            import hashlib
+            import hmac
+            digest = hmac.new(hook['secret'].encode(), body, hashlib.sha256).hexdigest()
+            headers['X-Webhook-Signature'] = f'sha256={digest}'
+        request = urllib.request.Request(hook['url'], data=body, headers=headers, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT) as response:
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, f'HTTP {e.code}'
+        except (urllib.error.URLError, OSError) as e:
+            return None, str(getattr(e, 'reason', e))
+
+
+def service_type(service):
+    """com.victronenergy.vebus.ttyS4 -> com.victronenergy.vebus"""
+    return '.'.join(service.split('.')[:3])
+
+
+def load_path_priorities(path=PRIORITY_PATHS_FILE):
+    """Read path priorities from the diagnostic paths reference
+
+    Entries with "priority" (batch roots) or a CRITICAL "severity" (anomaly
+    rules) use that level, entries flagged "critical" are critical, and the
+    remaining "critical_paths" entries are high. Every entry also applies to
+    other devices of the same service type (e.g. any vebus instance).
+
+    Returns: {(service or service type, path): lane}
+    """
+    try:
+        with open(path, 'r') as f:
+            reference = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"No path priorities from {path}: {e}")
+        return {}
+
+    priorities = {}
+
+    def visit(node, section):
+        if isinstance(node, list):
+            for item in node:
+                visit(item, section)
+            return
+        if not isinstance(node, dict):
+            return
+        if isinstance(node.get('service'), str) and isinstance(node.get('path'), str):
+            level = str(node.get('priority') or node.get('severity') or '').lower()
+            if level not in PRIORITY_LANES:
+                level = 'critical' if node.get('critical') is True else (
+                    'high' if section == 'critical_paths' else None)
+            if level:
+                for key in ((node['service'], node['path']), (service_type(node['service']), node['path'])):
+                    current = priorities.get(key, PRIORITY_DEFAULT)
+                    if PRIORITY_LANES.index(level) <= PRIORITY_LANES.index(current):
+                        priorities[key] = level
+        for value in node.values():
+            visit(value, section)
+
+    for section, node in reference.items():
+        visit(node, section)
+    return priorities
+
+
+class RateLimiter:
+    """Token buckets per (client, route) and priority-aware fair scheduling
+
+    Each bucket refills at its route class's rate up to its burst size; a
+    request that finds less than one token is refused with the time until
+    the next token (exempt clients skip this). Admitted requests then share
+    max_concurrent slots. A request's lane (critical, high, medium) may only
+    take slots not reserved for the lanes above it; when none is free it
+    waits in its lane, queued per client. Freed slots go to the highest
+    waiting lane, round-robin across its clients, so neither a bulk export
+    nor one client with many parallel requests can starve alarm reads.
+    """
+
+    def __init__(self, path_priorities=None):
+        self._lock = threading.Lock()
+        self.buckets = {}  # (client, route) -> [tokens, updated_at]
+        # lane -> client -> deque of Events, clients in turn order
+        self.waiting = {lane: OrderedDict() for lane in PRIORITY_LANES}
+        self.file_priorities = load_path_priorities() if path_priorities is None else path_priorities
+        self.priorities = {}
+        self.busy = 0
+        self.limited = 0
+        self.queued = {lane: 0 for lane in PRIORITY_LANES}
+        self.configure(None)
+
+    def configure(self, rate_config):
+        """Apply the "rate_limit" section of the stored configuration"""
+        config = json.loads(json.dumps(RATE_LIMIT_DEFAULTS))
+        if isinstance(rate_config, dict):
+            for key, value in rate_config.items():
+                if isinstance(value, dict) and isinstance(config.get(key), dict):
+                    config[key].update(value)
+                else:
+                    config[key] = value
+        priorities = dict(self.file_priorities)
+        for entry in config['priority_paths'] or []:
+            if isinstance(entry, dict) and entry.get('priority') in PRIORITY_LANES:
+                priorities[(entry.get('service'), entry.get('path'))] = entry['priority']
+        with self._lock:
+            self.config = config
+            self.exempt = set(config['exempt'])
+            self.priorities = priorities
+            self.buckets.clear()
+            self._grant_waiting()
+
+    def lane_for(self, method, path, targets=(), requested=None):
+        """Pick the scheduling lane of a request
+
+        targets are the (service, path) pairs it reads or writes; a batch
+        gets the lowest lane of its items so bulk reads can't jump the queue.
+        requested is the X-Priority header value, which takes precedence.
+
+        Returns: Lane name
+        """
+        if requested and requested.strip().lower() in PRIORITY_LANES:
+            return requested.strip().lower()
+        if not targets:
+            return PRIORITY_ROUTES.get(f'{method} {path}', PRIORITY_DEFAULT)
+        priorities = self.priorities
+        lanes = [priorities.get((service, dbus_path)) or
+                 priorities.get((service_type(service), dbus_path)) or PRIORITY_DEFAULT
+                 for service, dbus_path in targets]
+        return max(lanes, key=PRIORITY_LANES.index)
+
+    def check(self, client, method, path):
+        """Take a token for this request
+
+        Returns: (allowed, retry_after_seconds)
+        """
+        config = self.config
+        if not config['enabled'] or client in self.exempt:
+            return True, 0
+        route = f'{method} {path}'
+        limits = config['classes'].get(config['routes'].get(route, 'cheap')) or config['classes']['cheap']
+        now = time.monotonic()
+        with self._lock:
+            bucket = self.buckets.get((client, route))
+            if bucket is None:
+                if len(self.buckets) >= RATE_LIMIT_MAX_BUCKETS:
+                    self._prune(now)
+                bucket = self.buckets[(client, route)] = [limits['burst'], now]
+            bucket[0] = min(limits['burst'], bucket[0] + (now - bucket[1]) * limits['rate'])
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0
+            self.limited += 1
+            return False, max(1, int((1 - bucket[0]) / limits['rate'] + 0.999))
+
+    def acquire(self, client, lane=PRIORITY_DEFAULT):
+        """Wait for a serving slot in the given lane (fair across clients)
+
+        Returns: True if a slot is held (release() must follow),
+                 False if scheduling is disabled
+        Raises: TimeoutError if no slot became free within queue_timeout
+        """
+        if not self.config['enabled']:
+            return False
+        with self._lock:
+            ahead = PRIORITY_LANES[:PRIORITY_LANES.index(lane) + 1]
+            if self.busy < self._capacity(lane) and not any(self.waiting[l] for l in ahead):
+                self.busy += 1
+                return True
+            event = threading.Event()
+            self.waiting[lane].setdefault(client, deque()).append(event)
+            self.queued[lane] += 1
+        if event.wait(self.config['queue_timeout']):
+            return True
+        with self._lock:
+            if event.is_set():
+                return True  # Granted while timing out
+            waiters = self.waiting[lane].get(client)
+            waiters.remove(event)
+            if not waiters:
+                del self.waiting[lane][client]
+        raise TimeoutError(f"No {lane} serving slot within {self.config['queue_timeout']}s")
+
+    def release(self):
+        with self._lock:
+            self.busy -= 1
+            self._grant_waiting()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.config['enabled'],
+                'limited': self.limited,
+                'busy': self.busy,
+                'lanes': {lane: {
+                    'capacity': self._capacity(lane),
+                    'queued': self.queued[lane],
+                    'waiting': sum(len(w) for w in self.waiting[lane].values())
+                } for lane in PRIORITY_LANES},
+                'priority_paths': len(self.priorities),
+                'buckets': len(self.buckets)
+            }
+
+    def _capacity(self, lane):
+        """Slots a lane may fill: all but those reserved for higher lanes"""
+        reserved = self.config['reserved'] or {}
+        above = PRIORITY_LANES[:PRIORITY_LANES.index(lane)]
+        return max(1, self.config['max_concurrent'] - sum(reserved.get(l, 0) for l in above))
+
+    def _grant_waiting(self):
+        """Hand free slots to the highest waiting lane, clients in turn (lock held)"""
+        for lane in PRIORITY_LANES:
+            waiting = self.waiting[lane]
+            while waiting and self.busy < self._capacity(lane):
+                client, waiters = waiting.popitem(last=False)
+                waiters.popleft().set()
+                self.busy += 1
+                if waiters:
+                    waiting[client] = waiters  # Back of the line
+
+    def _prune(self, now):
+        """Drop buckets that have refilled completely (lock held)"""
+        classes, routes = self.config['classes'], self.config['routes']
+        for key, (tokens, updated_at) in list(self.buckets.items()):
+            limits = classes.get(routes.get(key[1], 'cheap')) or classes['cheap']
+            if tokens + (now - updated_at) * limits['rate'] >= limits['burst']:
+                del self.buckets[key]
+
+
+class RequestProfiler:
+    """cProfile the next N requests and aggregate their statistics
+
+    One request is profiled at a time (cProfile is not meant to run several
+    profilers concurrently); requests arriving meanwhile run unprofiled and
+    don't use up the count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining = 0
+        self.active = False
+        self.captured = 0
+        self.stats = None  # pstats.Stats aggregated over captured requests
+        self.recent = deque(maxlen=PROFILE_RECENT_REQUESTS)
+
+    def arm(self, count, reset=True):
+        with self._lock:
+            self.remaining = max(0, min(int(count), PROFILE_MAX_REQUESTS))
+            if reset:
+                self.captured = 0
+                self.stats = None
+                self.recent.clear()
+
+    def begin(self):
+        """Returns: An enabled cProfile.Profile if this request is to be profiled, else None"""
+        if not self.remaining:
+            return None
+        with self._lock:
+            if not self.remaining or self.active:
+                return None
+            self.remaining -= 1
+            self.active = True
+        import cProfile  # Profiling is off by default - keep it off the startup path
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool is active (e.g. a debugger)
+            with self._lock:
+                self.active = False
+                self.remaining += 1
+            return None
+        profile.started = time.monotonic()
+        return profile
+
+    def end(self, profile, requestline):
+        """Add a finished request to the statistics (requestline None: no request was read)"""
+        profile.disable()
+        elapsed = time.monotonic() - profile.started
+        parts = (requestline or '').split()
+        with self._lock:
+            self.active = False
+            if len(parts) < 2 or parts[1].startswith('/debug/'):
+                self.remaining += 1  # Don't spend the count on reading the profile
+                return
+            if self.stats is None:
+                import pstats
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.captured += 1
+            self.recent.append({'request': requestline, 'ms': round(elapsed * 1000, 2)})
+
+    def status(self):
+        return {'remaining': self.remaining, 'captured': self.captured, 'active': self.active}
+
+    def report(self, sort='cumulative', limit=PROFILE_STATS_LIMIT):
+        """Returns: Status with the top functions by sort key (cumulative, tottime, calls)"""
+        key = {'cumulative': 3, 'tottime': 2, 'calls': 1}.get(sort, 3)
+        with self._lock:
+            rows = list(self.stats.stats.items()) if self.stats else []
+            total = self.stats.total_tt if self.stats else 0
+            recent = list(self.recent)
+        rows.sort(key=lambda item: item[1][key], reverse=True)
+        return dict(self.status(), total_ms=round(total * 1000, 2), requests=recent, functions=[{
+            'function': f'{os.path.basename(filename)}:{line}({name})',
+            'ncalls': nc if nc == cc else f'{nc}/{cc}',
+            'tottime_ms': round(tt * 1000, 3),
+            'cumtime_ms': round(ct * 1000, 3),
+            'percall_ms': round(ct * 1000 / nc, 3) if nc else 0
+        } for (filename, line, name), (cc, nc, tt, ct, _) in rows[:limit]])
+
+    def dump(self):
+        """Returns: Aggregated stats in pstats file format (snakeviz, pstats.Stats) or None"""
+        import marshal
+        with self._lock:
+            return marshal.dumps(self.stats.stats) if self.stats else None
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads for a time window
+
+    A background thread records every other thread's stack each interval
+    (wall clock, so time blocked in DBus calls shows up too). The result is
+    returned as collapsed stacks ("root;caller;callee count" lines) for
+    flamegraph.pl or speedscope.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stacks = {}  # "a;b;c" -> samples
+        self.samples = 0
+        self.interval = SAMPLER_INTERVAL
+        self.started_at = None
+        self.until = 0
+        self.running = False
+
+    def start(self, seconds, interval=SAMPLER_INTERVAL):
+        """Returns: False if a window is already running"""
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = {}
+            self.samples = 0
+            self.interval = max(0.001, float(interval))
+            self.started_at = time.time()
+            self.until = time.monotonic() + max(0.1, min(float(seconds), SAMPLER_MAX_SECONDS))
+            self.running = True
+        threading.Thread(target=self._run, daemon=True, name='stack-sampler').start()
+        return True
+
+    def stop(self):
+        self.until = 0
+
+    def status(self):
+        return {
+            'running': self.running,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            'remaining_seconds': round(max(0, self.until - time.monotonic()), 1) if self.running else 0,
+            'interval_ms': round(self.interval * 1000, 1),
+            'samples': self.samples,
+            'stacks': len(self.stacks)
+        }
+
+    def collapsed(self):
+        """Returns: Collapsed stack lines, most frequent first"""
+        with self._lock:
+            stacks = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks)
+
+    def _run(self):
+        own = threading.get_ident()
+        while time.monotonic() < self.until:
+            names = {thread.ident: self._thread_label(thread.name) for thread in threading.enumerate()}
+            collapsed = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f'{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}')
+                    frame = frame.f_back
+                stack.append(names.get(ident, 'Thread'))
+                collapsed.append(';'.join(reversed(stack)))
+            with self._lock:
+                for stack in collapsed:
+                    self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.samples += 1
+            time.sleep(self.interval)
+        self.running = False
+
+    def _thread_label(self, name):
+        """Stack root per kind of thread (the target of "Thread-7 (target)" names)"""
+        if name.endswith(')') and ' (' in name:
+            return name[name.rindex(' (') + 2:-1]
+        return name.rstrip('0123456789-') or 'Thread'
+
+
+class AllocationTracker:
+    """tracemalloc snapshots compared against a baseline
+
+    start() begins tracing and takes the baseline; report() compares a new
+    snapshot with it, so the top entries show where memory grew since.
+    Tracing slows allocations down, so stop() it when done. tracemalloc is
+    imported on first use, so it costs nothing while profiling is off.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.baseline = None
+        self.baseline_at = None
+
+    def tracing(self):
+        if 'tracemalloc' not in sys.modules:
+            return False  # Never started, and not worth an import to find out
+        import tracemalloc
+        return tracemalloc.is_tracing()
+
+    def start(self, frames=TRACEMALLOC_FRAMES):
+        import tracemalloc
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, min(int(frames), TRACEMALLOC_MAX_FRAMES)))
+            self._take_baseline()
+
+    def reset(self):
+        """Take a new baseline"""
+        with self._lock:
+            if self.tracing():
+                self._take_baseline()
+
+    def stop(self):
+        with self._lock:
+            if self.tracing():
+                import tracemalloc
+                tracemalloc.stop()
+            self.baseline = self.baseline_at = None
+
+    def report(self, limit=PROFILE_STATS_LIMIT, group_by='lineno'):
+        """Returns: Traced memory and the allocation sites that grew most since the baseline"""
+        with self._lock:
+            if not self.tracing():
+                return {'tracing': False}
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            diff = self._snapshot().compare_to(self.baseline, group_by)
+            return {
+                'tracing': True,
+                'frames': tracemalloc.get_traceback_limit(),
+                'baseline_at': self.baseline_at,
+                'traced_kb': round(current / 1024, 1),
+                'peak_kb': round(peak / 1024, 1),
+                'overhead_kb': round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+                'top': [{
+                    'location': [f'{os.path.basename(frame.filename)}:{frame.lineno}' for frame in stat.traceback],
+                    'size_kb': round(stat.size / 1024, 1),
+                    'size_diff_kb': round(stat.size_diff / 1024, 1),
+                    'count': stat.count,
+                    'count_diff': stat.count_diff
+                } for stat in diff[:limit]]
+            }
+
+    def _snapshot(self):
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def _take_baseline(self):
+        self.baseline = self._snapshot()
+        self.baseline_at = datetime.now().isoformat()
+
+
 class DBusAPIHandler(BaseHTTPRequestHandler):
     """HTTP request handler for DBus API"""
 
     dbus_interface = None  # Shared DBus interface instance
+    inventory = None  # Shared DeviceInventory instance
+    views = None  # Shared ViewStore instance
+    energy = None  # Shared EnergyIntegrator instance
+    journal = None  # Shared WriteJournal instance
+    rate_limiter = None  # Shared RateLimiter instance
+    profiler = None  # Shared RequestProfiler instance
+    sampler = None  # Shared SamplingProfiler instance
+    allocations = None  # Shared AllocationTracker instance
+    webhooks = None  # Shared WebhookManager instance
     start_time = None  # Server start timestamp
 
-    def _set_headers(self, status=200, content_type='application/json'):
-        """Set response headers"""
+    # Keep-alive so pooled clients reuse connections; idle ones time out
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEPALIVE_TIMEOUT
+    # Headers and body are separate writes - don't wait for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def handle_one_request(self):
+        """Handle one request, counted as in flight for drain()
+
+        Waiting for the next request on an idle keep-alive connection is
+        not counted, so idle clients don't hold up a shutdown or reload.
+        """
+        try:
+            # Returns at once if a pipelined request is already buffered, else
+            # waits up to the socket timeout (works for any fd, unlike select)
+            self.rfile.peek(1)
+        except TimeoutError:
+            self.close_connection = True
+            return
+        self.server.begin_request()
+        self._holding_slot = False
+        profile = self.profiler.begin() if self.profiler else None
+        try:
+            super().handle_one_request()
+        finally:
+            if profile is not None:
+                # No request line: the client closed an idle keep-alive connection
+                self.profiler.end(profile, self.requestline if getattr(self, 'raw_requestline', b'') else None)
+            if self._holding_slot:
+                self.rate_limiter.release()
+            self.server.end_request()
+
+    def _admit(self, method, path, targets=()):
+        """Apply the client's rate limit and wait for a serving slot in its lane
+
+        targets are the (service, path) pairs the request reads or writes.
+
+        Returns: False after answering 429/503 itself
+        """
+        client = self.client_address[0]
+        allowed, retry_after = self.rate_limiter.check(client, method, path)
+        if not allowed:
+            self._send_json({
+                'error': f'Rate limit exceeded for {method} {path}',
+                'retry_after': retry_after,
+                'success': False
+            }, 429, headers={'Retry-After': str(retry_after)})
+            return False
+        try:
+            lane = self.rate_limiter.lane_for(method, path, targets, self.headers.get(PRIORITY_HEADER))
+            self._holding_slot = self.rate_limiter.acquire(client, lane)
+        except TimeoutError as e:
+            self._send_json({'error': str(e), 'success': False}, 503, headers={'Retry-After': '1'})
+            return False
+        return True
+
+    def _release_slot(self):
+        """Give the lane slot back before a long streamed response
+
+        A slow client following a stream must not hold one of the few
+        serving slots of its lane while it downloads.
+        """
+        if self._holding_slot:
+            self._holding_slot = False
+            self.rate_limiter.release()
+
+    def _set_headers(self, status=200, content_type='application/json', headers=None, length=None):
+        """Set response headers
+
+        Without a length the body is streamed and the connection is closed
+        after it, as it is while the server drains for shutdown or reload.
+        """
         self.send_response(status)
         self.send_header('Content-type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PATCH, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', f'Content-Type, {PRIORITY_HEADER}')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if length is not None:
+            self.send_header('Content-Length', str(length))
+        if length is None or self.server.draining:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
         self.end_headers()
 
-    def _send_json(self, data, status=200):
-        """Send JSON response"""
-        self._set_headers(status)
-        self.wfile.write(json.dumps(data, indent=2).encode())
+    def _send_json(self, data, status=200, headers=None):
+        """Send a JSON response, or MessagePack / CBOR if the client's Accept asks for it"""
+        media_type, encode = negotiate_encoding(self.headers.get('Accept'))
+        body = encode(data) if encode else json.dumps(data, indent=2).encode()
+        self._set_headers(status, content_type=media_type, headers=dict(headers or {}, Vary='Accept'),
+                          length=len(body))
+        self.wfile.write(body)
+
+    def _send_ndjson(self, header, rows):
+        """Stream a header line and one compact JSON line per row"""
+        self._set_headers(200, content_type='application/x-ndjson')
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        lines = [encode(header)]
+        for row in rows:
+            lines.append(encode(row))
+            if len(lines) >= NDJSON_BATCH_LINES:
+                self.wfile.write(('\n'.join(lines) + '\n').encode())
+                lines = []
+        if lines:
+            self.wfile.write(('\n'.join(lines) + '\n').encode())
 
     def _send_error_json(self, message, status=500):
         """Send error response"""
         self._send_json({'error': message, 'success': False}, status)
 
+    def _send_starting(self):
+        """Send 503 while the DBus connection is still being established"""
+        self._send_json({
+            'error': 'Server is starting - DBus connection not ready yet',
+            'status': 'starting',
+            'success': False
+        }, 503, headers={'Retry-After': '1'})
+
+    def _send_unavailable(self, error):
+        """Send fast 503 for a service whose circuit breaker is open"""
+        self._send_json({
+            'error': str(error),
+            'service': error.service,
+            'retry_after': error.retry_after,
+            'success': False
+        }, 503, headers={'Retry-After': str(error.retry_after)})
+
     def do_OPTIONS(self):
         """Handle CORS preflight"""
-        self._set_headers(204)
+        self._set_headers(204, length=0)
 
     def do_GET(self):
         """Handle GET requests"""
@@ -345,6 +2984,14 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
             path = parsed.path
             params = parse_qs(parsed.query)
 
+            targets = [(params['service'][0], params['path'][0])] if 'service' in params and 'path' in params else ()
+            if not self._admit('GET', path, targets):
+                return
+
+            if not self.dbus_interface.ready and path not in DBUS_FREE_ROUTES:
+                self._send_starting()
+                return
+
             # Route: GET /
             if path == '/' or path == '':
                 ai_enabled, ai_message, ai_details = self.dbus_interface.is_ai_write_enabled()
@@ -359,13 +3006,28 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                         'GET /': 'API information',
                         'GET /health': 'Health check with uptime',
                         'GET /services': 'List all Victron dbus services',
+                        'GET /devices': 'Device inventory with VRM instances (optional: ?refresh=1)',
+                        'GET /changes?since=SEQ&epoch=E': 'NDJSON deltas of observed values since a sequence (full resync when out of window)',
+                        'GET /energy': 'Integrated energy (kWh) and 1m/15m/1h aggregates of power paths (optional: ?resolution=1m|15m|1h&limit=N)',
+                        'GET /journal': 'Write journal, newest first (optional: ?since=&until=&service=&path=&limit=N&before=ID)',
+                        'GET /views': 'Named views registered under config key "views"',
+                        'GET /views/<name>': 'Materialized view as a flat object (optional: ?since=SEQ for changed fields only)',
+                        'GET /webhooks': 'Registered webhooks with delivery state',
                         'GET /settings': 'Get all settings from com.victronenergy.settings',
                         'GET /value?service=X&path=Y': 'Get value from specific dbus path',
                         'GET /text?service=X&path=Y': 'Get text representation of value',
+                        'GET /metadata?service=X&path=Y': 'DBus type, min, max and default used to validate writes',
                         'GET /ai-write-status': 'Check AI write switch status',
+                        'GET /cache': 'Read cache hit/miss statistics',
+                        'GET /metrics': 'Per-key DBus call latency metrics (optional: ?top=N)',
                         'GET /config': 'Get stored agent configuration',
                         'POST /value': 'Set value (requires AI_write switch ON)',
-                        'POST /config': 'Save agent configuration'
+                        'POST /values': 'Read many values in one request: {"items": [{"service": X, "path": Y}, ...]}',
+                        'POST /config': 'Replace agent configuration',
+                        'PATCH /config': 'Partially update agent configuration (JSON merge patch)',
+                        'POST /webhooks': 'Register a webhook: {"name", "service", "path", "url", optional "condition": {"op", "value"}}',
+                        'POST /webhooks/<name>/test': 'Send a test event to a webhook',
+                        'DELETE /webhooks/<name>': 'Remove a webhook'
                     }
                 })
 
@@ -373,12 +3035,28 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
             elif path == '/health':
                 uptime_seconds = int(time.time() - DBusAPIHandler.start_time) if DBusAPIHandler.start_time else 0
                 started_at = datetime.fromtimestamp(DBusAPIHandler.start_time).isoformat() if DBusAPIHandler.start_time else None
+                if not self.dbus_interface.ready:
+                    self._send_json({
+                        'service': 'dbus-api-server',
+                        'version': VERSION,
+                        'status': 'starting',
+                        'started_at': started_at,
+                        'uptime_seconds': uptime_seconds,
+                        'dbus_connect_attempts': self.dbus_interface.connect_attempts,
+                        'dbus_error': self.dbus_interface.last_connect_error,
+                        'success': False
+                    }, 503, headers={'Retry-After': '1'})
+                    return
+                breakers = self.dbus_interface.breaker_status()
+                open_circuits = sorted(s for s, b in breakers.items() if b['state'] != CircuitBreaker.CLOSED)
                 self._send_json({
                     'service': 'dbus-api-server',
                     'version': VERSION,
-                    'status': 'healthy',
+                    'status': 'degraded' if open_circuits else 'healthy',
                     'started_at': started_at,
                     'uptime_seconds': uptime_seconds,
+                    'open_circuits': open_circuits,
+                    'dbus_services': breakers,
                     'success': True
                 })
 
@@ -399,32 +3077,162 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                     'success': True
                 })
 
+            # Route: GET /cache
+            elif path == '/cache':
+                self._send_json({'cache': self.dbus_interface.cache.stats(), 'success': True})
+
+            # Route: GET /metrics
+            elif path == '/metrics':
+                top = int_param(params, 'top') or None
+                self._send_json({
+                    'dbus_calls': self.dbus_interface.flight.stats(top),
+                    'change_log': self.dbus_interface.changes.stats(),
+                    'rate_limit': self.rate_limiter.stats(),
+                    'webhooks': self.webhooks.stats(),
+                    'success': True
+                })
+
+            # Route: GET /debug/profile
+            elif path == '/debug/profile':
+                if not self._debug_allowed():
+                    return
+                if params.get('format', [''])[0] == 'pstats':
+                    dump = self.profiler.dump()
+                    if dump is None:
+                        self._send_error_json('No requests profiled yet', 404)
+                        return
+                    self._set_headers(200, content_type='application/octet-stream', length=len(dump),
+                                      headers={'Content-Disposition': 'attachment; filename="requests.pstats"'})
+                    self.wfile.write(dump)
+                    return
+                limit = int_param(params, 'limit', PROFILE_STATS_LIMIT)
+                self._send_json(dict(self.profiler.report(params.get('sort', ['cumulative'])[0], limit),
+                                     success=True))
+
+            # Route: GET /debug/profile/sample
+            elif path == '/debug/profile/sample':
+                if not self._debug_allowed():
+                    return
+                if params.get('format', [''])[0] == 'collapsed':
+                    body = self.sampler.collapsed().encode()
+                    self._set_headers(200, content_type='text/plain; charset=utf-8', length=len(body))
+                    self.wfile.write(body)
+                    return
+                self._send_json(dict(self.sampler.status(), success=True))
+
+            # Route: GET /debug/profile/tracemalloc
+            elif path == '/debug/profile/tracemalloc':
+                if not self._debug_allowed():
+                    return
+                limit = int_param(params, 'limit', PROFILE_STATS_LIMIT)
+                group_by = 'traceback' if params.get('group', [''])[0] == 'traceback' else 'lineno'
+                self._send_json(dict(self.allocations.report(limit, group_by), success=True))
+
             # Route: GET /config
             elif path == '/config':
-                try:
-                    if os.path.exists(CONFIG_FILE):
-                        with open(CONFIG_FILE, 'r') as f:
-                            config = json.load(f)
-                        self._send_json({
-                            'config': config,
-                            'path': CONFIG_FILE,
-                            'success': True
-                        })
-                    else:
-                        self._send_json({
-                            'config': {},
-                            'path': CONFIG_FILE,
-                            'message': 'No configuration file found',
-                            'success': True
-                        })
-                except Exception as e:
-                    self._send_error_json(f'Failed to read config: {e}', 500)
+                config, exists = config_store.get()
+                if exists:
+                    self._send_json({
+                        'config': redact_config(config),
+                        'path': CONFIG_FILE,
+                        'success': True
+                    })
+                else:
+                    self._send_json({
+                        'config': {},
+                        'path': CONFIG_FILE,
+                        'message': 'No configuration file found',
+                        'success': True
+                    })
 
             # Route: GET /settings
             elif path == '/settings':
                 settings = self.dbus_interface.get_all_settings()
                 self._send_json({'settings': settings, 'success': True})
 
+            # Route: GET /devices
+            elif path == '/devices':
+                self.inventory.refresh(force=params.get('refresh', ['0'])[0] == '1')
+                self._send_json(dict(self.inventory.snapshot(), success=True))
+
+            # Route: GET /changes
+            elif path == '/changes':
+                since = int_param(params, 'since')
+                epoch = int_param(params, 'epoch')
+                service_filter = params.get('service', [None])[0]
+                delta = self.dbus_interface.changes.since(since, epoch)
+                rows = ({'seq': seq, 'service': service, 'path': dbus_path, 'value': value}
+                        for seq, service, dbus_path, value in delta['changes']
+                        if not service_filter or fnmatchcase(service, service_filter))
+                # The delta is a snapshot, streaming it needs no serving slot
+                self._release_slot()
+                self._send_ndjson({
+                    'epoch': delta['epoch'],
+                    'seq': delta['seq'],
+                    'since': None if delta['resync'] else since,
+                    'resync': delta['resync']
+                }, rows)
+
+            # Route: GET /energy
+            elif path == '/energy':
+                resolution = params.get('resolution', ['15m'])[0]
+                if resolution not in ENERGY_RESOLUTIONS:
+                    self._send_error_json(f'resolution must be one of {", ".join(ENERGY_RESOLUTIONS)}', 400)
+                    return
+                try:
+                    limit = max(1, int(params.get('limit', ['24'])[0]))
+                except ValueError:
+                    self._send_error_json('limit must be an integer', 400)
+                    return
+                self._send_json({
+                    'resolution': resolution,
+                    'meters': self.energy.report(resolution, limit),
+                    'success': True
+                })
+
+            # Route: GET /journal
+            elif path == '/journal':
+                try:
+                    since = parse_time_param(params.get('since', [''])[0])
+                    until = parse_time_param(params.get('until', [''])[0])
+                except ValueError as e:
+                    self._send_error_json(f'Invalid time parameter: {e}', 400)
+                    return
+                try:
+                    before = params.get('before', [None])[0]
+                    before = int(before) if before else None
+                    limit = max(1, min(int(params.get('limit', [str(JOURNAL_PAGE_SIZE)])[0]), 1000))
+                except ValueError:
+                    self._send_error_json('before and limit must be integers', 400)
+                    return
+                entries, next_before = self.journal.query(
+                    since, until, params.get('service', [None])[0], params.get('path', [None])[0],
+                    before, limit)
+                self._send_json({
+                    'entries': entries,
+                    'count': len(entries),
+                    'next_before': next_before,
+                    'dropped': self.journal.dropped,
+                    'success': True
+                })
+
+            # Route: GET /webhooks
+            elif path == '/webhooks':
+                self._send_json({'webhooks': self.webhooks.list(), 'success': True})
+
+            # Route: GET /views
+            elif path == '/views':
+                self._send_json({'views': self.views.names(), 'success': True})
+
+            # Route: GET /views/<name>
+            elif path.startswith('/views/'):
+                name = path[len('/views/'):]
+                snapshot = self.views.snapshot(name, int_param(params, 'since'))
+                if snapshot is None:
+                    self._send_error_json(f'Unknown view: {name}', 404)
+                    return
+                self._send_json(dict(snapshot, success=True))
+
             # Route: GET /services
             elif path == '/services':
                 services = self.dbus_interface.list_services()
@@ -484,9 +3292,34 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                         'success': True
                     })
 
+            # Route: GET /metadata
+            elif path == '/metadata':
+                service = params.get('service', [''])[0]
+                dbus_path = params.get('path', [''])[0]
+
+                if not service or not dbus_path:
+                    self._send_error_json('Missing service or path parameter', 400)
+                    return
+
+                try:
+                    metadata = self.dbus_interface.get_metadata(service, dbus_path)
+                except dbus.exceptions.DBusException:
+                    self._send_json({
+                        'service': service,
+                        'path': dbus_path,
+                        'error': f'Path {dbus_path} not available on {service}',
+                        'success': False
+                    }, 404)
+                    return
+                self._send_json(dict(metadata, service=service, path=dbus_path, success=True))
+
             else:
                 self._send_error_json('Not found', 404)
 
+        except ServiceUnavailableError as e:
+            self._send_unavailable(e)
+        except InvalidParameterError as e:
+            self._send_error_json(str(e), 400)
         except Exception as e:
             logger.error(f"Error handling GET request: {e}\n{traceback.format_exc()}")
             self._send_error_json(str(e))
@@ -497,17 +3330,16 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
             parsed = urlparse(self.path)
             path = parsed.path
 
-            # Read request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self._send_error_json('Request body is required', 400)
+            # Always consume the body so the keep-alive connection stays in sync
+            data = self._read_json_body(required=not (path.startswith('/webhooks/') and path.endswith('/test')))
+            if data is None:
                 return
 
-            body = self.rfile.read(content_length)
-            try:
-                data = json.loads(body.decode('utf-8'))
-            except json.JSONDecodeError as e:
-                self._send_error_json(f'Invalid JSON: {e}', 400)
+            if not self._admit('POST', path, self._write_targets(path, data)):
+                return
+
+            if not self.dbus_interface.ready and path not in DBUS_FREE_ROUTES:
+                self._send_starting()
                 return
 
             # Route: POST /value
@@ -516,6 +3348,7 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                 ai_enabled, ai_message, ai_details = self.dbus_interface.is_ai_write_enabled()
                 if not ai_enabled:
                     logger.warning(f"Write blocked - AI_write disabled: {ai_message}")
+                    self._journal_write(data, 'blocked', ai_enabled, reason=ai_message)
                     self._send_json({
                         'error': 'AI write is disabled',
                         'message': ai_message,
@@ -537,16 +3370,33 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                     self._send_error_json('Missing value in request body', 400)
                     return
 
+                # Reject wrong types / out-of-range values before touching the path
+                try:
+                    dbus_value = self.dbus_interface.validate_write(service, dbus_path, value)
+                except WriteValidationError as e:
+                    self._journal_write(data, 'rejected', ai_enabled, reason=str(e))
+                    self._send_json({
+                        'error': 'Invalid value',
+                        'reason': str(e),
+                        'service': service,
+                        'path': dbus_path,
+                        'requested_value': value,
+                        'expected': e.metadata,
+                        'success': False
+                    }, 400)
+                    return
+
                 # Get current value first for comparison (returns None if unavailable)
-                old_value = self.dbus_interface.get_value(service, dbus_path)
+                old_value = self.dbus_interface.get_value(service, dbus_path, use_cache=False)
 
                 # Set the new value (returns -1 on error, 0 on success)
-                result = self.dbus_interface.set_value(service, dbus_path, value)
+                result = self.dbus_interface.set_value(service, dbus_path, dbus_value, validate=False)
 
                 if result == 0:
                     # Get new value to confirm (returns None if unavailable)
-                    new_value = self.dbus_interface.get_value(service, dbus_path)
+                    new_value = self.dbus_interface.get_value(service, dbus_path, use_cache=False)
                     logger.info(f"Value set: {service}{dbus_path} = {value} (was: {old_value})")
+                    self._journal_write(data, 'ok', ai_enabled, old_value=old_value, new_value=new_value)
                     self._send_json({
                         'service': service,
                         'path': dbus_path,
@@ -555,6 +3405,8 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                         'success': True
                     })
                 else:
+                    self._journal_write(data, 'failed', ai_enabled, old_value=old_value,
+                                        reason='SetValue refused the value')
                     self._send_json({
                         'error': 'Failed to set value',
                         'reason': 'Value may be out of range, invalid type, or path does not support writing',
@@ -564,14 +3416,71 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
                         'success': False
                     }, 400)
 
+            # Route: POST /values
+            elif path == '/values':
+                items = data.get('items') if isinstance(data, dict) else None
+                if not isinstance(items, list) or not all(
+                        isinstance(i, dict) and i.get('service') and i.get('path') for i in items):
+                    self._send_error_json('Body must be {"items": [{"service": ..., "path": ...}, ...]}', 400)
+                    return
+                if len(items) > BATCH_MAX_ITEMS:
+                    self._send_error_json(f'At most {BATCH_MAX_ITEMS} items per request', 400)
+                    return
+
+                values = []
+                for item in items:
+                    entry = {'service': item['service'], 'path': item['path'], 'value': None}
+                    try:
+                        entry['value'] = self.dbus_interface.get_value(item['service'], item['path'])
+                    except ServiceUnavailableError as e:
+                        # One unresponsive service doesn't fail the whole batch
+                        entry['error'] = str(e)
+                    values.append(entry)
+                self._send_json({'values': values, 'count': len(values), 'success': True})
+
+            # Route: POST /webhooks
+            elif path == '/webhooks':
+                data = data if isinstance(data, dict) else {}
+                name = data.get('name')
+                try:
+                    spec = WebhookManager.validate(name, {k: v for k, v in data.items() if k != 'name'})
+                except ValueError as e:
+                    self._send_error_json(f'Invalid webhook: {e}', 400)
+                    return
+                spec = {k: v for k, v in spec.items() if v is not None}
+
+                def register(config):
+                    # Replace (not merge into) a webhook of the same name
+                    restore_masked_secrets({'webhooks': {name: spec}}, config)
+                    config['webhooks'] = dict(config.get('webhooks') or {}, **{name: spec})
+                    return config
+
+                config_store.update(register)
+                logger.info(f"Webhook {name} registered for {spec['service']}{spec['path']} -> {spec['url']}")
+                self._send_json({'webhook': name, 'config': redact_config({'webhooks': {name: spec}})['webhooks'][name],
+                                 'success': True}, 201)
+
+            # Route: POST /webhooks/<name>/test
+            elif path.startswith('/webhooks/') and path.endswith('/test'):
+                name = path[len('/webhooks/'):-len('/test')]
+                if self.webhooks.test(name):
+                    self._send_json({'message': f'Test event queued for {name}', 'success': True}, 202)
+                else:
+                    self._send_error_json(f'Webhook {name} not found', 404)
+
+            # Route: POST /debug/profile, /debug/profile/sample, /debug/profile/tracemalloc
+            elif path.startswith('/debug/'):
+                self._debug_post(path, data if isinstance(data, dict) else {})
+
             # Route: POST /config
             elif path == '/config':
-                # Save configuration to file
-                config_data = data.get('config', data)
+                # Replace the whole configuration
+                config_data = data.get('config', data) if isinstance(data, dict) else data
+                if not isinstance(config_data, dict):
+                    self._send_error_json('Configuration must be a JSON object', 400)
+                    return
                 try:
-                    os.makedirs(CONFIG_DIR, exist_ok=True)
-                    with open(CONFIG_FILE, 'w') as f:
-                        json.dump(config_data, f, indent=2)
+                    config_store.replace(restore_masked_secrets(config_data, config_store.get()[0]))
                     logger.info(f"Configuration saved to {CONFIG_FILE}")
                     self._send_json({
                         'message': 'Configuration saved',
@@ -584,42 +3493,426 @@ class DBusAPIHandler(BaseHTTPRequestHandler):
             else:
                 self._send_error_json('Not found', 404)
 
+        except ServiceUnavailableError as e:
+            self._send_unavailable(e)
         except Exception as e:
             logger.error(f"Error handling POST request: {e}\n{traceback.format_exc()}")
             self._send_error_json(str(e))
 
+    def do_PATCH(self):
+        """Handle PATCH requests for partial configuration updates"""
+        try:
+            path = urlparse(self.path).path
+            data = self._read_json_body()
+            if data is None:
+                return
+
+            if not self._admit('PATCH', path):
+                return
+
+            # Route: PATCH /config
+            if path == '/config':
+                if not isinstance(data, dict):
+                    self._send_error_json('Merge patch must be a JSON object', 400)
+                    return
+                try:
+                    config = config_store.patch(restore_masked_secrets(data, config_store.get()[0]))
+                    logger.info(f"Configuration patched: {', '.join(data) or 'no changes'}")
+                    self._send_json({
+                        'config': redact_config(config),
+                        'path': CONFIG_FILE,
+                        'success': True
+                    })
+                except Exception as e:
+                    self._send_error_json(f'Failed to save config: {e}', 500)
+            else:
+                self._send_error_json('Not found', 404)
+
+        except Exception as e:
+            logger.error(f"Error handling PATCH request: {e}\n{traceback.format_exc()}")
+            self._send_error_json(str(e))
+
+    def do_DELETE(self):
+        """Handle DELETE requests for removing webhooks"""
+        try:
+            path = urlparse(self.path).path
+            # Discard any body so the keep-alive connection stays in sync
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            if not self._admit('DELETE', path):
+                return
+
+            # Route: DELETE /webhooks/<name>
+            if path.startswith('/webhooks/'):
+                name = path[len('/webhooks/'):]
+                if name not in (config_store.get()[0].get('webhooks') or {}):
+                    self._send_error_json(f'Webhook {name} not found', 404)
+                    return
+                config_store.patch({'webhooks': {name: None}})
+                logger.info(f"Webhook {name} removed")
+                self._send_json({'message': f'Webhook {name} removed', 'success': True})
+            else:
+                self._send_error_json('Not found', 404)
+
+        except Exception as e:
+            logger.error(f"Error handling DELETE request: {e}\n{traceback.format_exc()}")
+            self._send_error_json(str(e))
+
+    def _debug_allowed(self):
+        """Profiling routes are for the control server only
+
+        Returns: False after answering 403 itself
+        """
+        if self.client_address[0] in DEBUG_CLIENTS:
+            return True
+        self._send_error_json('Profiling is only available through the control server', 403)
+        return False
+
+    def _debug_post(self, path, data):
+        """Switch profilers on and off at runtime"""
+        if not self._debug_allowed():
+            return
+        try:
+            if path == '/debug/profile':
+                self.profiler.arm(data.get('requests', 0), reset=data.get('reset', True))
+                self._send_json(dict(self.profiler.status(), success=True))
+            elif path == '/debug/profile/sample':
+                if data.get('stop'):
+                    self.sampler.stop()
+                elif not self.sampler.start(data.get('seconds', 10),
+                                            data.get('interval_ms', SAMPLER_INTERVAL * 1000) / 1000):
+                    self._send_json(dict(self.sampler.status(), error='Sampling already running',
+                                         success=False), 409)
+                    return
+                self._send_json(dict(self.sampler.status(), success=True))
+            elif path == '/debug/profile/tracemalloc':
+                action = data.get('action')
+                if action == 'start':
+                    self.allocations.start(data.get('frames', TRACEMALLOC_FRAMES))
+                elif action == 'reset':
+                    self.allocations.reset()
+                elif action == 'stop':
+                    self.allocations.stop()
+                else:
+                    self._send_error_json('action must be start, reset or stop', 400)
+                    return
+                self._send_json({'tracing': self.allocations.tracing(),
+                                 'baseline_at': self.allocations.baseline_at, 'success': True})
+            else:
+                self._send_error_json('Not found', 404)
+        except (TypeError, ValueError) as e:
+            self._send_error_json(f'Invalid profiling parameters: {e}', 400)
+
+    def _write_targets(self, path, data):
+        """(service, path) pairs of a POST body, used to pick its lane"""
+        if path == '/value' and isinstance(data, dict) and data.get('service') and data.get('path'):
+            return [(data['service'], data['path'])]
+        if path == '/values' and isinstance(data, dict) and isinstance(data.get('items'), list):
+            return [(i['service'], i['path']) for i in data['items']
+                    if isinstance(i, dict) and isinstance(i.get('service'), str) and isinstance(i.get('path'), str)]
+        return ()
+
+    def _journal_write(self, data, outcome, ai_write, **details):
+        """Record a POST /value attempt in the write journal"""
+        self.journal.record(
+            client=self.client_address[0],
+            user_agent=self.headers.get('User-Agent'),
+            service=data.get('service'),
+            path=data.get('path'),
+            requested_value=data.get('value'),
+            outcome=outcome,
+            ai_write=ai_write,
+            **details
+        )
+
+    def _read_json_body(self, required=True):
+        """Read and parse the JSON request body
+
+        Returns: Parsed body ({} if empty and not required), or None after sending a 400 response
+        """
+        content_length = int(self.headers.get('Content-Length', 0))
+        if content_length == 0:
+            if not required:
+                return {}
+            self._send_error_json('Request body is required', 400)
+            return None
+
+        body = self.rfile.read(content_length)
+        try:
+            return json.loads(body.decode('utf-8'))
+        except json.JSONDecodeError as e:
+            self._send_error_json(f'Invalid JSON: {e}', 400)
+            return None
+
     def log_message(self, format, *args):
         """Override to use custom logger"""
         logger.info(f"{self.client_address[0]} - {format % args}")
 
 
-def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT):
-    """Run the HTTP server"""
+class APIServer(ThreadingHTTPServer):
+    """Threaded HTTP server that can drain in-flight requests before exiting"""
+
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, *args, **kwargs):
+        self.draining = False
+        self._active = 0
+        self._idle = threading.Condition()
+        super().__init__(*args, **kwargs)
+
+    def begin_request(self):
+        with self._idle:
+            self._active += 1
+
+    def end_request(self):
+        with self._idle:
+            self._active -= 1
+            self._idle.notify_all()
+
+    def drain(self, timeout):
+        """Wait for in-flight requests to finish
+
+        Returns: True if idle, False if requests were still running at timeout
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+
+
+class UnixAPIHandler(DBusAPIHandler):
+    """DBusAPIHandler for Unix socket connections (TCP_NODELAY does not apply)"""
+
+    disable_nagle_algorithm = False
+
+
+class UnixAPIServer(APIServer):
+    """APIServer listening on a Unix domain socket file
+
+    The socket is bound under a temporary name, given its group and mode,
+    and then renamed into place, so it is never reachable with looser
+    permissions. Every client is reported as UNIX_CLIENT.
+    """
+
+    address_family = socket.AF_UNIX
+
+    def __init__(self, path, handler, mode=UNIX_SOCKET_MODE, group=None, bind_and_activate=True):
+        self.mode = mode
+        self.group = group
+        self.owns_path = False  # Remove the file on close only if this server created or inherited it
+        super().__init__(path, handler, bind_and_activate)
+
+    def server_bind(self):
+        """Bind the socket file, replacing a stale one left by a crash
+
+        Raises: OSError if the path is not a socket or another server is listening on it
+        """
+        path = self.server_address
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.lexists(path):
+            if not stat.S_ISSOCK(os.lstat(path).st_mode):
+                raise OSError(f"{path} exists and is not a socket")
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+                raise OSError(f"Another server is listening on {path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                pass
+            finally:
+                probe.close()
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            self.socket.bind(tmp_path)
+            if self.group:
+                os.chown(tmp_path, -1, grp.getgrnam(self.group).gr_gid)
+            os.chmod(tmp_path, self.mode)
+            os.replace(tmp_path, path)
+            self.owns_path = True
+        except (OSError, KeyError):
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+    def get_request(self):
+        connection, _ = self.socket.accept()
+        return connection, (UNIX_CLIENT, 0)
+
+    def server_close(self):
+        """Close the socket and remove its file (not called on reload)"""
+        super().server_close()
+        if self.owns_path:
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def reexec(server, host, port, unix_server=None):
+    """Replace this process with a fresh copy that keeps the listening sockets
+
+    The pid does not change, so daemontools keeps supervising it, and
+    connections arriving meanwhile wait in the listen backlog instead of
+    being refused. Hot cache keys are handed over through a temp file.
+    """
+    args = [sys.executable, os.path.abspath(sys.argv[0])]
+    fds = []
+    if server is not None:
+        fds.append(server.socket.fileno())
+        args += ['--host', host, '--port', str(port), '--listen-fd', str(fds[-1])]
+    else:
+        args += ['--no-tcp']
+    if unix_server is not None:
+        fds.append(unix_server.socket.fileno())
+        args += ['--unix-socket', unix_server.server_address, '--unix-listen-fd', str(fds[-1]),
+                 '--socket-mode', oct(unix_server.mode)]
+        if unix_server.group:
+            args += ['--socket-group', unix_server.group]
+    for fd in fds:
+        os.set_inheritable(fd, True)
+
+    keys = DBusAPIHandler.dbus_interface.cache.hot_keys(CACHE_WARM_MAX_KEYS)
+    if keys:
+        warm_file = os.path.join(tempfile.gettempdir(), f'dbus-api-warm-{os.getpid()}.json')
+        try:
+            with open(warm_file, 'w') as f:
+                json.dump(keys, f)
+            args += ['--warm-file', warm_file]
+        except OSError as e:
+            logger.warning(f"Could not hand over cache keys: {e}")
+
+    logger.info(f"Reloading: re-executing with listening socket fd {', '.join(map(str, fds))}")
+    logging.shutdown()
+    sys.stdout.flush()
+    os.execv(sys.executable, args)
+
+
+def load_warm_keys(warm_file):
+    """Read and remove the cache key handover file of a reload"""
+    if not warm_file:
+        return []
+    try:
+        with open(warm_file, 'r') as f:
+            return [tuple(key) for key in json.load(f)]
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cache handover {warm_file}: {e}")
+        return []
+    finally:
+        try:
+            os.remove(warm_file)
+        except OSError:
+            pass
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, listen_fd=None, warm_file=None, tcp=True,
+               unix_socket=None, unix_listen_fd=None, socket_mode=UNIX_SOCKET_MODE, socket_group=None):
+    """Run the HTTP server on TCP, a Unix domain socket, or both
+
+    listen_fd/unix_listen_fd/warm_file are passed by reexec() on a graceful reload.
+    """
     try:
         # Set start time
         DBusAPIHandler.start_time = time.time()
 
-        # Initialize DBus interface
+        # Initialize DBus interface (connected after the socket is bound)
         dbus_interface = DBusInterface()
         DBusAPIHandler.dbus_interface = dbus_interface
-
-        # Create server
-        server = HTTPServer((host, port), DBusAPIHandler)
-        logger.info(f"Starting Victron DBus API Server v{VERSION} on {host}:{port}")
-        logger.info(f"Access API at http://{host}:{port}/")
+        DBusAPIHandler.inventory = DeviceInventory(dbus_interface)
+        views = DBusAPIHandler.views = ViewStore(dbus_interface)
+        views.configure(config_store.get()[0].get('views'))
+        config_store.subscribe(lambda config: views.configure(config.get('views')))
+        views.start()
+        energy = DBusAPIHandler.energy = EnergyIntegrator(dbus_interface)
+        energy.configure(config_store.get()[0].get('energy'))
+        config_store.subscribe(lambda config: energy.configure(config.get('energy')))
+        energy.start()
+        DBusAPIHandler.journal = WriteJournal()
+        DBusAPIHandler.profiler = RequestProfiler()
+        DBusAPIHandler.sampler = SamplingProfiler()
+        DBusAPIHandler.allocations = AllocationTracker()
+        webhooks = DBusAPIHandler.webhooks = WebhookManager(dbus_interface)
+        webhooks.configure(config_store.get()[0].get('webhooks'))
+        config_store.subscribe(lambda config: webhooks.configure(config.get('webhooks')))
+        webhooks.start()
+        rate_limiter = DBusAPIHandler.rate_limiter = RateLimiter()
+        rate_limiter.configure(config_store.get()[0].get('rate_limit'))
+        config_store.subscribe(lambda config: rate_limiter.configure(config.get('rate_limit')))
+        DBusAPIHandler.journal.start()
+
+        # Create servers (threaded so slow DBus calls don't block other clients)
+        server = unix_server = None
+        if tcp:
+            if listen_fd is None:
+                server = APIServer((host, port), DBusAPIHandler)
+            else:
+                # Reload: take over the listening socket of the previous process
+                server = APIServer((host, port), DBusAPIHandler, bind_and_activate=False)
+                server.socket.close()
+                server.socket = socket.socket(fileno=listen_fd)
+                server.server_address = server.socket.getsockname()
+            logger.info(f"Starting Victron DBus API Server v{VERSION} on {host}:{port}")
+        if unix_socket:
+            if unix_listen_fd is None:
+                unix_server = UnixAPIServer(unix_socket, UnixAPIHandler, socket_mode, socket_group)
+            else:
+                unix_server = UnixAPIServer(unix_socket, UnixAPIHandler, socket_mode, socket_group,
+                                            bind_and_activate=False)
+                unix_server.socket.close()
+                unix_server.socket = socket.socket(fileno=unix_listen_fd)
+                unix_server.owns_path = True
+            logger.info(f"Starting Victron DBus API Server v{VERSION} on unix:{unix_socket} "
+                        f"(mode {oct(socket_mode)}{', group ' + socket_group if socket_group else ''})")
+        servers = [s for s in (server, unix_server) if s is not None]
+        if not servers:
+            raise ValueError("No listener: TCP is disabled and no Unix socket was given")
+        reloaded = listen_fd is not None or unix_listen_fd is not None
+
+        if reloaded and dbus_interface.connect():
+            # New connections wait in the backlog until the cache is warm
+            dbus_interface.warm_cache(load_warm_keys(warm_file))
+        else:
+            # Answer /health as "starting" until the system bus is reachable
+            dbus_interface.connect_in_background()
+        if server is not None:
+            logger.info(f"Access API at http://{host}:{port}/")
+        if unix_server is not None:
+            logger.info(f"Access API with curl --unix-socket {unix_socket} http://localhost/")
         logger.info(f"Server management available on port 8089")
 
-        # Handle shutdown gracefully
+        # SIGHUP = graceful reload, SIGTERM/SIGINT = graceful shutdown
+        stop = {'reload': False}
+
         def signal_handler(sig, frame):
-            logger.info("Shutting down server (signal)...")
-            server.shutdown()
-            sys.exit(0)
+            stop['reload'] = sig == signal.SIGHUP
+            logger.info(f"{'Reloading' if stop['reload'] else 'Shutting down'} server (signal)...")
+            # shutdown() waits for serve_forever() to return, which runs on this thread
+            threading.Thread(target=lambda: [s.shutdown() for s in servers], daemon=True).start()
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
-
-        # Start server
-        server.serve_forever()
+        signal.signal(signal.SIGHUP, signal_handler)
+
+        # Start servers (the second listener, if any, on its own thread)
+        for extra in servers[1:]:
+            threading.Thread(target=extra.serve_forever, name='unix-listener', daemon=True).start()
+        servers[0].serve_forever()
+        for extra in servers[1:]:
+            extra.shutdown()
+
+        # No longer accepting - let in-flight requests finish
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        for s in servers:
+            s.draining = True
+        if not all([s.drain(max(0, deadline - time.monotonic())) for s in servers]):
+            logger.warning(f"Requests still running after {DRAIN_TIMEOUT}s drain timeout")
+        energy.save()
+        DBusAPIHandler.journal.flush()
+        if stop['reload']:
+            reexec(server, host, port, unix_server)
+        for s in servers:
+            s.server_close()
+        sys.exit(0)
 
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
@@ -632,7 +3925,21 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Victron DBus API Server')
     parser.add_argument('--host', default=DEFAULT_HOST, help=f'Host to bind to (default: {DEFAULT_HOST})')
     parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--listen-fd', type=int, default=None, help='Inherited listening socket (internal, used by reload)')
+    parser.add_argument('--warm-file', default=None, help='Cache keys to pre-warm (internal, used by reload)')
+    parser.add_argument('--no-tcp', dest='tcp', action='store_false',
+                        help='Do not listen on TCP (use with --unix-socket)')
+    parser.add_argument('--unix-socket', default=None, metavar='PATH',
+                        help=f'Also listen on this Unix domain socket (e.g. {UNIX_SOCKET_PATH})')
+    parser.add_argument('--socket-mode', type=lambda v: int(v, 8), default=UNIX_SOCKET_MODE,
+                        help=f'Permissions of the Unix socket file, octal (default: {UNIX_SOCKET_MODE:o})')
+    parser.add_argument('--socket-group', default=None, help='Group owning the Unix socket file')
+    parser.add_argument('--unix-listen-fd', type=int, default=None,
+                        help='Inherited Unix listening socket (internal, used by reload)')
 
     args = parser.parse_args()
+    if not args.tcp and not args.unix_socket:
+        parser.error('--no-tcp needs --unix-socket')
 
-    run_server(args.host, args.port)
+    run_server(args.host, args.port, args.listen_fd, args.warm_file, args.tcp,
+               args.unix_socket, args.unix_listen_fd, args.socket_mode, args.socket_group)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Victron Fleet Aggregator
+Queries many GX devices running dbus_api_server.py concurrently and merges the results
+
+Usage:
+    python3 fleet_aggregator.py --nodes fleet.json soc
+    python3 fleet_aggregator.py --nodes fleet.json get /health
+    python3 fleet_aggregator.py --nodes fleet.json serve --port 8090
+
+fleet.json:
+    {"nodes": [{"name": "site-a", "url": "http://192.168.88.77:8088"},
+               {"name": "site-b", "url": "http://10.8.0.12:8088", "timeout": 15}]}
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qsl
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 5  # Seconds per node (read timeout; LTE sites may need more)
+CONNECT_TIMEOUT = 3
+MAX_WORKERS = 64  # Concurrent node requests
+POOL_SIZE_PER_NODE = 4  # Keep-alive connections kept per node
+
+
+class FleetNode:
+    """One GX device in the fleet"""
+
+    def __init__(self, name: str, url: str, timeout: float = DEFAULT_TIMEOUT):
+        self.name = name
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+
+def load_nodes(path: str) -> List[FleetNode]:
+    """Load the node list from a fleet JSON file"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    nodes = data.get('nodes', data) if isinstance(data, dict) else data
+    return [FleetNode(n['name'], n['url'], n.get('timeout', DEFAULT_TIMEOUT)) for n in nodes]
+
+
+class FleetAggregator:
+    """Fan one API request out to every node and merge the answers
+
+    All nodes share one requests.Session whose connection pool keeps a few
+    keep-alive connections per node, so repeated fleet queries don't pay
+    a TCP handshake per site. A node that times out or errors is reported
+    under "errors" without failing the whole query.
+    """
+
+    def __init__(self, nodes: List[FleetNode], max_workers: int = MAX_WORKERS):
+        self.nodes = {node.name: node for node in nodes}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(nodes), 10), pool_maxsize=POOL_SIZE_PER_NODE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fleet')
+
+    def query(self, path: str, params: Optional[Dict[str, Any]] = None,
+              names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """GET path on every node (or the named subset) concurrently
+
+        Returns: {'results': {node: json}, 'errors': {node: {...}}, 'ok', 'failed', 'elapsed_ms'}
+        """
+        nodes = [self.nodes[n] for n in names if n in self.nodes] if names else list(self.nodes.values())
+        started = time.monotonic()
+        futures = {node.name: self.executor.submit(self._get, node, path, params) for node in nodes}
+
+        results, errors = {}, {}
+        for name, future in futures.items():
+            ok, payload = future.result()
+            (results if ok else errors)[name] = payload
+        return {
+            'path': path,
+            'results': results,
+            'errors': errors,
+            'ok': len(results),
+            'failed': len(errors),
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        }
+
+    def get_value(self, service: str, path: str, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Read one DBus value on every node
+
+        Returns: {'values': {node: value}, 'errors': {...}, ...}
+        """
+        merged = self.query('/value', {'service': service, 'path': path}, names)
+        merged['values'] = {name: r.get('value') for name, r in merged.pop('results').items()}
+        return merged
+
+    def soc(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Battery state of charge of every site"""
+        return self.get_value('com.victronenergy.system', '/Dc/Battery/Soc', names)
+
+    def view(self, view: str, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Fetch a named view (GET /views/<name>) from every node"""
+        merged = self.query(f'/views/{view}', None, names)
+        merged['values'] = {name: r.get('values', {}) for name, r in merged.pop('results').items()}
+        return merged
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    def _get(self, node: FleetNode, path: str, params: Optional[Dict[str, Any]]):
+        """Query one node
+
+        Returns: (True, json) or (False, error dict)
+        """
+        try:
+            response = self.session.get(f"{node.url}{path}", params=params,
+                                        timeout=(CONNECT_TIMEOUT, node.timeout))
+            if response.status_code >= 400:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = None
+                error = data.get('error') if isinstance(data, dict) else None
+                return False, {'error': error or response.reason, 'type': 'http',
+                               'status': response.status_code}
+            data = response.json()
+        except requests.Timeout:
+            return False, {'error': f'No answer within {node.timeout}s', 'type': 'timeout'}
+        except requests.ConnectionError:
+            return False, {'error': f'Cannot connect to {node.url}', 'type': 'connection'}
+        except ValueError:
+            # Also requests.JSONDecodeError
+            return False, {'error': 'Invalid JSON response', 'type': 'protocol'}
+        except requests.RequestException as e:
+            return False, {'error': str(e), 'type': 'request'}
+        if not isinstance(data, dict):
+            return False, {'error': f'Expected a JSON object, got {type(data).__name__}', 'type': 'protocol'}
+        return True, data
+
+
+class FleetProxyHandler(BaseHTTPRequestHandler):
+    """Serve fleet queries over HTTP: GET /<api path> fans out to every node
+
+    Example: GET /value?service=com.victronenergy.system&path=/Dc/Battery/Soc
+    Optional ?nodes=a,b limits the query to a subset of nodes.
+    Answers 502 when every queried node failed, 500 if the query itself fails.
+    """
+
+    aggregator = None  # Shared FleetAggregator instance
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = dict(parse_qsl(parsed.query))
+        names = params.pop('nodes', None)
+
+        try:
+            # Route: GET /nodes
+            if parsed.path == '/nodes':
+                data = {'nodes': [{'name': n.name, 'url': n.url, 'timeout': n.timeout}
+                                  for n in self.aggregator.nodes.values()]}
+            else:
+                data = self.aggregator.query(parsed.path, params, names.split(',') if names else None)
+        except Exception as e:
+            self._send_json({'error': str(e), 'success': False}, 500)
+            return
+
+        # 502 when no node answered, so proxies and monitors see the failure
+        status = 502 if data.get('results') == {} and data.get('errors') else 200
+        self._send_json(data, status)
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, indent=2).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query a fleet of Victron DBus API servers')
+    parser.add_argument('--nodes', required=True, help='Fleet JSON file with node names and URLs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('soc', help='Battery SoC of every site')
+    get = sub.add_parser('get', help='GET an API path on every node')
+    get.add_argument('path')
+    get.add_argument('params', nargs='*', help='key=value query parameters')
+    serve = sub.add_parser('serve', help='Run the aggregator as an HTTP proxy')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8090)
+    args = parser.parse_args()
+
+    aggregator = FleetAggregator(load_nodes(args.nodes))
+
+    if args.command == 'serve':
+        FleetProxyHandler.aggregator = aggregator
+        server = ThreadingHTTPServer((args.host, args.port), FleetProxyHandler)
+        server.daemon_threads = True
+        print(f"Fleet proxy for {len(aggregator.nodes)} nodes on http://{args.host}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == 'soc':
+        result = aggregator.soc()
+        print("=" * 80)
+        print(f"Battery SoC ({result['ok']}/{len(aggregator.nodes)} nodes, {result['elapsed_ms']} ms)")
+        print("=" * 80)
+        for name, value in sorted(result['values'].items()):
+            print(f"  {name:<30} {value if value is not None else '-':>8} %")
+        for name, error in sorted(result['errors'].items()):
+            print(f"  {name:<30} {'ERROR':>8}   {error['type']}: {error['error']}")
+    else:
+        params = dict(p.split('=', 1) for p in args.params)
+        print(json.dumps(aggregator.query(args.path, params), indent=2))
+    aggregator.close()
+
+
+if __name__ == '__main__':
+    main()
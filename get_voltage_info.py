@@ -4,117 +4,75 @@ Victron Voltage Information Script
 Queries all devices for voltage readings (DC and AC)
 """
 
-import requests
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any
 from datetime import datetime
 
-API_BASE_URL = "http://192.168.88.77:8088"
+from victron_api_client import VictronClient, VictronAPIError
 
+API_BASE_URL = "http://192.168.88.77:8088"
 
-def get_services() -> List[str]:
-    """Get all available Victron services"""
-    response = requests.get(f"{API_BASE_URL}/services")
-    data = response.json()
-    return data.get('services', [])
-
-
-def get_value(service: str, path: str) -> Optional[Any]:
-    """Get value from specific dbus path"""
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/value",
-            params={'service': service, 'path': path},
-            timeout=2
-        )
-        data = response.json()
-        if data.get('success'):
-            return data.get('value')
-        return None
-    except Exception:
-        return None
-
-
-def get_dc_voltages(service: str) -> Dict[str, Any]:
-    """Get DC voltage readings from a service"""
-    voltages = {}
-
-    # Common DC voltage paths
-    dc_paths = [
-        '/Dc/0/Voltage',
-        '/Dc/1/Voltage',
-        '/Dc/Battery/Voltage',
-        '/Dc/System/Voltage',
-        '/Dc/Pv/Voltage',
-    ]
-
-    for path in dc_paths:
-        value = get_value(service, path)
-        if value is not None:
-            voltages[path] = value
-
-    return voltages
-
-
-def get_ac_voltages(service: str) -> Dict[str, Any]:
-    """Get AC voltage readings from a service"""
-    voltages = {}
-
-    # Common AC voltage paths for all three phases
-    ac_paths = [
-        # Output voltages
-        '/Ac/Out/L1/V',
-        '/Ac/Out/L2/V',
-        '/Ac/Out/L3/V',
-        # Input voltages
-        '/Ac/In/1/L1/V',
-        '/Ac/In/1/L2/V',
-        '/Ac/In/1/L3/V',
-        '/Ac/In/2/L1/V',
-        '/Ac/In/2/L2/V',
-        '/Ac/In/2/L3/V',
-        # Generic AC voltages (for meters, etc)
-        '/Ac/L1/Voltage',
-        '/Ac/L2/Voltage',
-        '/Ac/L3/Voltage',
-        # ActiveIn voltages
-        '/Ac/ActiveIn/L1/V',
-        '/Ac/ActiveIn/L2/V',
-        '/Ac/ActiveIn/L3/V',
-    ]
-
-    for path in ac_paths:
-        value = get_value(service, path)
-        if value is not None:
-            voltages[path] = value
-
-    return voltages
-
-
-def get_voltage_settings() -> Dict[str, Any]:
-    """Get voltage-related settings"""
-    settings = {}
-
-    voltage_settings_paths = [
-        '/Settings/SystemSetup/MaxChargeVoltage',
-        '/Settings/SystemSetup/SharedVoltageSense',
-        '/Settings/Generator0/BatteryVoltage/StartValue',
-        '/Settings/Generator0/BatteryVoltage/StopValue',
-        '/Settings/Alarm/Vebus/HighDcVoltage',
-    ]
-
-    for path in voltage_settings_paths:
-        value = get_value('com.victronenergy.settings', path)
-        if value is not None:
-            settings[path] = value
-
-    return settings
-
-
-def get_device_name(service: str) -> str:
+# Common DC voltage paths
+DC_PATHS = [
+    '/Dc/0/Voltage',
+    '/Dc/1/Voltage',
+    '/Dc/Battery/Voltage',
+    '/Dc/System/Voltage',
+    '/Dc/Pv/Voltage',
+]
+
+# Common AC voltage paths for all three phases
+AC_PATHS = [
+    # Output voltages
+    '/Ac/Out/L1/V',
+    '/Ac/Out/L2/V',
+    '/Ac/Out/L3/V',
+    # Input voltages
+    '/Ac/In/1/L1/V',
+    '/Ac/In/1/L2/V',
+    '/Ac/In/1/L3/V',
+    '/Ac/In/2/L1/V',
+    '/Ac/In/2/L2/V',
+    '/Ac/In/2/L3/V',
+    # Generic AC voltages (for meters, etc)
+    '/Ac/L1/Voltage',
+    '/Ac/L2/Voltage',
+    '/Ac/L3/Voltage',
+    # ActiveIn voltages
+    '/Ac/ActiveIn/L1/V',
+    '/Ac/ActiveIn/L2/V',
+    '/Ac/ActiveIn/L3/V',
+]
+
+NAME_PATHS = ['/ProductName', '/CustomName']
+
+VOLTAGE_SETTINGS_PATHS = [
+    '/Settings/SystemSetup/MaxChargeVoltage',
+    '/Settings/SystemSetup/SharedVoltageSense',
+    '/Settings/Generator0/BatteryVoltage/StartValue',
+    '/Settings/Generator0/BatteryVoltage/StopValue',
+    '/Settings/Alarm/Vebus/HighDcVoltage',
+]
+
+
+def fetch_values(client: VictronClient, services: List[str]) -> Dict[tuple, Any]:
+    """Read every voltage, name and settings path in batched requests"""
+    items = [(service, path) for service in services for path in DC_PATHS + AC_PATHS + NAME_PATHS]
+    items += [('com.victronenergy.settings', path) for path in VOLTAGE_SETTINGS_PATHS]
+    # A service that is not answering just shows no values
+    return {key: value for key, value in client.get_values(items, raise_errors=False).items()
+            if not isinstance(value, VictronAPIError)}
+
+
+def pick(values: Dict[tuple, Any], service: str, paths: List[str]) -> Dict[str, Any]:
+    """Return the available values of paths on a service"""
+    return {path: values[(service, path)] for path in paths if values.get((service, path)) is not None}
+
+
+def get_device_name(values: Dict[tuple, Any], service: str) -> str:
     """Get human-readable device name"""
-    product_name = get_value(service, '/ProductName')
-    custom_name = get_value(service, '/CustomName')
+    product_name = values.get((service, '/ProductName'))
+    custom_name = values.get((service, '/CustomName'))
 
     if custom_name:
         return f"{product_name} ({custom_name})" if product_name else custom_name
@@ -134,22 +92,25 @@ def main():
         'settings': {}
     }
 
+    client = VictronClient(API_BASE_URL)
+
     # Get all services
-    services = get_services()
+    services = client.services()
 
     # Filter for device services
     device_services = [s for s in services if s.startswith('com.victronenergy.')
                       and s != 'com.victronenergy.settings']
+    values = fetch_values(client, device_services)
 
     print("DC Voltages:")
     print("-" * 80)
 
     dc_found = False
     for service in sorted(device_services):
-        dc_voltages = get_dc_voltages(service)
+        dc_voltages = pick(values, service, DC_PATHS)
         if dc_voltages:
             dc_found = True
-            device_name = get_device_name(service)
+            device_name = get_device_name(values, service)
             print(f"\n{device_name}")
             print(f"  Service: {service}")
             for path, value in dc_voltages.items():
@@ -173,10 +134,10 @@ def main():
 
     ac_found = False
     for service in sorted(device_services):
-        ac_voltages = get_ac_voltages(service)
+        ac_voltages = pick(values, service, AC_PATHS)
         if ac_voltages:
             ac_found = True
-            device_name = get_device_name(service)
+            device_name = get_device_name(values, service)
             print(f"\n{device_name}")
             print(f"  Service: {service}")
             for path, value in ac_voltages.items():
@@ -204,7 +165,7 @@ def main():
     print("Voltage Settings:")
     print("-" * 80)
 
-    voltage_settings = get_voltage_settings()
+    voltage_settings = pick(values, 'com.victronenergy.settings', VOLTAGE_SETTINGS_PATHS)
     if voltage_settings:
         for path, value in voltage_settings.items():
             print(f"  {path}: {value}")
@@ -61,6 +61,7 @@ mkdir -p "$INSTALL_DIR"
 echo "[3/7] Copying server files..."
 cp "$SCRIPT_DIR/dbus_api_server.py" "$INSTALL_DIR/"
 cp "$SCRIPT_DIR/dbus_api_control.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/QUICK_REFERENCE_DIAGNOSTIC_PATHS.json" "$INSTALL_DIR/"  # Request priority lanes
 chmod +x "$INSTALL_DIR/dbus_api_server.py"
 chmod +x "$INSTALL_DIR/dbus_api_control.py"
 
@@ -0,0 +1,83 @@
+"""ChangeLog sequence numbers, resume windows and resync"""
+
+import unittest
+
+from dbus_api_server import ChangeLog
+
+SYSTEM = 'com.victronenergy.system'
+SOC = '/Dc/Battery/Soc'
+POWER = '/Dc/Battery/Power'
+
+
+class ChangeLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log = ChangeLog(size=5)
+
+    def test_only_changed_values_get_a_sequence(self):
+        self.assertEqual(self.log.record(SYSTEM, SOC, 50), 1)
+        self.assertEqual(self.log.record(SYSTEM, SOC, 50), 1)
+        self.assertEqual(self.log.record(SYSTEM, POWER, 100), 2)
+        self.assertEqual(self.log.record(SYSTEM, SOC, 51), 3)
+        self.assertEqual(self.log.seq_for(SYSTEM, SOC), 3)
+        self.assertEqual(self.log.seq_for(SYSTEM, '/Unknown'), 0)
+
+    def test_since_returns_latest_value_per_path(self):
+        self.log.record(SYSTEM, SOC, 50)
+        self.log.record(SYSTEM, POWER, 100)
+        self.log.record(SYSTEM, SOC, 51)
+        self.log.record(SYSTEM, SOC, 52)
+        result = self.log.since(1, self.log.epoch)
+        self.assertFalse(result['resync'])
+        self.assertEqual(result['seq'], 4)
+        self.assertEqual(result['changes'], [(2, SYSTEM, POWER, 100), (4, SYSTEM, SOC, 52)])
+
+    def test_up_to_date_client_gets_nothing(self):
+        self.log.record(SYSTEM, SOC, 50)
+        result = self.log.since(1, self.log.epoch)
+        self.assertEqual((result['resync'], result['changes']), (False, []))
+
+    def test_first_poll_is_a_resync(self):
+        self.log.record(SYSTEM, SOC, 50)
+        self.log.record(SYSTEM, POWER, 100)
+        result = self.log.since(None)
+        self.assertTrue(result['resync'])
+        self.assertEqual(result['changes'], [(1, SYSTEM, SOC, 50), (2, SYSTEM, POWER, 100)])
+
+    def test_other_epoch_is_a_resync(self):
+        self.log.record(SYSTEM, SOC, 50)
+        self.assertTrue(self.log.since(1, self.log.epoch - 1)['resync'])
+        self.assertTrue(self.log.since(0)['resync'])
+
+    def test_sequence_from_the_future_is_a_resync(self):
+        self.log.record(SYSTEM, SOC, 50)
+        self.assertTrue(self.log.since(7, self.log.epoch)['resync'])
+
+    def test_client_behind_the_window_is_resynced(self):
+        for value in range(8):
+            self.log.record(SYSTEM, SOC, value)  # seq 1..8, window keeps 4..8
+        self.assertFalse(self.log.since(3, self.log.epoch)['resync'])
+        result = self.log.since(2, self.log.epoch)
+        self.assertTrue(result['resync'])
+        self.assertEqual(result['changes'], [(8, SYSTEM, SOC, 7)])
+        self.assertEqual(self.log.stats()['oldest_seq'], 4)
+
+    def test_listeners_see_changes_only(self):
+        seen = []
+        self.log.subscribe(lambda service, path, value, timestamp: seen.append((path, value)))
+        self.log.subscribe(lambda *args: 1 / 0)  # A failing listener does not stop recording
+        with self.assertLogs('DBusAPIServer', 'ERROR'):
+            for value in (50, 50, 51):
+                self.log.record(SYSTEM, SOC, value)
+        self.assertEqual(seen, [(SOC, 50), (SOC, 51)])
+        self.assertEqual(self.log.seq, 2)
+
+    def test_stats(self):
+        self.log.record(SYSTEM, SOC, 50)
+        self.log.record(SYSTEM, POWER, 100)
+        stats = self.log.stats()
+        self.assertEqual((stats['seq'], stats['paths'], stats['window'], stats['oldest_seq']), (2, 2, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""CircuitBreaker states and adaptive call timeouts"""
+
+import time
+import unittest
+from unittest import mock
+
+import dbus_api_server
+from dbus_api_server import (BREAKER_FAILURE_THRESHOLD, DBUS_TIMEOUT_INITIAL, DBUS_TIMEOUT_MAX,
+                             DBUS_TIMEOUT_MIN, CircuitBreaker, ServiceUnavailableError)
+
+SERVICE = 'com.victronenergy.battery.ttyUSB0'
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(dbus_api_server, 'BREAKER_RESET_SECONDS', 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(SERVICE)
+
+    def open_circuit(self):
+        for _ in range(BREAKER_FAILURE_THRESHOLD):
+            self.breaker.before_call()
+            self.breaker.record_failure('GetValue', 'NoReply')
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+            self.breaker.record_failure('GetValue', 'NoReply')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure('GetValue', 'NoReply')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(ServiceUnavailableError) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.service, SERVICE)
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(self.breaker.status()['last_error'], 'NoReply')
+
+    def test_success_resets_failure_count(self):
+        for _ in range(BREAKER_FAILURE_THRESHOLD - 1):
+            self.breaker.record_failure('GetValue', 'NoReply')
+        self.breaker.record_success('GetValue', 0.01)
+        self.breaker.record_failure('GetValue', 'NoReply')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.status()['consecutive_failures'], 1)
+
+    def test_half_open_lets_one_probe_through(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        with self.assertRaises(ServiceUnavailableError):
+            self.breaker.before_call()
+
+    def test_probe_success_closes(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.breaker.before_call()
+        self.breaker.record_success('GetValue', 0.01)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.before_call()
+        self.breaker.before_call()
+
+    def test_probe_failure_reopens(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.breaker.before_call()
+        self.breaker.record_failure('GetValue', 'NoReply')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(ServiceUnavailableError):
+            self.breaker.before_call()
+
+    def test_aborted_probe_frees_the_slot(self):
+        self.open_circuit()
+        time.sleep(0.06)
+        self.breaker.before_call()
+        self.breaker.abort_call()
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+
+class AdaptiveTimeoutTest(unittest.TestCase):
+
+    def test_initial_timeout(self):
+        self.assertEqual(CircuitBreaker(SERVICE).timeout_for('GetValue'), DBUS_TIMEOUT_INITIAL)
+
+    def test_fast_replies_shrink_to_minimum(self):
+        breaker = CircuitBreaker(SERVICE)
+        for _ in range(20):
+            breaker.record_success('GetValue', 0.005)
+        self.assertEqual(breaker.timeout_for('GetValue'), DBUS_TIMEOUT_MIN)
+        self.assertEqual(breaker.timeout_for('GetItems'), DBUS_TIMEOUT_INITIAL)
+
+    def test_timeout_follows_rtt_and_deviation(self):
+        breaker = CircuitBreaker(SERVICE)
+        breaker.record_success('GetItems', 1.0)
+        # srtt 1.0, rttvar 0.5 -> 1.0 + 4 * 0.5
+        self.assertAlmostEqual(breaker.timeout_for('GetItems'), 3.0)
+        breaker.record_success('GetItems', 2.0)
+        # rttvar 0.75 * 0.5 + 0.25 * 1.0, srtt 0.875 * 1.0 + 0.125 * 2.0
+        self.assertAlmostEqual(breaker.timeout_for('GetItems'), 1.125 + 4 * 0.625)
+
+    def test_slow_replies_are_capped(self):
+        breaker = CircuitBreaker(SERVICE)
+        breaker.record_success('GetItems', 30)
+        self.assertEqual(breaker.timeout_for('GetItems'), DBUS_TIMEOUT_MAX)
+
+    def test_failures_double_the_timeout_up_to_max(self):
+        breaker = CircuitBreaker(SERVICE)
+        breaker.record_success('GetValue', 0.3)
+        timeout = breaker.timeout_for('GetValue')
+        breaker.record_failure('GetValue', 'NoReply')
+        self.assertAlmostEqual(breaker.timeout_for('GetValue'), timeout * 2)
+        for _ in range(10):
+            breaker.record_failure('GetValue', 'NoReply')
+        self.assertEqual(breaker.timeout_for('GetValue'), DBUS_TIMEOUT_MAX)
+        self.assertEqual(breaker.status()['timeouts'], {'GetValue': DBUS_TIMEOUT_MAX})
+
+    def test_first_reply_after_failures_restarts_estimate(self):
+        breaker = CircuitBreaker(SERVICE)
+        breaker.record_failure('GetValue', 'NoReply')
+        breaker.record_success('GetValue', 0.5)
+        self.assertAlmostEqual(breaker.timeout_for('GetValue'), 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""ConfigStore writes and subscriber notification order"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from dbus_api_server import ConfigStore
+
+
+class PausingLock:
+    """Lock wrapper that can hold one thread back right after it releases
+
+    Simulates a writer being preempted between its write and its
+    notification.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pause_thread = None
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        if threading.current_thread().name == self.pause_thread:
+            self.pause_thread = None
+            self.paused.set()
+            self.resume.wait(5)
+
+
+class ConfigStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'config.json')
+        self.store = ConfigStore(self.path)
+        self.seen = []
+        self.store.subscribe(lambda config: self.seen.append(config.get('v')))
+
+    def file_config(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_replace_patch_update_notify(self):
+        self.store.replace({'v': 1, 'keep': True})
+        self.store.patch({'v': 2})
+        self.store.update(lambda config: dict(config, v=config['v'] + 1))
+        self.assertEqual(self.seen, [1, 2, 3])
+        self.assertEqual(self.file_config(), {'v': 3, 'keep': True})
+        self.assertEqual(self.store.get(), ({'v': 3, 'keep': True}, True))
+
+    def test_file_edited_by_hand_is_reloaded_and_announced(self):
+        self.store.replace({'v': 1})
+        with open(self.path, 'w') as f:
+            json.dump({'v': 'by hand', 'extra': 1}, f)
+        self.assertEqual(self.store.get()[0], {'v': 'by hand', 'extra': 1})
+        self.assertEqual(self.seen, [1, 'by hand'])
+
+    def test_overtaken_notification_is_dropped(self):
+        lock = self.store._lock = PausingLock()
+        lock.pause_thread = 'first'
+        first = threading.Thread(target=self.store.replace, args=({'v': 1},), name='first')
+        first.start()
+        self.assertTrue(lock.paused.wait(5))
+        # The second write lands and is announced while the first is still on its way
+        self.store.replace({'v': 2})
+        lock.resume.set()
+        first.join(5)
+        self.assertEqual(self.seen, [2])
+        self.assertEqual(self.file_config(), {'v': 2})
+
+    def test_notifications_do_not_overlap(self):
+        entered = threading.Event()
+        release = threading.Event()
+        active = []
+        overlaps = []
+
+        def slow_listener(config):
+            if active:
+                overlaps.append(config.get('v'))
+            active.append(True)
+            if config.get('v') == 1:
+                entered.set()
+                release.wait(5)
+            active.pop()
+
+        self.store.subscribe(slow_listener)
+        first = threading.Thread(target=self.store.replace, args=({'v': 1},))
+        first.start()
+        self.assertTrue(entered.wait(5))
+        second = threading.Thread(target=self.store.replace, args=({'v': 2},))
+        second.start()
+        second.join(0.2)
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(overlaps, [])
+        self.assertEqual(self.seen, [1, 2])
+
+    def test_concurrent_writers_end_with_the_stored_config(self):
+        latest = []
+        self.store.subscribe(lambda config: latest.append(config))
+        threads = [threading.Thread(target=self.store.patch, args=({f'k{i}': i, 'v': i},)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(latest[-1], self.file_config())
+        self.assertEqual(len(self.file_config()), 21)
+
+    def test_listener_may_read_the_config(self):
+        reads = []
+        self.store.subscribe(lambda config: reads.append(self.store.get()[0]))
+        self.store.replace({'v': 1})
+        self.assertEqual(reads, [{'v': 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+"""Control server HTTP handling and its requests to the main API"""
+
+import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+import dbus_api_control as control
+
+
+class ControlQueryParamsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.log_dir = tempfile.mkdtemp()
+        with open(os.path.join(cls.log_dir, 'current'), 'w') as f:
+            for i in range(5):
+                f.write(f'2024-01-01 00:00:0{i} - DBusAPIServer - INFO - line {i}\n')
+        sampler = control.ResourceSampler({'dbus-api-control': os.getpid})
+        for _ in range(3):
+            sampler.sample_once()
+        cls.patchers = [mock.patch.object(control, 'log_reader', control.LogReader(cls.log_dir)),
+                        mock.patch.object(control, 'resource_sampler', sampler)]
+        for patcher in cls.patchers:
+            patcher.start()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), control.ControlAPIHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        for patcher in cls.patchers:
+            patcher.stop()
+        shutil.rmtree(cls.log_dir)
+
+    def get(self, path):
+        return requests.get(self.url + path, timeout=5)
+
+    def assert_bad_request(self, path, name):
+        response = self.get(path)
+        self.assertEqual(response.status_code, 400, path)
+        self.assertIn(name, response.json()['error'])
+        self.assertFalse(response.json()['success'])
+
+    def test_logs_lines(self):
+        self.assertEqual(self.get('/logs?lines=2').json()['lines_returned'], 2)
+        self.assertEqual(self.get('/logs?lines=-3').json()['lines_requested'], 1)
+        self.assertEqual(self.get('/logs?lines=0').json()['lines_returned'], 1)
+        self.assertEqual(self.get(f'/logs?lines={control.LOG_MAX_LINES * 10}').json()['lines_requested'],
+                         control.LOG_MAX_LINES)
+        self.assert_bad_request('/logs?lines=abc', 'lines')
+
+    def ndjson(self, path):
+        response = self.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    def test_logs_query_lines_and_limit(self):
+        self.assertEqual([r['message'][-6:] for r in self.ndjson('/logs/query?lines=2')], ['line 3', 'line 4'])
+        self.assertEqual(len(self.ndjson('/logs/query?lines=-1')), 1)
+        self.assertEqual(len(self.ndjson('/logs/query?since=0&limit=2')), 2)
+        self.assertEqual(len(self.ndjson('/logs/query?since=0&limit=-2')), 5)
+        self.assert_bad_request('/logs/query?lines=2.5', 'lines')
+        self.assert_bad_request('/logs/query?since=0&limit=ten', 'limit')
+        self.assert_bad_request('/logs/query?since=yesterday', 'time')
+
+    def test_metrics_samples(self):
+        def samples(query):
+            return len(self.get('/metrics' + query).json()['processes']['dbus-api-control']['samples'])
+        self.assertEqual(samples(''), 3)
+        self.assertEqual(samples('?samples=2'), 2)
+        self.assertEqual(samples('?samples=-2'), 1)
+        self.assertEqual(samples('?samples=0'), 1)
+        self.assert_bad_request('/metrics?samples=all', 'samples')
+
+
+class LogFollowStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir)
+        self.follower = control.LogFollower(os.path.join(self.log_dir, 'current'))
+        patcher = mock.patch.object(control, 'log_follower', self.follower)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), control.ControlAPIHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.port = server.server_address[1]
+
+    def test_unexpected_error_ends_the_stream(self):
+        client = socket.create_connection(('127.0.0.1', self.port), timeout=5)
+        self.addCleanup(client.close)
+        client.sendall(b'GET /logs/follow HTTP/1.1\r\nHost: x\r\n\r\n')
+        response = client.recv(4096)
+        self.assertIn(b'Transfer-Encoding: chunked', response)
+        with self.assertLogs('DBusAPIControl', 'ERROR') as logs:
+            self.follower._publish([{'level': 'INFO', 'message': 'ok', 'raw': 'ok'}])
+            self.follower._publish([None])
+            while chunk := client.recv(4096):
+                response += chunk
+        self.assertIn('Error while following logs', logs.output[0])
+        self.assertIn(b'"message": "ok"', response)
+        # No error document written into the already started chunked body
+        self.assertEqual(response.count(b'HTTP/1.1'), 1)
+        self.assertNotIn(b'"success": false', response)
+        self.assertEqual(self.follower._subscribers, set())
+
+
+class ControlServerSignalTest(unittest.TestCase):
+
+    def test_sigterm_stops_the_server(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        process = subprocess.Popen([sys.executable, control.__file__, '--host', '127.0.0.1', '--port', str(port)],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(process.kill)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                requests.get(f'http://127.0.0.1:{port}/health', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    self.fail('control server did not start')
+                time.sleep(0.05)
+        process.send_signal(signal.SIGTERM)
+        self.assertEqual(process.wait(timeout=5), 0)
+
+
+class TransportHandler(BaseHTTPRequestHandler):
+    """Answers with the name of the transport the request came in on"""
+
+    def do_GET(self):
+        body = self.server.transport.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MainApiRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.socket_path = os.path.join(self.directory, 'api.sock')
+        tcp = self.serve(ThreadingHTTPServer(('127.0.0.1', 0), TransportHandler), 'tcp')
+        for name, value in (('MAIN_API_SOCKET', self.socket_path), ('MAIN_API_HOST', '127.0.0.1'),
+                            ('MAIN_API_PORT', tcp.server_address[1])):
+            patcher = mock.patch.object(control, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def serve(self, server, transport):
+        server.transport = transport
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def transport(self):
+        status, _, body = control.main_api_request('GET', '/health')
+        self.assertEqual(status, 200)
+        return body.decode()
+
+    def test_unix_socket_when_serving(self):
+        self.serve(UnixHTTPServer(self.socket_path, TransportHandler), 'unix')
+        self.assertEqual(self.transport(), 'unix')
+
+    def test_tcp_without_socket_file(self):
+        self.assertEqual(self.transport(), 'tcp')
+
+    def test_tcp_when_socket_file_is_stale(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket_path)  # Never listened on - connecting is refused
+        self.assertTrue(os.path.exists(self.socket_path))
+        self.assertEqual(self.transport(), 'tcp')
+
+
+class IntParamTest(unittest.TestCase):
+
+    def test_default_when_missing_or_empty(self):
+        self.assertEqual(control.int_param({}, 'lines', 50), 50)
+        self.assertEqual(control.int_param({'lines': ['']}, 'lines', 50), 50)
+
+    def test_clamped(self):
+        self.assertEqual(control.int_param({'lines': ['-4']}, 'lines', 50), 1)
+        self.assertEqual(control.int_param({'lines': ['900']}, 'lines', 50, maximum=100), 100)
+        self.assertEqual(control.int_param({'limit': ['-4']}, 'limit', 0, minimum=0), 0)
+
+    def test_not_an_integer(self):
+        with self.assertRaisesRegex(control.InvalidParameterError, "lines must be an integer, got 'x'"):
+            control.int_param({'lines': ['x']}, 'lines', 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Accept negotiation and the binary response encoders"""
+
+import unittest
+from unittest import mock
+
+import dbus_api_server
+from dbus_api_server import JSON_MEDIA_TYPE, binary_encoder, negotiate_encoding
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class NegotiateEncodingTest(unittest.TestCase):
+
+    def setUp(self):
+        # Pretend both libraries are installed unless a test says otherwise
+        patcher = mock.patch.dict(dbus_api_server._binary_encoders,
+                                  {'msgpack': lambda data: b'msgpack', 'cbor2': lambda data: b'cbor'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def media_type(self, accept):
+        return negotiate_encoding(accept)[0]
+
+    def test_json_by_default(self):
+        for accept in (None, '', '*/*', 'application/json', 'text/html,application/xhtml+xml'):
+            self.assertEqual(negotiate_encoding(accept), (JSON_MEDIA_TYPE, None), accept)
+
+    def test_binary_types_and_aliases(self):
+        for media_type in ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack',
+                           'application/cbor'):
+            self.assertEqual(self.media_type(media_type), media_type)
+        self.assertEqual(self.media_type('Application/MsgPack'), 'application/msgpack')
+
+    def test_q_values_decide(self):
+        self.assertEqual(self.media_type('application/msgpack;q=0.5, application/cbor'), 'application/cbor')
+        self.assertEqual(self.media_type('application/json;q=0.9, application/msgpack'), 'application/msgpack')
+        self.assertEqual(self.media_type('application/msgpack;q=0.5, application/json'), JSON_MEDIA_TYPE)
+
+    def test_equal_q_keeps_header_order(self):
+        self.assertEqual(self.media_type('application/cbor, application/msgpack'), 'application/cbor')
+
+    def test_wildcard_before_binary_means_json(self):
+        self.assertEqual(self.media_type('*/*, application/msgpack;q=0.5'), JSON_MEDIA_TYPE)
+
+    def test_q_zero_and_bad_q_are_refused(self):
+        self.assertEqual(self.media_type('application/msgpack;q=0'), JSON_MEDIA_TYPE)
+        self.assertEqual(self.media_type('application/msgpack;q=high'), JSON_MEDIA_TYPE)
+
+    def test_missing_library_falls_back(self):
+        dbus_api_server._binary_encoders['msgpack'] = None
+        self.assertEqual(self.media_type('application/msgpack'), JSON_MEDIA_TYPE)
+        self.assertEqual(self.media_type('application/msgpack, application/cbor;q=0.5'), 'application/cbor')
+
+
+class BinaryEncoderTest(unittest.TestCase):
+
+    data = {'value': 12, 'power': 1.5, 'name': 'Battery', 'ok': True, 'missing': None, 'list': [1, 2.0]}
+
+    def setUp(self):
+        patcher = mock.patch.dict(dbus_api_server._binary_encoders, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @unittest.skipIf(msgpack is None, 'msgpack not installed')
+    def test_msgpack_round_trip_keeps_types(self):
+        decoded = msgpack.unpackb(binary_encoder('application/msgpack')(self.data), raw=False)
+        self.assertEqual(decoded, self.data)
+        self.assertIsInstance(decoded['value'], int)
+        self.assertIsInstance(decoded['list'][1], float)
+
+    @unittest.skipIf(cbor2 is None, 'cbor2 not installed')
+    def test_cbor_round_trip_keeps_types(self):
+        decoded = cbor2.loads(binary_encoder('application/cbor')(self.data))
+        self.assertEqual(decoded, self.data)
+        self.assertIsInstance(decoded['list'][1], float)
+
+    def test_missing_library_is_remembered(self):
+        with mock.patch.dict('sys.modules', {'msgpack': None}):
+            self.assertIsNone(binary_encoder('application/msgpack'))
+        self.assertIn('msgpack', dbus_api_server._binary_encoders)
+        self.assertIsNone(binary_encoder('application/x-msgpack'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""EnergyIntegrator state file restore"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from dbus_api_server import EnergyIntegrator
+
+
+class EnergyStateLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.state_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.addCleanup(os.remove, self.state_file)
+
+    def write_state(self, state):
+        with open(self.state_file, 'w') as f:
+            f.write(state if isinstance(state, str) else json.dumps(state))
+
+    def test_restores_counters_and_buckets(self):
+        self.write_state({'meters': {'battery': {
+            'service': 'com.victronenergy.system', 'path': '/Dc/Battery/Power', 'since': 1700000000,
+            'positive_wh': 12.5, 'negative_wh': 3.0, 'buckets': {'1h': [[1700000000, 1.0, 0.5, 3600]]}}}})
+        meters = EnergyIntegrator(None, self.state_file).meters
+        self.assertEqual(meters['battery']['positive_wh'], 12.5)
+        self.assertEqual(list(meters['battery']['buckets']['1h']), [(1700000000, 1.0, 0.5, 3600)])
+
+    def test_broken_meters_are_skipped(self):
+        self.write_state({'meters': {
+            'no_path': {'service': 'com.victronenergy.system'},
+            'not_a_dict': [1, 2],
+            'bad_number': {'service': 's', 'path': '/p', 'positive_wh': 'lots'},
+            'bad_buckets': {'service': 's', 'path': '/p', 'buckets': {'1h': [5]}},
+            'good': {'service': 's', 'path': '/p', 'positive_wh': 1}}})
+        self.assertEqual(list(EnergyIntegrator(None, self.state_file).meters), ['good'])
+
+    def test_unusable_files_start_empty(self):
+        for state in ('{"meters": {"a": {"serv', '[]', '{"meters": []}'):
+            self.write_state(state)
+            self.assertEqual(EnergyIntegrator(None, self.state_file).meters, {}, state)
+
+
+if __name__ == '__main__':
+    unittest.main()
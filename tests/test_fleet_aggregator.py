@@ -0,0 +1,166 @@
+"""FleetAggregator and FleetProxyHandler against stand-in GX nodes"""
+
+import json
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from fleet_aggregator import FleetAggregator, FleetNode, FleetProxyHandler
+
+
+class StandInNodeHandler(BaseHTTPRequestHandler):
+    """Answers like a GX node, or fails in the way the path asks for"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/health':
+            self._send(200, json.dumps({'status': 'healthy', 'success': True}).encode())
+        elif path == '/list':
+            self._send(200, b'[1, 2, 3]')
+        elif path == '/bad-gateway':
+            self._send(502, b'<html><body>Bad Gateway</body></html>', 'text/html')
+        elif path == '/not-found':
+            self._send(404, json.dumps({'error': 'Not found', 'success': False}).encode())
+        elif path == '/garbage':
+            self._send(200, b'{not json')
+        elif path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/redirect')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif path == '/broken-chunks':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self.wfile.write(b'zz\r\n{}\r\n')
+            self.close_connection = True
+        elif path == '/slow':
+            time.sleep(1.5)
+            self._send(200, b'{}')
+
+    def _send(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class FleetAggregatorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node_server = start_server(StandInNodeHandler)
+        cls.node_url = f'http://127.0.0.1:{cls.node_server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.node_server.shutdown()
+        cls.node_server.server_close()
+
+    def setUp(self):
+        self.aggregator = FleetAggregator([
+            FleetNode('up', self.node_url, timeout=0.5),
+            FleetNode('down', f'http://127.0.0.1:{free_port()}', timeout=0.5),
+        ])
+        self.addCleanup(self.aggregator.close)
+
+    def test_failing_node_does_not_fail_the_query(self):
+        result = self.aggregator.query('/health')
+        self.assertEqual(result['results']['up']['status'], 'healthy')
+        self.assertEqual(result['errors']['down']['type'], 'connection')
+        self.assertEqual((result['ok'], result['failed']), (1, 1))
+
+    def test_http_error_with_html_body_is_http(self):
+        error = self.aggregator.query('/bad-gateway', names=['up'])['errors']['up']
+        self.assertEqual(error['type'], 'http')
+        self.assertEqual(error['status'], 502)
+
+    def test_http_error_keeps_server_message(self):
+        error = self.aggregator.query('/not-found', names=['up'])['errors']['up']
+        self.assertEqual((error['type'], error['status'], error['error']), ('http', 404, 'Not found'))
+
+    def test_non_object_and_invalid_json_are_protocol_errors(self):
+        for path in ('/list', '/garbage'):
+            error = self.aggregator.query(path, names=['up'])['errors']['up']
+            self.assertEqual(error['type'], 'protocol', path)
+
+    def test_other_request_exceptions_are_reported(self):
+        for path in ('/redirect', '/broken-chunks'):
+            result = self.aggregator.query(path, names=['up'])
+            self.assertEqual(result['failed'], 1, path)
+            self.assertEqual(result['errors']['up']['type'], 'request', path)
+
+    def test_timeout(self):
+        error = self.aggregator.query('/slow', names=['up'])['errors']['up']
+        self.assertEqual(error['type'], 'timeout')
+
+
+class FleetProxyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.node_server = start_server(StandInNodeHandler)
+        node_url = f'http://127.0.0.1:{cls.node_server.server_address[1]}'
+        FleetProxyHandler.aggregator = FleetAggregator([
+            FleetNode('up', node_url, timeout=0.5),
+            FleetNode('down', f'http://127.0.0.1:{free_port()}', timeout=0.5),
+        ])
+        cls.proxy = start_server(FleetProxyHandler)
+        cls.proxy_url = f'http://127.0.0.1:{cls.proxy.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.shutdown()
+        cls.proxy.server_close()
+        cls.node_server.shutdown()
+        cls.node_server.server_close()
+        FleetProxyHandler.aggregator.close()
+
+    def test_partial_failure_is_200(self):
+        response = requests.get(f'{self.proxy_url}/health', timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['failed'], 1)
+
+    def test_all_nodes_failing_is_502(self):
+        response = requests.get(f'{self.proxy_url}/health?nodes=down', timeout=5)
+        self.assertEqual(response.status_code, 502)
+        self.assertIn('down', response.json()['errors'])
+
+    def test_query_exception_is_json_500(self):
+        aggregator = FleetProxyHandler.aggregator
+        original = aggregator.query
+        aggregator.query = lambda *args: 1 / 0
+        try:
+            response = requests.get(f'{self.proxy_url}/health', timeout=5)
+        finally:
+            aggregator.query = original
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(response.json()['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
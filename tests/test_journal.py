@@ -0,0 +1,69 @@
+"""WriteJournal group commit and paged queries"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import dbus_api_server
+from dbus_api_server import WriteJournal
+
+
+class WriteJournalQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.journal = WriteJournal(os.path.join(directory, 'writes.jsonl'))
+        self.journal.start()
+        for value in range(5):
+            self.journal.record(service='com.victronenergy.settings', path=f'/Settings/P{value}', value=value)
+
+    def test_pages_newest_first(self):
+        entries, next_before = self.journal.query(limit=2)
+        self.assertEqual([e['value'] for e in entries], [4, 3])
+        entries, next_before = self.journal.query(before=next_before, limit=2)
+        self.assertEqual([e['value'] for e in entries], [2, 1])
+        entries, next_before = self.journal.query(before=next_before, limit=2)
+        self.assertEqual(([e['value'] for e in entries], next_before), ([0], None))
+
+    def test_zero_limit_returns_empty_page(self):
+        self.assertEqual(self.journal.query(limit=0), ([], None))
+
+    def test_filters(self):
+        entries, _ = self.journal.query(path='/Settings/P[13]')
+        self.assertEqual([e['value'] for e in entries], [3, 1])
+
+    def test_ids_continue_after_restart(self):
+        self.journal.flush()
+        reopened = WriteJournal(self.journal.path)
+        self.assertEqual(reopened.last_id, 5)
+
+
+class WriteJournalQueueFullTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with mock.patch.object(dbus_api_server, 'JOURNAL_QUEUE_SIZE', 2):
+            self.journal = WriteJournal(os.path.join(directory, 'writes.jsonl'))
+
+    def test_dropped_entry_takes_no_id(self):
+        with self.assertLogs('DBusAPIServer', 'WARNING'):
+            ids = [self.journal.record(path=f'/Settings/P{value}', value=value) for value in range(3)]
+        self.assertEqual(ids, [1, 2, None])
+        self.assertEqual((self.journal.last_id, self.journal.dropped), (2, 1))
+        self.journal.start()
+        started = time.monotonic()
+        self.assertTrue(self.journal.flush())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.journal.record(path='/Settings/P3', value=3), 3)
+        self.assertTrue(self.journal.flush())
+        entries, _ = self.journal.query()
+        self.assertEqual([e['id'] for e in entries], [3, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
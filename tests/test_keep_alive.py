@@ -0,0 +1,68 @@
+"""Keep-alive connection handling of DBusAPIHandler"""
+
+import socket
+import threading
+import time
+import unittest
+
+from dbus_api_server import APIServer, DBusAPIHandler
+
+
+class PathHandler(DBusAPIHandler):
+    """Answers every GET with its path"""
+
+    timeout = 0.5
+
+    def do_GET(self):
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KeepAliveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = APIServer(('127.0.0.1', 0), PathHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = socket.create_connection(self.server.server_address, timeout=5)
+        self.addCleanup(self.client.close)
+
+    def read_until_closed(self):
+        response = b''
+        while chunk := self.client.recv(4096):
+            response += chunk
+        return response
+
+    def test_pipelined_requests_are_answered_at_once(self):
+        self.client.sendall(b'GET /first HTTP/1.1\r\nHost: x\r\n\r\n'
+                            b'GET /second HTTP/1.1\r\nHost: x\r\n\r\n')
+        response = b''
+        started = time.monotonic()
+        while b'/second' not in response:
+            chunk = self.client.recv(4096)
+            self.assertTrue(chunk, 'connection closed before the second response')
+            response += chunk
+        # Well before the idle timeout the second request would otherwise wait for
+        self.assertLess(time.monotonic() - started, PathHandler.timeout / 2)
+        self.assertEqual(response.count(b'HTTP/1.1 200'), 2)
+        self.assertLess(response.index(b'/first'), response.index(b'/second'))
+
+    def test_idle_connection_is_closed_without_counting_as_active(self):
+        self.client.sendall(b'GET /only HTTP/1.1\r\nHost: x\r\n\r\n')
+        time.sleep(0.1)
+        self.assertEqual(self.server._active, 0)
+        started = time.monotonic()
+        self.assertIn(b'/only', self.read_until_closed())
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(self.server.drain(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+"""RateLimiter token buckets, fair scheduling and priority lanes"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from dbus_api_server import RATE_LIMIT_DEFAULTS, RateLimiter, load_path_priorities
+
+CLIENT = '192.168.88.10'
+OTHER = '192.168.88.11'
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('dbus_api_server.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = RateLimiter(path_priorities={})
+
+    def drain(self, client, method, path):
+        """Take tokens until refused
+
+        Returns: (requests allowed, retry_after of the refusal)
+        """
+        for allowed_count in range(1000):
+            allowed, retry_after = self.limiter.check(client, method, path)
+            if not allowed:
+                return allowed_count, retry_after
+        self.fail('never limited')
+
+    def test_burst_then_refused_with_retry_after(self):
+        expensive = RATE_LIMIT_DEFAULTS['classes']['expensive']
+        self.assertEqual(self.drain(CLIENT, 'GET', '/settings'), (expensive['burst'], 1 / expensive['rate']))
+        cheap = RATE_LIMIT_DEFAULTS['classes']['cheap']
+        self.assertEqual(self.drain(CLIENT, 'GET', '/value'), (cheap['burst'], 1))
+        self.assertEqual(self.limiter.stats()['limited'], 2)
+
+    def test_tokens_refill_at_the_class_rate(self):
+        self.drain(CLIENT, 'GET', '/settings')
+        self.clock.now += 1.9
+        self.assertFalse(self.limiter.check(CLIENT, 'GET', '/settings')[0])
+        self.clock.now += 0.1
+        self.assertTrue(self.limiter.check(CLIENT, 'GET', '/settings')[0])
+        self.assertFalse(self.limiter.check(CLIENT, 'GET', '/settings')[0])
+
+    def test_buckets_are_per_client_and_route(self):
+        self.drain(CLIENT, 'GET', '/settings')
+        self.assertTrue(self.limiter.check(OTHER, 'GET', '/settings')[0])
+        self.assertTrue(self.limiter.check(CLIENT, 'GET', '/devices')[0])
+        self.assertEqual(self.limiter.stats()['buckets'], 3)
+
+    def test_exempt_and_disabled_skip_buckets(self):
+        for _ in range(100):
+            self.assertEqual(self.limiter.check('127.0.0.1', 'GET', '/settings'), (True, 0))
+        self.limiter.configure({'enabled': False})
+        for _ in range(100):
+            self.assertEqual(self.limiter.check(CLIENT, 'GET', '/settings'), (True, 0))
+
+    def test_configured_limits(self):
+        self.limiter.configure({'classes': {'expensive': {'rate': 1, 'burst': 2}},
+                                'routes': {'GET /values': 'expensive'}, 'exempt': []})
+        self.assertEqual(self.drain(CLIENT, 'GET', '/values'), (2, 1))
+        self.assertEqual(self.drain('127.0.0.1', 'GET', '/settings')[0], 2)
+        # Unconfigured classes keep their defaults
+        self.assertEqual(self.limiter.config['classes']['cheap'], RATE_LIMIT_DEFAULTS['classes']['cheap'])
+
+
+class SchedulingTestCase(unittest.TestCase):
+
+    config = {}
+
+    def setUp(self):
+        self.limiter = RateLimiter(path_priorities={})
+        self.limiter.configure(dict({'queue_timeout': 5}, **self.config))
+        self.granted = []
+        self.threads = []
+
+    def tearDown(self):
+        for thread in self.threads:
+            thread.join(5)
+
+    def wait_until(self, predicate):
+        for _ in range(500):
+            if predicate():
+                return
+            time.sleep(0.01)
+        self.fail('condition never met')
+
+    def queue(self, client, name, lane='medium'):
+        """Start a thread waiting for a slot, returning once it is queued"""
+        queued = self.limiter.stats()['lanes'][lane]['queued']
+
+        def wait():
+            self.limiter.acquire(client, lane)
+            self.granted.append(name)
+
+        thread = threading.Thread(target=wait, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        self.wait_until(lambda: self.limiter.stats()['lanes'][lane]['queued'] > queued)
+
+    def release_one(self):
+        count = len(self.granted)
+        self.limiter.release()
+        self.wait_until(lambda: len(self.granted) > count)
+
+
+class FairSchedulingTest(SchedulingTestCase):
+
+    config = {'max_concurrent': 1, 'reserved': {}}
+
+    def test_free_slot_is_taken_at_once(self):
+        self.assertTrue(self.limiter.acquire(CLIENT))
+        self.assertEqual(self.limiter.stats()['busy'], 1)
+        self.limiter.release()
+        self.assertEqual(self.limiter.stats()['busy'], 0)
+
+    def test_waiting_clients_are_served_in_turn(self):
+        self.limiter.acquire(CLIENT)
+        self.queue(CLIENT, 'a1')
+        self.queue(CLIENT, 'a2')
+        self.queue(CLIENT, 'a3')
+        self.queue(OTHER, 'b1')
+        for _ in range(4):
+            self.release_one()
+        self.assertEqual(self.granted, ['a1', 'b1', 'a2', 'a3'])
+
+    def test_queue_timeout(self):
+        self.limiter.configure({'max_concurrent': 1, 'reserved': {}, 'queue_timeout': 0.05})
+        self.limiter.acquire(CLIENT)
+        with self.assertRaises(TimeoutError):
+            self.limiter.acquire(OTHER)
+        self.assertEqual(self.limiter.stats()['lanes']['medium']['waiting'], 0)
+        self.limiter.release()
+        self.assertEqual(self.limiter.stats()['busy'], 0)
+
+    def test_disabled_holds_no_slot(self):
+        self.limiter.configure({'enabled': False})
+        self.assertFalse(self.limiter.acquire(CLIENT))
+        self.assertEqual(self.limiter.stats()['busy'], 0)
+
+
+class PriorityLaneTest(SchedulingTestCase):
+
+    config = {'max_concurrent': 4, 'reserved': {'critical': 1, 'high': 1}}
+
+    def test_capacity_leaves_reserved_slots(self):
+        lanes = self.limiter.stats()['lanes']
+        self.assertEqual({lane: lanes[lane]['capacity'] for lane in lanes},
+                         {'critical': 4, 'high': 3, 'medium': 2})
+        self.limiter.configure({'max_concurrent': 2, 'reserved': {'critical': 5}})
+        self.assertEqual(self.limiter.stats()['lanes']['medium']['capacity'], 1)
+
+    def test_bulk_reads_cannot_take_reserved_slots(self):
+        for _ in range(2):
+            self.assertTrue(self.limiter.acquire(CLIENT, 'medium'))
+        self.queue(CLIENT, 'medium')
+        # A high and then a critical read still find a slot at once
+        self.assertTrue(self.limiter.acquire(OTHER, 'high'))
+        self.assertTrue(self.limiter.acquire(OTHER, 'critical'))
+        self.assertEqual(self.limiter.stats()['busy'], 4)
+        self.assertEqual(self.granted, [])
+        for _ in range(2):
+            self.limiter.release()
+        self.release_one()
+        self.assertEqual(self.granted, ['medium'])
+
+    def test_freed_slots_go_to_the_highest_waiting_lane(self):
+        for _ in range(4):
+            self.limiter.acquire(CLIENT, 'critical')
+        self.queue(CLIENT, 'medium', 'medium')
+        self.queue(CLIENT, 'high', 'high')
+        self.queue(OTHER, 'critical', 'critical')
+        self.release_one()
+        self.assertEqual(self.granted, ['critical'])
+        # Each lane only gets a slot once busy drops below its capacity
+        self.limiter.release()
+        self.release_one()
+        self.assertEqual(self.granted, ['critical', 'high'])
+        self.limiter.release()
+        self.assertEqual(self.limiter.stats()['lanes']['medium']['waiting'], 1)
+        self.release_one()
+        self.assertEqual(self.granted, ['critical', 'high', 'medium'])
+        self.assertEqual(self.limiter.stats()['busy'], 2)
+
+
+class LaneForTest(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(path_priorities={
+            ('com.victronenergy.system', '/Alarms/GridLost'): 'critical',
+            ('com.victronenergy.battery', '/Soc'): 'high',
+        })
+
+    def test_route_default_and_health(self):
+        self.assertEqual(self.limiter.lane_for('GET', '/settings'), 'medium')
+        self.assertEqual(self.limiter.lane_for('GET', '/health'), 'critical')
+
+    def test_target_path_priority_by_service_or_type(self):
+        self.assertEqual(self.limiter.lane_for(
+            'GET', '/value', [('com.victronenergy.system', '/Alarms/GridLost')]), 'critical')
+        self.assertEqual(self.limiter.lane_for(
+            'GET', '/value', [('com.victronenergy.battery.ttyUSB0', '/Soc')]), 'high')
+        self.assertEqual(self.limiter.lane_for(
+            'GET', '/value', [('com.victronenergy.battery.ttyUSB0', '/Dc/0/Voltage')]), 'medium')
+
+    def test_batch_gets_its_lowest_lane(self):
+        self.assertEqual(self.limiter.lane_for('POST', '/values', [
+            ('com.victronenergy.system', '/Alarms/GridLost'),
+            ('com.victronenergy.battery.ttyUSB0', '/Soc')]), 'high')
+
+    def test_header_takes_precedence(self):
+        targets = [('com.victronenergy.system', '/Alarms/GridLost')]
+        self.assertEqual(self.limiter.lane_for('GET', '/value', targets, ' Medium '), 'medium')
+        self.assertEqual(self.limiter.lane_for('GET', '/settings', (), 'high'), 'high')
+        self.assertEqual(self.limiter.lane_for('GET', '/settings', (), 'urgent'), 'medium')
+
+    def test_configured_priority_paths(self):
+        self.limiter.configure({'priority_paths': [
+            {'service': 'com.victronenergy.vebus', 'path': '/Mode', 'priority': 'critical'},
+            {'service': 'com.victronenergy.vebus', 'path': '/State', 'priority': 'urgent'},
+        ]})
+        self.assertEqual(self.limiter.lane_for('GET', '/value', [('com.victronenergy.vebus.ttyS4', '/Mode')]),
+                         'critical')
+        self.assertEqual(self.limiter.lane_for('GET', '/value', [('com.victronenergy.vebus.ttyS4', '/State')]),
+                         'medium')
+        self.assertEqual(self.limiter.stats()['priority_paths'], 3)
+
+
+class LoadPathPrioritiesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'paths.json')
+
+    def test_levels_from_the_reference(self):
+        with open(self.path, 'w') as f:
+            json.dump({
+                'critical_paths': {'grid': [
+                    {'service': 'com.victronenergy.system', 'path': '/Alarms/GridLost', 'critical': True},
+                    {'service': 'com.victronenergy.battery.ttyUSB0', 'path': '/Soc'},
+                ]},
+                'anomaly_rules': [
+                    {'service': 'com.victronenergy.vebus.ttyS4', 'path': '/Alarms/LowBattery', 'severity': 'CRITICAL'},
+                    {'service': 'com.victronenergy.solarcharger', 'path': '/Yield', 'severity': 'info'},
+                ],
+                'batches': {'bulk': {'service': 'com.victronenergy.settings', 'path': '/Settings',
+                                     'priority': 'medium'}},
+            }, f)
+        priorities = load_path_priorities(self.path)
+        self.assertEqual(priorities[('com.victronenergy.system', '/Alarms/GridLost')], 'critical')
+        self.assertEqual(priorities[('com.victronenergy.battery.ttyUSB0', '/Soc')], 'high')
+        self.assertEqual(priorities[('com.victronenergy.battery', '/Soc')], 'high')
+        self.assertEqual(priorities[('com.victronenergy.vebus', '/Alarms/LowBattery')], 'critical')
+        self.assertEqual(priorities[('com.victronenergy.settings', '/Settings')], 'medium')
+        self.assertNotIn(('com.victronenergy.solarcharger', '/Yield'), priorities)
+
+    def test_missing_reference(self):
+        with self.assertLogs('DBusAPIServer', 'WARNING'):
+            self.assertEqual(load_path_priorities(self.path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""ReadCache TTL rules, LRU eviction and configuration"""
+
+import time
+import unittest
+
+from dbus_api_server import CACHE_ENTRY_OVERHEAD, CACHE_TTL_RULES, ReadCache
+
+SERVICE = 'com.victronenergy.system'
+
+
+def key(path, service=SERVICE):
+    return ('GetValue', service, path)
+
+
+class Loader:
+    """Counts calls and returns the next value"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        value = self.values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class ReadCacheTest(unittest.TestCase):
+
+    def test_built_in_ttl_rules(self):
+        cache = ReadCache()
+        self.assertEqual(cache.ttl_for('/SwitchableOutput/output_1/State'), 0)
+        self.assertIsNone(cache.ttl_for('/Serial'))
+        self.assertEqual(cache.ttl_for('/FirmwareVersion'), 60)
+        self.assertEqual(cache.ttl_for('/Dc/Battery/Power'), 1)
+
+    def test_first_matching_rule_wins(self):
+        cache = ReadCache([('/Dc/*', 5), ('/Dc/Battery/*', 0)])
+        self.assertEqual(cache.ttl_for('/Dc/Battery/Soc'), 5)
+        self.assertEqual(cache.ttl_for('/Ac/Power'), 0)
+
+    def test_hit_until_expired(self):
+        cache = ReadCache([('*', 0.05)])
+        loader = Loader(1, 2)
+        self.assertEqual(cache.get_or_load(key('/Soc'), '/Soc', loader), 1)
+        self.assertEqual(cache.get_or_load(key('/Soc'), '/Soc', loader), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.get_or_load(key('/Soc'), '/Soc', loader), 2)
+        self.assertEqual(loader.calls, 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_none_ttl_never_expires_and_zero_is_not_cached(self):
+        cache = ReadCache([('/Serial', None), ('*', 0)])
+        serial = Loader('HQ1', 'other')
+        live = Loader(1, 2)
+        for _ in range(2):
+            self.assertEqual(cache.get_or_load(key('/Serial'), '/Serial', serial), 'HQ1')
+        self.assertEqual([cache.get_or_load(key('/State'), '/State', live) for _ in range(2)], [1, 2])
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_errors_and_none_are_not_cached(self):
+        cache = ReadCache([('*', 60)])
+        loader = Loader(RuntimeError('no reply'), None, 3)
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load(key('/Soc'), '/Soc', loader)
+        self.assertIsNone(cache.get_or_load(key('/Soc'), '/Soc', loader))
+        self.assertEqual(cache.get_or_load(key('/Soc'), '/Soc', loader), 3)
+        self.assertEqual(cache.get_or_load(key('/Soc'), '/Soc', loader), 3)
+        self.assertEqual(loader.calls, 3)
+
+    def test_least_recently_used_evicted_over_memory_cap(self):
+        entry_size = len(repr(1)) + CACHE_ENTRY_OVERHEAD
+        cache = ReadCache([('*', None)], max_bytes=entry_size * 2)
+        cache.get_or_load(key('/A'), '/A', Loader(1))
+        cache.get_or_load(key('/B'), '/B', Loader(2))
+        cache.get_or_load(key('/A'), '/A', Loader())  # A is now the most recent
+        cache.get_or_load(key('/C'), '/C', Loader(3))
+        self.assertEqual(cache.hot_keys(10), [key('/C'), key('/A')])
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bytes'], stats['evictions']), (2, entry_size * 2, 1))
+
+    def test_value_larger_than_cap_is_not_stored(self):
+        cache = ReadCache([('*', None)], max_bytes=CACHE_ENTRY_OVERHEAD + 10)
+        cache.get_or_load(key('/Small'), '/Small', Loader(1))
+        self.assertEqual(cache.get_or_load(key('/Big'), '/Big', Loader('x' * 100)), 'x' * 100)
+        self.assertEqual(cache.hot_keys(10), [key('/Small')])
+
+    def test_invalidate_path_and_ancestors(self):
+        cache = ReadCache([('*', None)])
+        for path in ('/', '/Dc', '/Dc/Battery/Soc', '/Dc/Battery/Power', '/Dcx'):
+            cache.get_or_load(key(path), path, Loader(1))
+        cache.get_or_load(key('/Dc', 'other'), '/Dc', Loader(1))
+        cache.invalidate(SERVICE, '/Dc/Battery/Soc')
+        self.assertEqual(sorted(cache.hot_keys(10)),
+                         sorted([key('/Dc/Battery/Power'), key('/Dcx'), key('/Dc', 'other')]))
+
+    def test_purge_service(self):
+        cache = ReadCache([('*', None)])
+        cache.get_or_load(key('/A'), '/A', Loader(1))
+        cache.get_or_load(key('/B'), '/B', Loader(1))
+        cache.get_or_load(key('/A', 'other'), '/A', Loader(1))
+        self.assertEqual(cache.purge_service(SERVICE), 2)
+        self.assertEqual(cache.hot_keys(10), [key('/A', 'other')])
+        self.assertEqual(cache.stats()['bytes'], len(repr(1)) + CACHE_ENTRY_OVERHEAD)
+
+
+class ReadCacheConfigureTest(unittest.TestCase):
+
+    def test_configured_rules_come_first_and_clear_entries(self):
+        cache = ReadCache()
+        cache.get_or_load(key('/Serial'), '/Serial', Loader('HQ1'))
+        cache.configure({'ttls': {'/Serial': 0, '/Custom/*': 30}, 'max_bytes': 4096})
+        self.assertEqual(cache.ttl_for('/Serial'), 0)
+        self.assertEqual(cache.ttl_for('/Custom/Value'), 30)
+        self.assertEqual(cache.max_bytes, 4096)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_missing_section_restores_built_in_rules(self):
+        cache = ReadCache()
+        cache.configure({'ttls': {'*': 0}})
+        cache.configure(None)
+        self.assertEqual(cache.ttl_rules, CACHE_TTL_RULES)
+
+    def test_invalid_ttls_are_skipped(self):
+        cache = ReadCache()
+        with self.assertLogs('DBusAPIServer', 'WARNING') as logs:
+            cache.configure({'ttls': {'/A': 'soon', '/B': -1, '/C': True, '/D': [1], '/E': 2.5, '/F': None}})
+        self.assertEqual(len(logs.records), 4)
+        self.assertEqual(cache.ttl_rules[:2], [('/E', 2.5), ('/F', None)])
+        # Reads of the skipped paths still work, under the built-in rules
+        self.assertEqual(cache.get_or_load(key('/A'), '/A', Loader(1)), 1)
+
+    def test_invalid_max_bytes_is_ignored(self):
+        cache = ReadCache(max_bytes=1000)
+        for max_bytes in ('big', -5, 0, True):
+            with self.assertLogs('DBusAPIServer', 'WARNING'):
+                cache.configure({'max_bytes': max_bytes})
+            self.assertEqual(cache.max_bytes, 1000)
+
+    def test_ttls_must_be_an_object(self):
+        cache = ReadCache()
+        with self.assertLogs('DBusAPIServer', 'WARNING'):
+            cache.configure({'ttls': [['/A', 5]]})
+        self.assertEqual(cache.ttl_rules, CACHE_TTL_RULES)
+
+
+if __name__ == '__main__':
+    unittest.main()
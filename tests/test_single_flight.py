@@ -0,0 +1,119 @@
+"""SingleFlight sharing of concurrent identical calls"""
+
+import threading
+import time
+import unittest
+
+from dbus_api_server import SingleFlight
+
+KEY = ('GetValue', 'com.victronenergy.system', '/Dc/Battery/Soc')
+
+
+class SlowCall:
+    """Blocks until released; counts how often it ran"""
+
+    def __init__(self, result=None, error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(flight, key, fn, count, outcomes):
+    """Start count callers of flight.do(key, fn), appending ('value'|'error', x) to outcomes
+
+    Returns: The threads
+    """
+
+    def call():
+        try:
+            outcomes.append(('value', flight.do(key, fn)))
+        except Exception as e:
+            outcomes.append(('error', e))
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def wait_for_followers(self, flight, count):
+        for _ in range(500):
+            if flight.stats()['shared'] >= count:
+                return
+            time.sleep(0.01)
+        self.fail(f'{count} followers never joined')
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        slow = SlowCall(result=42)
+        outcomes = []
+        leader = run_concurrently(flight, KEY, slow, 1, outcomes)
+        slow.started.wait(5)
+        followers = run_concurrently(flight, KEY, slow, 4, outcomes)
+        self.wait_for_followers(flight, 4)
+        self.assertEqual(flight.stats()['in_flight'], 1)
+        slow.release.set()
+        for thread in leader + followers:
+            thread.join(5)
+        self.assertEqual(slow.calls, 1)
+        self.assertEqual(outcomes, [('value', 42)] * 5)
+        stats = flight.stats()
+        self.assertEqual((stats['in_flight'], stats['calls'], stats['shared']), (0, 1, 4))
+
+    def test_error_is_shared_and_not_remembered(self):
+        flight = SingleFlight()
+        slow = SlowCall(error=TimeoutError('no reply'))
+        outcomes = []
+        leader = run_concurrently(flight, KEY, slow, 1, outcomes)
+        slow.started.wait(5)
+        followers = run_concurrently(flight, KEY, slow, 2, outcomes)
+        self.wait_for_followers(flight, 2)
+        slow.release.set()
+        for thread in leader + followers:
+            thread.join(5)
+        self.assertEqual([kind for kind, _ in outcomes], ['error'] * 3)
+        self.assertTrue(all(isinstance(error, TimeoutError) for _, error in outcomes))
+        self.assertEqual(flight.stats()['keys'][0]['errors'], 1)
+        # The next call runs again instead of reusing the failure
+        self.assertEqual(flight.do(KEY, lambda: 7), 7)
+
+    def test_sequential_calls_are_not_shared(self):
+        flight = SingleFlight()
+        calls = []
+        for value in (1, 2):
+            self.assertEqual(flight.do(KEY, lambda: calls.append(value) or value), value)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(flight.stats()['keys'][0]['calls'], 2)
+
+    def test_different_keys_run_independently(self):
+        flight = SingleFlight()
+        slow = SlowCall(result=1)
+        threads = run_concurrently(flight, KEY, slow, 1, [])
+        slow.started.wait(5)
+        self.assertEqual(flight.do(('GetValue', 'other', '/x'), lambda: 2), 2)
+        slow.release.set()
+        threads[0].join(5)
+
+    def test_metrics_keep_most_recent_keys(self):
+        flight = SingleFlight(max_keys=2)
+        for path in ('/A', '/B', '/A', '/C'):
+            flight.do(('GetValue', 'svc', path), lambda: None)
+        stats = flight.stats()
+        self.assertEqual(sorted(row['path'] for row in stats['keys']), ['/A', '/C'])
+        self.assertEqual(len(flight.stats(top=1)['keys']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
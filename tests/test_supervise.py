@@ -0,0 +1,193 @@
+"""dbus_api_control supervise/status parsing and svc commands against a fake supervise directory"""
+
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import dbus_api_control as control
+
+
+class FakeSupervise:
+    """A service directory with supervise/status and the ok/control fifos
+
+    The read ends of both fifos are held open like a running supervise.
+    """
+
+    def __init__(self):
+        self.service_path = tempfile.mkdtemp(prefix='fake-service-')
+        self.supervise_dir = os.path.join(self.service_path, 'supervise')
+        os.mkdir(self.supervise_dir)
+        os.mkfifo(os.path.join(self.supervise_dir, 'ok'))
+        os.mkfifo(os.path.join(self.supervise_dir, 'control'))
+        self.ok_fd = os.open(os.path.join(self.supervise_dir, 'ok'), os.O_RDONLY | os.O_NONBLOCK)
+        self.control_fd = os.open(os.path.join(self.supervise_dir, 'control'), os.O_RDONLY | os.O_NONBLOCK)
+
+    def write_status(self, changed_at, pid, want='u', paused=False, nanoseconds=0):
+        record = struct.pack('>QL', int(changed_at) + control.TAI64_UNIX_OFFSET, nanoseconds)
+        record += struct.pack('<L', pid) + bytes([int(paused), ord(want)])
+        assert len(record) == 18
+        with open(os.path.join(self.supervise_dir, 'status'), 'wb') as f:
+            f.write(record)
+
+    def read_control(self):
+        try:
+            return os.read(self.control_fd, 64)
+        except BlockingIOError:
+            return b''
+
+    def close(self):
+        os.close(self.ok_fd)
+        os.close(self.control_fd)
+        shutil.rmtree(self.service_path)
+
+
+class SuperviseStatusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.supervise = FakeSupervise()
+        self.addCleanup(self.supervise.close)
+
+    def test_running_service(self):
+        changed_at = int(time.time()) - 120
+        self.supervise.write_status(changed_at, 4321, nanoseconds=500000000)
+
+        status = control.read_supervise_status(self.supervise.service_path)
+
+        self.assertTrue(status['running'])
+        self.assertEqual(status['pid'], 4321)
+        self.assertEqual(status['want'], 'up')
+        self.assertFalse(status['paused'])
+        self.assertTrue(status['normally_up'])
+        self.assertAlmostEqual(status['uptime_seconds'], time.time() - changed_at - 0.5, delta=1)
+        self.assertEqual(status['changed_at'],
+                         time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(changed_at)) + '.500000')
+        self.assertRegex(control.format_svstat('/service/x', status), r'^/service/x: up \(pid 4321\) 1(19|20) seconds$')
+
+    def test_down_service_wanting_up(self):
+        open(os.path.join(self.supervise.service_path, 'down'), 'w').close()
+        self.supervise.write_status(int(time.time()) - 5, 0, want='u', paused=True)
+
+        status = control.read_supervise_status(self.supervise.service_path)
+
+        self.assertFalse(status['running'])
+        self.assertIsNone(status['pid'])
+        self.assertFalse(status['normally_up'])
+        self.assertTrue(status['paused'])
+        text = control.format_svstat('/service/x', status)
+        self.assertRegex(text, r'^/service/x: down [45] seconds, want up, paused$')
+
+    def test_tai64_label_matches_status_timestamp(self):
+        label = '@%016x%08x' % (1700000000 + control.TAI64_UNIX_OFFSET, 250000000)
+        self.assertEqual(control.tai64n_to_unix(label), 1700000000.25)
+        self.assertIsNone(control.tai64n_to_unix('@zz'))
+
+    def test_short_record_is_rejected(self):
+        with open(os.path.join(self.supervise.supervise_dir, 'status'), 'wb') as f:
+            f.write(b'\0' * 12)
+        with self.assertRaises(OSError):
+            control.read_supervise_status(self.supervise.service_path)
+
+    def test_supervise_not_running(self):
+        self.supervise.write_status(time.time(), 1)
+        os.close(self.supervise.ok_fd)
+        self.supervise.ok_fd = os.open(os.devnull, os.O_RDONLY)  # keep close() balanced
+        with self.assertRaises(OSError):
+            control.read_supervise_status(self.supervise.service_path)
+        self.assertIn('error', control.get_service_status(self.supervise.service_path))
+
+
+class SuperviseCommandTest(unittest.TestCase):
+
+    def setUp(self):
+        self.supervise = FakeSupervise()
+        self.addCleanup(self.supervise.close)
+
+    def test_command_bytes(self):
+        # start, stop, restart (term + up, kill as fallback) and graceful reload
+        for commands, expected in (('u', b'u'), ('d', b'd'), ('tu', b'tu'), ('k', b'k'), ('h', b'h')):
+            control.send_supervise_command(commands, self.supervise.service_path)
+            self.assertEqual(self.supervise.read_control(), expected)
+
+    def test_no_reader_raises(self):
+        os.close(self.supervise.control_fd)
+        self.supervise.control_fd = os.open(os.devnull, os.O_RDONLY)
+        with self.assertRaises(OSError):
+            control.send_supervise_command('u', self.supervise.service_path)
+
+
+class FakeService:
+    """Stands in for supervise: a new pid appears once the old process got the signal that ends it"""
+
+    def __init__(self, pid, exits_on):
+        self.pid = pid
+        self.exits_on = exits_on
+        self.commands = []
+
+    def status(self):
+        return {'running': True, 'pid': self.pid}
+
+    def send(self, commands):
+        self.commands.append(commands)
+        if self.exits_on in commands:
+            self.pid += 1
+
+
+class RestartOperationTest(unittest.TestCase):
+
+    def start(self, service):
+        for name, value in (('get_service_status', service.status), ('send_supervise_command', service.send),
+                            ('get_main_api_health', lambda: {'success': True, 'status': 'healthy'}),
+                            ('JOB_POLL_INTERVAL', 0.01), ('RESTART_TERM_TIMEOUT', 0.2)):
+            patcher = mock.patch.object(control, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        job = control.Job('restart')
+        control.restart_operation(job)
+        return job
+
+    def test_sigterm_restart(self):
+        service = FakeService(100, exits_on='t')
+        job = self.start(service)
+        self.assertEqual(service.commands, ['tu'])
+        self.assertEqual(job.result['pid'], 101)
+
+    def test_sigkill_when_sigterm_is_ignored(self):
+        service = FakeService(100, exits_on='k')
+        job = self.start(service)
+        self.assertEqual(service.commands, ['tu', 'k'])
+        self.assertEqual(job.result['pid'], 101)
+
+
+class ReloadOperationTest(unittest.TestCase):
+
+    def start(self, health_replies):
+        service = FakeService(100, exits_on='-')
+        replies = iter(health_replies)
+        for name, value in (('get_service_status', service.status), ('send_supervise_command', service.send),
+                            ('get_main_api_health', lambda: next(replies)),
+                            ('JOB_POLL_INTERVAL', 0.01)):
+            patcher = mock.patch.object(control, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        job = control.Job('reload')
+        control.reload_operation(job)
+        return service, job
+
+    def test_reload_waits_for_new_started_at(self):
+        old = {'success': True, 'status': 'healthy', 'started_at': '2024-01-01T00:00:00'}
+        new = dict(old, started_at='2024-01-01T00:05:00')
+        service, job = self.start([old, None, old, new])
+        self.assertEqual(service.commands, ['h'])
+        self.assertEqual(job.result['pid'], 100)
+
+    def test_no_health_before_reload_fails(self):
+        with self.assertRaisesRegex(RuntimeError, 'cannot be confirmed'):
+            self.start([None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""UnixAPIServer socket file handling"""
+
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+
+from dbus_api_server import UNIX_CLIENT, UnixAPIServer
+
+
+class ClientAddressHandler(BaseHTTPRequestHandler):
+    """Answers with the client address the server reported"""
+
+    def do_GET(self):
+        body = self.client_address[0].encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def unix_get(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(b'GET /health HTTP/1.0\r\n\r\n')
+        response = b''
+        while chunk := client.recv(4096):
+            response += chunk
+    return response.split(b'\r\n\r\n', 1)
+
+
+class UnixAPIServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'run', 'api.sock')
+
+    def start(self, **kwargs):
+        server = UnixAPIServer(self.path, ClientAddressHandler, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_serves_requests_as_unix_client(self):
+        self.start()
+        head, body = unix_get(self.path)
+        self.assertTrue(head.startswith(b'HTTP/1.0 200'))
+        self.assertEqual(body.decode(), UNIX_CLIENT)
+
+    def test_socket_mode(self):
+        self.start()
+        self.assertTrue(stat.S_ISSOCK(os.lstat(self.path).st_mode))
+        self.assertEqual(stat.S_IMODE(os.lstat(self.path).st_mode), 0o660)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['api.sock'])
+
+    def test_custom_mode(self):
+        self.start(mode=0o600)
+        self.assertEqual(stat.S_IMODE(os.lstat(self.path).st_mode), 0o600)
+
+    def test_stale_socket_is_replaced(self):
+        os.makedirs(os.path.dirname(self.path))
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()  # File left behind, nobody listening
+        self.start()
+        self.assertEqual(unix_get(self.path)[1].decode(), UNIX_CLIENT)
+
+    def test_socket_in_use_is_refused_and_kept(self):
+        self.start()
+        with self.assertRaisesRegex(OSError, 'Another server'):
+            UnixAPIServer(self.path, ClientAddressHandler).server_close()
+        self.assertEqual(unix_get(self.path)[1].decode(), UNIX_CLIENT)
+
+    def test_other_file_is_refused(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('not a socket')
+        with self.assertRaisesRegex(OSError, 'not a socket'):
+            UnixAPIServer(self.path, ClientAddressHandler)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'not a socket')
+
+    def test_close_removes_socket_file(self):
+        server = UnixAPIServer(self.path, ClientAddressHandler)
+        server.server_close()
+        self.assertFalse(os.path.lexists(self.path))
+
+    def test_unknown_group_leaves_no_file(self):
+        with self.assertRaises(KeyError):
+            UnixAPIServer(self.path, ClientAddressHandler, group='no-such-group-here')
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
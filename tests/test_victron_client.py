@@ -0,0 +1,109 @@
+"""VictronClient and AsyncVictronClient batch reads against a stand-in server"""
+
+import asyncio
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from victron_api_client import AsyncVictronClient, VictronAPIError, VictronClient
+
+SYSTEM = 'com.victronenergy.system'
+BATTERY = 'com.victronenergy.battery.ttyUSB0'  # Answers with a per-item error
+VALUES = {(SYSTEM, '/Dc/Battery/Soc'): 80, (SYSTEM, '/Dc/Battery/Voltage'): 52.1}
+
+
+class StandInServerHandler(BaseHTTPRequestHandler):
+    """Answers POST /values like dbus_api_server.py, counting the requests"""
+
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_POST(self):
+        items = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['items']
+        self.requests.append(items)
+        values = []
+        for item in items:
+            entry = {'service': item['service'], 'path': item['path'],
+                     'value': VALUES.get((item['service'], item['path']))}
+            if item['service'] == BATTERY:
+                entry['error'] = f"Service {BATTERY} is not responding"
+            values.append(entry)
+        body = json.dumps({'values': values, 'count': len(values), 'success': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ClientTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInServerHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInServerHandler.requests = []
+
+
+class GetValuesTest(ClientTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = VictronClient(self.url, cache_ttl=60)
+        self.addCleanup(self.client.close)
+
+    def test_values_in_one_request(self):
+        values = self.client.get_values([(SYSTEM, '/Dc/Battery/Soc'), (SYSTEM, '/Dc/Battery/Voltage'),
+                                         (SYSTEM, '/Missing')])
+        self.assertEqual(values, {(SYSTEM, '/Dc/Battery/Soc'): 80, (SYSTEM, '/Dc/Battery/Voltage'): 52.1,
+                                  (SYSTEM, '/Missing'): None})
+        self.assertEqual(len(StandInServerHandler.requests), 1)
+
+    def test_item_error_is_raised(self):
+        with self.assertRaisesRegex(VictronAPIError, 'not responding') as raised:
+            self.client.get_values([(SYSTEM, '/Dc/Battery/Soc'), (BATTERY, '/Soc')])
+        self.assertEqual(raised.exception.payload['service'], BATTERY)
+
+    def test_item_error_returned_when_not_raising(self):
+        values = self.client.get_values([(SYSTEM, '/Dc/Battery/Soc'), (BATTERY, '/Soc')], raise_errors=False)
+        self.assertEqual(values[(SYSTEM, '/Dc/Battery/Soc')], 80)
+        self.assertIsInstance(values[(BATTERY, '/Soc')], VictronAPIError)
+
+    def test_errors_are_not_cached(self):
+        self.client.get_values([(SYSTEM, '/Dc/Battery/Soc'), (BATTERY, '/Soc')], raise_errors=False)
+        self.client.get_values([(SYSTEM, '/Dc/Battery/Soc'), (BATTERY, '/Soc')], raise_errors=False)
+        self.assertEqual([[item['service'] for item in items] for items in StandInServerHandler.requests],
+                         [[SYSTEM, BATTERY], [BATTERY]])
+
+
+class AsyncGetValueTest(ClientTestCase):
+
+    def test_batched_reads_fail_only_the_errored_item(self):
+        async def read():
+            async with AsyncVictronClient(self.url) as client:
+                return await asyncio.gather(client.get_value(SYSTEM, '/Dc/Battery/Soc'),
+                                            client.get_value(BATTERY, '/Soc'),
+                                            client.get_value(SYSTEM, '/Missing'),
+                                            return_exceptions=True)
+
+        soc, error, missing = asyncio.run(read())
+        self.assertEqual((soc, missing), (80, None))
+        self.assertIsInstance(error, VictronAPIError)
+        self.assertEqual(len(StandInServerHandler.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""WebhookManager delivery against a local receiver"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+import types
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import dbus_api_server
+from dbus_api_server import (ChangeLog, WEBHOOK_SECRET_MASK, WebhookManager, redact_config,
+                             restore_masked_secrets)
+
+SERVICE = 'com.victronenergy.system'
+PATH = '/Dc/Battery/Soc'
+
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    """Records every delivery and answers with the next scripted status"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        with server.lock:
+            status = server.statuses.pop(0) if server.statuses else 200
+            server.received.append((time.monotonic(), dict(self.headers), body, status))
+            server.lock.notify_all()
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_receiver(statuses=()):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReceiverHandler)
+    server.daemon_threads = True
+    server.lock = threading.Condition()
+    server.statuses = list(statuses)
+    server.received = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class WebhookDeliveryTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(dbus_api_server, 'WEBHOOK_BACKOFF', 0.1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.interface = types.SimpleNamespace(changes=ChangeLog(), ready=False, get_value=lambda *args: None)
+
+    def start(self, statuses=(), **spec):
+        """Receiver plus a started manager with one webhook "soc" posting to it"""
+        receiver = start_receiver(statuses)
+        self.addCleanup(receiver.server_close)
+        self.addCleanup(receiver.shutdown)
+        manager = WebhookManager(self.interface)
+        manager.configure({'soc': dict(
+            {'service': SERVICE, 'path': PATH, 'url': f'http://127.0.0.1:{receiver.server_address[1]}/hook'},
+            **spec)})
+        manager.start()
+        return receiver, manager
+
+    def wait_for(self, receiver, count, timeout=5):
+        """Wait for count deliveries
+
+        Returns: [(arrival time, headers, payload, status answered)]
+        """
+        deadline = time.monotonic() + timeout
+        with receiver.lock:
+            while len(receiver.received) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.fail(f'{len(receiver.received)} of {count} deliveries received')
+                receiver.lock.wait(remaining)
+            return [(at, headers, json.loads(body), status) for at, headers, body, status in receiver.received]
+
+    def wait_for_stats(self, manager, **expected):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            stats = manager.stats()
+            if all(stats[k] == v for k, v in expected.items()):
+                return stats
+            time.sleep(0.01)
+        self.fail(f'stats {manager.stats()} never reached {expected}')
+
+    def test_condition_sends_triggered_and_cleared(self):
+        receiver, manager = self.start(condition={'op': '<', 'value': 20})
+        for value in (50, 15, 10, 30):
+            self.interface.changes.record(SERVICE, PATH, value)
+        deliveries = self.wait_for(receiver, 2)
+        events = [(payload['event'], payload['value'], payload['previous']) for _, _, payload, _ in deliveries]
+        self.assertEqual(events, [('triggered', 15, 50), ('cleared', 30, 10)])
+        self.assertEqual(self.wait_for_stats(manager, delivered=2)['failed'], 0)
+
+    def test_unavailable_value_is_not_a_cleared_condition(self):
+        receiver, manager = self.start(condition={'op': '<', 'value': 20})
+        for value in (50, 15, None, 'n/a', 12, 30):
+            self.interface.changes.record(SERVICE, PATH, value)
+        deliveries = self.wait_for(receiver, 2)
+        events = [(payload['event'], payload['value'], payload['previous']) for _, _, payload, _ in deliveries]
+        # None and the string leave the condition active and the previous value alone
+        self.assertEqual(events, [('triggered', 15, 50), ('cleared', 30, 12)])
+        self.wait_for_stats(manager, delivered=2)
+        self.assertEqual(len(receiver.received), 2)
+
+    def test_server_errors_are_retried_with_backoff(self):
+        receiver, manager = self.start(statuses=[503, 503, 200])
+        self.interface.changes.record(SERVICE, PATH, 42)
+        deliveries = self.wait_for(receiver, 3)
+        self.assertEqual([status for _, _, _, status in deliveries], [503, 503, 200])
+        self.assertEqual(len({payload['id'] for _, _, payload, _ in deliveries}), 1)
+        first_gap = deliveries[1][0] - deliveries[0][0]
+        second_gap = deliveries[2][0] - deliveries[1][0]
+        self.assertGreaterEqual(first_gap, 0.1)
+        self.assertGreaterEqual(second_gap, 0.2)
+        stats = self.wait_for_stats(manager, delivered=1)
+        self.assertEqual((stats['failed'], stats['pending']), (0, 0))
+        self.assertEqual(manager.list()['soc']['state']['delivered'], 1)
+
+    def test_client_errors_are_not_retried(self):
+        receiver, manager = self.start(statuses=[400])
+        self.interface.changes.record(SERVICE, PATH, 42)
+        self.wait_for(receiver, 1)
+        stats = self.wait_for_stats(manager, failed=1)
+        self.assertEqual((stats['delivered'], stats['pending']), (0, 0))
+        time.sleep(0.3)
+        self.assertEqual(len(receiver.received), 1)
+        self.assertEqual(manager.list()['soc']['state']['last_status'], 400)
+
+    def test_event_ids_are_unique_and_sent_as_header(self):
+        receiver, manager = self.start(condition={'op': '<', 'value': 20})
+        for value in (10, 30, 10, 30):
+            self.interface.changes.record(SERVICE, PATH, value)
+        deliveries = self.wait_for(receiver, 4)
+        ids = [payload['id'] for _, _, payload, _ in deliveries]
+        self.assertEqual(len(set(ids)), 4)
+        self.assertTrue(all(i.startswith(f'{self.interface.changes.epoch}-') for i in ids))
+        self.assertEqual([headers['X-Webhook-Event'] for _, headers, _, _ in deliveries], ids)
+
+    def test_signature_header(self):
+        receiver, manager = self.start(secret='s3cret')
+        self.interface.changes.record(SERVICE, PATH, 42)
+        self.wait_for(receiver, 1)
+        _, headers, body, _ = receiver.received[0]
+        expected = 'sha256=' + hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers['X-Webhook-Signature'], expected)
+        self.assertNotIn('secret', manager.list()['soc'])
+
+    def test_no_signature_without_secret(self):
+        receiver, manager = self.start()
+        self.interface.changes.record(SERVICE, PATH, 42)
+        _, headers, _, _ = self.wait_for(receiver, 1)[0]
+        self.assertNotIn('X-Webhook-Signature', headers)
+
+
+class SecretRedactionTest(unittest.TestCase):
+
+    stored = {'webhooks': {'soc': {'service': SERVICE, 'path': PATH, 'url': 'http://x/', 'secret': 's3cret'},
+                           'plain': {'service': SERVICE, 'path': PATH, 'url': 'http://x/'}}}
+
+    def test_redacted_config_has_no_secret(self):
+        redacted = redact_config(self.stored)
+        self.assertNotIn('s3cret', json.dumps(redacted))
+        self.assertEqual(redacted['webhooks']['soc']['secret'], WEBHOOK_SECRET_MASK)
+        self.assertNotIn('secret', redacted['webhooks']['plain'])
+        self.assertEqual(self.stored['webhooks']['soc']['secret'], 's3cret')
+
+    def test_masked_secret_round_trips(self):
+        config = restore_masked_secrets(json.loads(json.dumps(redact_config(self.stored))), self.stored)
+        self.assertEqual(config, self.stored)
+
+    def test_masked_secret_in_patch(self):
+        patch = restore_masked_secrets({'webhooks': {'soc': {'url': 'http://y/', 'secret': WEBHOOK_SECRET_MASK}}},
+                                       self.stored)
+        self.assertEqual(patch['webhooks']['soc']['secret'], 's3cret')
+
+    def test_mask_without_stored_secret_is_dropped(self):
+        config = restore_masked_secrets({'webhooks': {'new': {'secret': WEBHOOK_SECRET_MASK}}}, self.stored)
+        self.assertEqual(config, {'webhooks': {'new': {}}})
+
+    def test_new_secret_is_kept(self):
+        config = restore_masked_secrets({'webhooks': {'soc': {'secret': 'other'}}}, self.stored)
+        self.assertEqual(config['webhooks']['soc']['secret'], 'other')
+
+
+if __name__ == '__main__':
+    unittest.main()
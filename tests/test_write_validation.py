@@ -0,0 +1,137 @@
+"""coerce_write_value: JSON values checked against path metadata before SetValue"""
+
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+import dbus_api_server
+from dbus_api_server import SETTINGS_SERVICE, DBusInterface, coerce_write_value, WriteValidationError
+
+INT32_SETPOINT = {'type': 'Int32', 'min': -100, 'max': 100, 'default': 0}
+
+
+class CoerceWriteValueTest(unittest.TestCase):
+
+    def test_booleans_are_not_integers(self):
+        for value in (True, False):
+            with self.assertRaises(WriteValidationError):
+                coerce_write_value(value, INT32_SETPOINT)
+
+    def test_booleans_are_not_doubles(self):
+        with self.assertRaises(WriteValidationError):
+            coerce_write_value(True, {'type': 'Double', 'min': None, 'max': None})
+
+    def test_range_and_type_errors(self):
+        for value in (101, -101, 1.5, '5', None):
+            with self.assertRaises(WriteValidationError):
+                coerce_write_value(value, INT32_SETPOINT)
+        with self.assertRaises(WriteValidationError):
+            coerce_write_value(2 ** 31, {'type': 'Int32', 'min': None, 'max': None})
+
+    def test_unknown_type_passes_through(self):
+        self.assertIs(coerce_write_value(True, {'type': None}), True)
+
+    def test_loose_numbers_keep_their_own_type(self):
+        # A velib setpoint that currently reads 0 (Int32) may still be set to 12.5
+        self.assertEqual(coerce_write_value(12.5, INT32_SETPOINT, strict_type=False), 12.5)
+        self.assertIs(type(coerce_write_value(7, {'type': 'Double'}, strict_type=False)), int)
+
+    def test_loose_numbers_still_checked(self):
+        for value in (100.5, -101, True, '5', None):
+            with self.assertRaises(WriteValidationError):
+                coerce_write_value(value, INT32_SETPOINT, strict_type=False)
+
+
+def fake_dbus():
+    """Just enough of dbus-python for DBusInterface metadata lookups"""
+    module = types.SimpleNamespace()
+    for name in ('Byte', 'Int16', 'UInt16', 'Int32', 'UInt32', 'Int64', 'UInt64', 'Boolean'):
+        setattr(module, name, type(name, (int,), {}))
+    module.Double = type('Double', (float,), {})
+    module.String = type('String', (str,), {})
+    module.Array = type('Array', (list,), {})
+    module.Dictionary = type('Dictionary', (dict,), {})
+
+    class DBusException(Exception):
+        def __init__(self, message='', name=None):
+            super().__init__(message)
+            self._dbus_error_name = name
+
+        def get_dbus_name(self):
+            return self._dbus_error_name
+
+    module.exceptions = types.SimpleNamespace(DBusException=DBusException)
+    module.Interface = lambda obj, interface_name: obj
+    return module
+
+
+class StandInBus:
+    """Settings tree plus one velib-style service whose setpoint currently reads Int32 0"""
+
+    def __init__(self, dbus):
+        self.dbus = dbus
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_object(self, service, path):
+        return types.SimpleNamespace(**{method: self._method(service, path, method)
+                                        for method in ('GetItems', 'GetValue', 'GetMin', 'GetMax')})
+
+    def _method(self, service, path, method):
+        dbus = self.dbus
+
+        def call(timeout=None):
+            with self.lock:
+                self.calls.append((method, service, path))
+            if method == 'GetItems':
+                time.sleep(0.1)
+                item = dbus.Dictionary(Value=dbus.Int32(5), Min=dbus.Int32(0), Max=dbus.Int32(10),
+                                       Default=dbus.Int32(0))
+                return dbus.Dictionary({'/Settings/A': item, '/Settings/B': item})
+            if method == 'GetValue':
+                return dbus.Int32(0)
+            raise dbus.exceptions.DBusException('no limits', name='org.freedesktop.DBus.Error.UnknownMethod')
+        return call
+
+
+class MetadataLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        dbus = fake_dbus()
+        patcher = mock.patch.object(dbus_api_server, 'dbus', dbus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.interface = DBusInterface()
+        self.bus = self.interface.bus = StandInBus(dbus)
+
+    def test_concurrent_settings_misses_share_one_get_items(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.interface.get_metadata(SETTINGS_SERVICE, '/Settings/A'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.bus.calls, [('GetItems', SETTINGS_SERVICE, '/')])
+        self.assertEqual(results, [{'type': 'Int32', 'min': 0, 'max': 10, 'default': 0}] * 5)
+        self.assertEqual(self.interface._settings_metadata_count, 2)
+        self.interface.get_metadata(SETTINGS_SERVICE, '/Settings/B')
+        self.assertEqual(len(self.bus.calls), 1)
+
+    def test_settings_type_is_strict(self):
+        with self.assertRaises(WriteValidationError):
+            self.interface.validate_write(SETTINGS_SERVICE, '/Settings/A', 2.5)
+        self.assertIsInstance(self.interface.validate_write(SETTINGS_SERVICE, '/Settings/A', 2),
+                              dbus_api_server.dbus.Int32)
+
+    def test_other_services_accept_any_number(self):
+        service = 'com.victronenergy.hub4'
+        self.assertEqual(self.interface.validate_write(service, '/AcPowerSetpoint', 12.5), 12.5)
+        with self.assertRaises(WriteValidationError):
+            self.interface.validate_write(service, '/AcPowerSetpoint', 'high')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Victron DBus API Client
+Reusable client for dbus_api_server.py with sync and asyncio variants
+
+    from victron_api_client import VictronClient
+    client = VictronClient("http://192.168.88.77:8088")
+    soc = client.get_value('com.victronenergy.system', '/Dc/Battery/Soc')
+    values = client.get_values([(service, '/Dc/0/Voltage') for service in client.services()])
+
+    # On the GX itself, over the server's Unix socket (--unix-socket)
+    local = VictronClient("unix:///var/run/dbus-api/api.sock")
+
+    async with AsyncVictronClient("http://192.168.88.77:8088") as client:
+        # Concurrent get_value calls are sent as one POST /values batch
+        socs = await asyncio.gather(*(client.get_value(s, '/Soc') for s in batteries))
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "http://192.168.88.77:8088"
+DEFAULT_TIMEOUT = 5
+DEFAULT_RETRIES = 3  # Attempts after the first for idempotent requests
+RETRY_BACKOFF = 0.5  # Seconds, doubled per attempt (or the server's Retry-After)
+RETRY_BACKOFF_MAX = 10
+POOL_SIZE = 10  # Keep-alive connections to the server
+BATCH_MAX_ITEMS = 500  # Matches the server's POST /values limit
+BATCH_WINDOW = 0.002  # Seconds async get_value calls are collected before sending
+UNIX_SCHEME = 'unix://'  # base_url prefix followed by the server's socket path
+UNIX_BASE_URL = 'http://localhost'  # Requests are addressed here and sent over the socket
+ENCODINGS = {  # Response encodings the server can send besides JSON (optional packages)
+    'msgpack': 'application/msgpack',
+    'cbor': 'application/cbor',
+}
+
+
+class VictronAPIError(Exception):
+    """Raised when the server answers with an error or cannot be reached"""
+
+    def __init__(self, message, status=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.payload = payload or {}
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    """requests transport adapter that sends every request over one Unix domain socket"""
+
+    def __init__(self, socket_path: str, pool_size: int = POOL_SIZE):
+        super().__init__(pool_connections=1, pool_maxsize=pool_size)
+
+        class Connection(urllib3.connection.HTTPConnection):
+            def _new_conn(self):
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout if isinstance(self.timeout, (int, float)) else None)
+                sock.connect(socket_path)
+                return sock
+
+        self.pool = urllib3.HTTPConnectionPool('localhost', maxsize=pool_size)
+        self.pool.ConnectionCls = Connection
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.pool
+
+    def get_connection(self, url, proxies=None):
+        return self.pool
+
+    def close(self):
+        self.pool.close()
+        super().close()
+
+
+class VictronClient:
+    """Client for every dbus_api_server.py endpoint
+
+    One pooled requests.Session is reused for all calls. Reads are retried
+    with exponential backoff on connection errors, timeouts and 503
+    (starting / circuit open); writes are never retried. With cache_ttl,
+    values are also cached locally for that many seconds. With priority
+    ('critical', 'high' or 'medium'), every request is scheduled in that
+    server lane instead of the one derived from its path. With encoding
+    'msgpack' or 'cbor' (needs the msgpack / cbor2 package), responses are
+    requested in that format, which is smaller and faster to decode for
+    large reads such as settings() or service subtrees. A base_url of
+    unix:///path/to/api.sock talks to the server's Unix socket instead of TCP.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, cache_ttl: Optional[float] = None,
+                 pool_size: int = POOL_SIZE, priority: Optional[str] = None,
+                 encoding: str = 'json'):
+        self.timeout = timeout
+        self.retries = retries
+        self.cache_ttl = cache_ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if base_url.startswith(UNIX_SCHEME):
+            self.session.mount(UNIX_BASE_URL, UnixSocketAdapter(base_url[len(UNIX_SCHEME):], pool_size))
+            self.session.trust_env = False  # An http_proxy setting must not redirect socket requests
+            base_url = UNIX_BASE_URL
+        self.base_url = base_url.rstrip('/')
+        if priority:
+            self.session.headers['X-Priority'] = priority
+        self._decoders = {}  # media type -> function bytes -> data
+        if encoding != 'json':
+            if encoding == 'msgpack':
+                import msgpack
+                self._decoders[ENCODINGS[encoding]] = lambda body: msgpack.unpackb(
+                    body, raw=False, strict_map_key=False)
+            elif encoding == 'cbor':
+                import cbor2
+                self._decoders[ENCODINGS[encoding]] = cbor2.loads
+            else:
+                raise ValueError(f"Unknown encoding {encoding!r} - use json, {', '.join(ENCODINGS)}")
+            # The server answers JSON if it lacks the package, so keep accepting it
+            self.session.headers['Accept'] = f'{ENCODINGS[encoding]}, application/json;q=0.5'
+        self._cache = {}  # (service, path) -> (expires_at, value)
+        self._cache_lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Server information ---
+
+    def info(self) -> Dict[str, Any]:
+        return self._request('GET', '/')
+
+    def health(self) -> Dict[str, Any]:
+        return self._request('GET', '/health', ok_statuses=(503,))
+
+    def ai_write_status(self) -> Dict[str, Any]:
+        return self._request('GET', '/ai-write-status')
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._request('GET', '/cache')
+
+    def metrics(self, top: Optional[int] = None) -> Dict[str, Any]:
+        return self._request('GET', '/metrics', params={'top': top} if top else None)
+
+    # --- Discovery ---
+
+    def services(self) -> List[str]:
+        return self._request('GET', '/services').get('services', [])
+
+    def devices(self, refresh: bool = False) -> Dict[str, Any]:
+        return self._request('GET', '/devices', params={'refresh': 1} if refresh else None)
+
+    def settings(self) -> Dict[str, Any]:
+        return self._request('GET', '/settings').get('settings', {})
+
+    def metadata(self, service: str, path: str) -> Optional[Dict[str, Any]]:
+        """DBus type, min, max and default of a path, None if it doesn't exist"""
+        return self._request('GET', '/metadata', params={'service': service, 'path': path},
+                             missing_ok=True)
+
+    # --- Values ---
+
+    def get_value(self, service: str, path: str) -> Optional[Any]:
+        """Read one value
+
+        Returns: The value, or None if the path doesn't exist
+        """
+        cached = self._cache_get(service, path)
+        if cached is not None:
+            return cached[0]
+        data = self._request('GET', '/value', params={'service': service, 'path': path}, missing_ok=True)
+        value = data.get('value') if data else None
+        self._cache_put(service, path, value)
+        return value
+
+    def get_values(self, items: Iterable[Tuple[str, str]],
+                   raise_errors: bool = True) -> Dict[Tuple[str, str], Any]:
+        """Read many values with as few requests as possible (POST /values)
+
+        The server reports a path it could not read (e.g. its service is not
+        answering) per item instead of failing the batch.
+
+        Returns: {(service, path): value or None}; with raise_errors=False an
+            unreadable path maps to its VictronAPIError instead
+        Raises: VictronAPIError for the first unreadable path if raise_errors
+        """
+        items = list(dict.fromkeys(tuple(item) for item in items))
+        result = {}
+        missing = []
+        for service, path in items:
+            cached = self._cache_get(service, path)
+            if cached is not None:
+                result[(service, path)] = cached[0]
+            else:
+                missing.append((service, path))
+
+        for start in range(0, len(missing), BATCH_MAX_ITEMS):
+            chunk = missing[start:start + BATCH_MAX_ITEMS]
+            data = self._request('POST', '/values', retry=True, json={
+                'items': [{'service': service, 'path': path} for service, path in chunk]
+            })
+            for entry in data.get('values', []):
+                key = (entry['service'], entry['path'])
+                if 'error' in entry:
+                    result[key] = VictronAPIError(f"{entry['service']}{entry['path']}: {entry['error']}",
+                                                  payload=entry)
+                else:
+                    result[key] = entry.get('value')
+                    self._cache_put(entry['service'], entry['path'], entry.get('value'))
+        values = {key: result.get(key) for key in items}
+        if raise_errors:
+            for value in values.values():
+                if isinstance(value, VictronAPIError):
+                    raise value
+        return values
+
+    def get_text(self, service: str, path: str) -> Optional[str]:
+        data = self._request('GET', '/text', params={'service': service, 'path': path}, missing_ok=True)
+        return data.get('text') if data else None
+
+    def set_value(self, service: str, path: str, value: Any) -> Dict[str, Any]:
+        """Write a value (requires the AI_write switch)
+
+        Returns: Server response with the confirmed value
+        Raises: VictronAPIError (403 AI_write off, 400 invalid value, ...)
+        """
+        with self._cache_lock:
+            self._cache.pop((service, path), None)
+        return self._request('POST', '/value', json={'service': service, 'path': path, 'value': value})
+
+    # --- Configuration ---
+
+    def config(self) -> Dict[str, Any]:
+        return self._request('GET', '/config').get('config', {})
+
+    def replace_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request('POST', '/config', json={'config': config})
+
+    def patch_config(self, patch: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a JSON merge patch (null deletes a key)"""
+        return self._request('PATCH', '/config', json=patch).get('config', {})
+
+    # --- Views and delta sync ---
+
+    def views(self) -> Dict[str, Any]:
+        return self._request('GET', '/views').get('views', {})
+
+    def view(self, name: str, since: Optional[int] = None) -> Dict[str, Any]:
+        return self._request('GET', f'/views/{name}', params={'since': since} if since is not None else None)
+
+    def changes(self, since: Optional[int] = None, epoch: Optional[int] = None,
+                service: Optional[str] = None) -> Dict[str, Any]:
+        """Values changed since a sequence (GET /changes)
+
+        Returns: Header dict (epoch, seq, since, resync) with a 'changes' list
+        """
+        params = {k: v for k, v in (('since', since), ('epoch', epoch), ('service', service)) if v is not None}
+        response = self._send('GET', '/changes', retry=True, params=params)
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        return dict(lines[0], changes=lines[1:]) if lines else {}
+
+    # --- Energy ---
+
+    def energy(self, resolution: str = '15m', limit: int = 24) -> Dict[str, Any]:
+        """Wh counters and the latest buckets per meter (GET /energy)
+
+        resolution: '1m', '15m' or '1h'; limit: buckets per meter
+        """
+        return self._request('GET', '/energy', params={'resolution': resolution, 'limit': limit}).get('meters', {})
+
+    # --- Write journal ---
+
+    def journal(self, since: Optional[Any] = None, until: Optional[Any] = None,
+                service: Optional[str] = None, path: Optional[str] = None,
+                before: Optional[int] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """One page of journalled write attempts, newest first (GET /journal)
+
+        since/until: Unix seconds or ISO 8601; service/path: fnmatch patterns.
+        Pass the returned next_before as before to get the following page.
+        """
+        params = {k: v for k, v in (('since', since), ('until', until), ('service', service), ('path', path),
+                                    ('before', before), ('limit', limit)) if v is not None}
+        return self._request('GET', '/journal', params=params)
+
+    # --- Webhooks ---
+
+    def webhooks(self) -> Dict[str, Any]:
+        return self._request('GET', '/webhooks').get('webhooks', {})
+
+    def add_webhook(self, name: str, service: str, path: str, url: str,
+                    condition: Optional[Dict[str, Any]] = None, **options) -> Dict[str, Any]:
+        """Register (or replace) a webhook
+
+        condition: e.g. {'op': '<', 'value': 20}; without one every change is sent
+        options: poll_interval_seconds, notify_clear, headers, secret
+        """
+        spec = dict(options, name=name, service=service, path=path, url=url)
+        if condition is not None:
+            spec['condition'] = condition
+        return self._request('POST', '/webhooks', json=spec)
+
+    def test_webhook(self, name: str) -> Dict[str, Any]:
+        return self._request('POST', f'/webhooks/{name}/test')
+
+    def remove_webhook(self, name: str) -> Dict[str, Any]:
+        return self._request('DELETE', f'/webhooks/{name}')
+
+    # --- Plumbing ---
+
+    def _request(self, method, path, retry=None, missing_ok=False, ok_statuses=(), **kwargs):
+        """Send a request and decode the JSON answer
+
+        Returns: Response dict, or None for 404 when missing_ok
+        Raises: VictronAPIError
+        """
+        response = self._send(method, path, retry=retry, missing_ok=missing_ok,
+                              ok_statuses=ok_statuses, **kwargs)
+        if response is None:
+            return None
+        try:
+            return self._decode(response)
+        except ValueError:
+            raise VictronAPIError(f'Invalid response body from {method} {path}', response.status_code)
+
+    def _decode(self, response):
+        """Decode a JSON, MessagePack or CBOR response body
+
+        Raises: ValueError if the body is malformed
+        """
+        decode = self._decoders.get(response.headers.get('Content-Type', '').split(';')[0])
+        if decode is None:
+            return response.json()
+        try:
+            return decode(response.content)
+        except Exception as e:
+            raise ValueError(str(e))
+
+    def _send(self, method, path, retry=None, missing_ok=False, ok_statuses=(), **kwargs):
+        retry = method == 'GET' if retry is None else retry
+        attempts = self.retries + 1 if retry else 1
+        delay = RETRY_BACKOFF
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}",
+                                                timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise VictronAPIError(f'{method} {path} failed: {e}')
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_BACKOFF_MAX)
+                continue
+
+            if response.status_code == 404 and missing_ok:
+                return None
+            if response.status_code < 400 or response.status_code in ok_statuses:
+                return response
+            if response.status_code in (503, 429) and not last:
+                retry_after = response.headers.get('Retry-After')
+                time.sleep(min(float(retry_after), RETRY_BACKOFF_MAX) if retry_after else delay)
+                delay = min(delay * 2, RETRY_BACKOFF_MAX)
+                continue
+            try:
+                payload = self._decode(response)
+            except ValueError:
+                payload = {}
+            raise VictronAPIError(payload.get('error') or f'{method} {path}: HTTP {response.status_code}',
+                                  response.status_code, payload)
+
+    def _cache_get(self, service, path):
+        """Returns: (value,) if cached and fresh, else None"""
+        if not self.cache_ttl:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get((service, path))
+            if entry and entry[0] > time.monotonic():
+                return (entry[1],)
+        return None
+
+    def _cache_put(self, service, path, value):
+        if self.cache_ttl:
+            with self._cache_lock:
+                self._cache[(service, path)] = (time.monotonic() + self.cache_ttl, value)
+
+
+class AsyncVictronClient:
+    """asyncio variant of VictronClient
+
+    Every VictronClient method is available as a coroutine and runs on a
+    worker thread using the same pooled session (no extra dependency).
+    get_value calls issued concurrently (e.g. via asyncio.gather) within
+    BATCH_WINDOW are merged into a single POST /values request.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, **kwargs):
+        self.client = VictronClient(base_url, **kwargs)
+        self._pending = []  # ((service, path), future)
+        self._flush_handle = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await asyncio.to_thread(self.client.close)
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+    async def get_value(self, service: str, path: str) -> Optional[Any]:
+        """Read one value, batched with other concurrent get_value calls
+
+        Raises: VictronAPIError, also when the server could not read this path
+        """
+        cached = self.client._cache_get(service, path)
+        if cached is not None:
+            return cached[0]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((service, path), future))
+        if len(self._pending) >= BATCH_MAX_ITEMS:
+            self._schedule_flush(loop, 0)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, BATCH_WINDOW)
+        return await future
+
+    def _schedule_flush(self, loop, delay):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = loop.call_later(delay, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self):
+        pending, self._pending, self._flush_handle = self._pending, [], None
+        if not pending:
+            return
+        try:
+            values = await asyncio.to_thread(self.client.get_values, [key for key, _ in pending],
+                                             raise_errors=False)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in pending:
+            if future.done():
+                continue
+            value = values.get(key)
+            if isinstance(value, VictronAPIError):
+                future.set_exception(value)
+            else:
+                future.set_result(value)